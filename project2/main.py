@@ -4,6 +4,7 @@ from typing import Dict, List
 import pygame, sys
 from utils.game import check_collision, draw_path, find_nearest_enemy, test_player_in_range_and_zone
 from utils.game_graph import GameGraph
+from utils.graph_cache import GraphCache
 from utils.kinematic_arrive import KinematicArrive
 from utils.kinematic_arrive_descision import KinematicArriveAction, PatrolAction, InRangeDecision, AttackAction, PlayerReachedDecision
 from utils.kinematic_flee import KinematicFlee
@@ -35,7 +36,9 @@ SCREEN.blit(background_image, (0,0))
 
 # Create the game graph
 block_size: int = 40
-game_graph: GameGraph = GameGraph(zoomed_world, block_size)
+# The graph is loaded from its cache file while the map, the zoom and the block size stay the same
+graph_cache: GraphCache = GraphCache.for_image("./imgs/background.jpg", ZOOM, block_size)
+game_graph: GameGraph = GameGraph(zoomed_world, block_size, graph_cache)
 
 # Player
 camera_x: int = 0
@@ -1,4 +1,5 @@
-from typing import List 
+import heapq
+from typing import Dict, List, Tuple
 from dataclasses import dataclass
 from utils.graph import Graph
 from utils.node import Node
@@ -72,8 +73,8 @@ class PathfindingList:
     Class to store a list of node records for pathfinding.
 
     ### Attributes
-    #### records: List[NodeRecord]
-    The list of node records.
+    #### records: Dict[Node, NodeRecord]
+    The node records, indexed by their node.
 
     ### Methods
     #### __init__()
@@ -98,28 +99,86 @@ class PathfindingList:
     Find the record with the smallest estimated total cost.
     """
     def __init__(self):
-        self.records: List[NodeRecord] = []
+        self.records: Dict[Node, NodeRecord] = {}
+        self._heap: List[Tuple[float, int, NodeRecord]] = []
+        self._counter: int = 0
     
     def __len__(self):
         return len(self.records)
     
     def add(self, record: NodeRecord):
-        self.records.append(record)
+        # Adding a record that is already in the list just refreshes its priority
+        self.records[record.node] = record
+        self._counter += 1
+        heapq.heappush(self._heap, (record.estimated_total_cost, self._counter, record))
     
     def remove(self, record: NodeRecord):
-        self.records.remove(record)
+        # The heap entry is left behind and discarded lazily by smallest_element
+        if self.records.get(record.node) is record:
+            del self.records[record.node]
     
     def contains(self, node: Node) -> bool:
-        return any(record.node == node for record in self.records)
+        return node in self.records
     
     def find(self, node: Node) -> NodeRecord|None:
-        for record in self.records:
-            if record.node == node:
-                return record
-        return None
+        return self.records.get(node)
     
     def smallest_element(self) -> NodeRecord:
-        return min(self.records, key=lambda x: x.estimated_total_cost)
+        # Drop entries of removed records or of records whose cost has changed since they were pushed
+        while self._heap:
+            cost, _, record = self._heap[0]
+            if self.records.get(record.node) is record and cost == record.estimated_total_cost:
+                return record
+            heapq.heappop(self._heap)
+        raise ValueError("smallest_element() called on an empty list")
+
+class ClosedList:
+    """
+    ### Description
+    Class to store the node records that have already been processed. Unlike PathfindingList
+    it is never asked for its smallest element, so it keeps no heap, only the records by node.
+
+    ### Attributes
+    #### records: Dict[Node, NodeRecord]
+    The node records, indexed by their node.
+
+    ### Methods
+    #### __init__()
+    Initialize the list with an empty list.
+
+    #### __len__() -> int
+    Return the number of records in the list.
+
+    #### add(record: NodeRecord)
+    Add a node record to the list.
+
+    #### remove(record: NodeRecord)
+    Remove a node record from the list.
+
+    #### contains(node: Node) -> bool
+    Check if the list contains a record for the given node.
+
+    #### find(node: Node) -> NodeRecord|None
+    Find the record for the given node in the list.
+    """
+    def __init__(self):
+        self.records: Dict[Node, NodeRecord] = {}
+    
+    def __len__(self):
+        return len(self.records)
+    
+    def add(self, record: NodeRecord):
+        self.records[record.node] = record
+    
+    def remove(self, record: NodeRecord):
+        if self.records.get(record.node) is record:
+            del self.records[record.node]
+    
+    def contains(self, node: Node) -> bool:
+        return node in self.records
+    
+    def find(self, node: Node) -> NodeRecord|None:
+        return self.records.get(node)
 
 def pathfind_astar(graph: Graph, start: Node, goal: Node, heuristic: Heuristic) -> List[Connection]|None:
     """
@@ -148,7 +207,7 @@ def pathfind_astar(graph: Graph, start: Node, goal: Node, heuristic: Heuristic)
     # Initialize the open and closed lists
     open_list = PathfindingList()
     open_list.add(start_record)
-    closed_list = PathfindingList()
+    closed_list = ClosedList()
     
     # Iterate through processing each node
     while len(open_list) > 0:
@@ -191,9 +250,8 @@ def pathfind_astar(graph: Graph, start: Node, goal: Node, heuristic: Heuristic)
             end_node_record.connection = connection
             end_node_record.estimated_total_cost = end_node_cost + end_node_heuristic
             
-            # Add it to open list if not already there
-            if not open_list.contains(end_node):
-                open_list.add(end_node_record)
+            # Add it to open list, or refresh its priority if it is already there
+            open_list.add(end_node_record)
                 
         # Move current node from open to closed
         open_list.remove(current)
@@ -2,6 +2,10 @@ from typing import Dict, List, Tuple
 import pygame
 from utils.node import Node, TileNode
 from utils.graph import Graph
+from utils.graph_cache import GraphCache
+
+# Directions of the connections of a tile, bit i of a tile in a GraphCache is direction i
+DIRECTIONS: List[Tuple[int, int]] = [(0, 1), (1, 0), (0, -1), (-1, 0)]  # N, E, S, W
 
 class GameGraph(Graph):
     """
@@ -15,17 +19,22 @@ class GameGraph(Graph):
 
     ### Methods
     - `build_graph()`: Creates a graph from the game world.
+    - `load_graph(cache: GraphCache) -> bool`: Creates the graph from a cache file, if it is up to date.
+    - `save_graph(cache: GraphCache)`: Writes the graph to a cache file.
     - `is_wall(x: int, y: int) -> bool`: Returns whether a tile is a wall.
     - `add_connections_for_tile(x: int, y: int)`: Adds connections for a tile.
     - `draw_world_representation(surface: pygame.Surface, camera_x: int, camera_y: int)`: Draws the world representation.
 
     """
-    def __init__(self, surface: pygame.Surface, block_size: int = 32):
+    def __init__(self, surface: pygame.Surface, block_size: int = 32, cache: GraphCache|None = None):
         super().__init__()
         self.block_size: int = block_size
         self.surface: pygame.Surface = surface
         self.nodes: Dict[pygame.Vector2, TileNode] = {}
-        self.build_graph()
+        if cache is None or not self.load_graph(cache):
+            self.build_graph()
+            if cache is not None:
+                self.save_graph(cache)
     
     def build_graph(self):
         width: int = self.surface.get_width() // self.block_size
@@ -43,6 +52,47 @@ class GameGraph(Graph):
             for x in range(width):
                 if (x, y) in self.nodes:
                     self.add_connections_for_tile(x, y)
+
+    def load_graph(self, cache: GraphCache) -> bool:
+        """
+        ### Description
+        Creates the nodes and connections of the graph from a cache file, adding the
+        connections in the same order as `build_graph`.
+
+        ### Parameters
+        - `cache: GraphCache`: The cache of the map.
+
+        ### Returns
+        - `bool`: Whether the cache was up to date and the graph was loaded.
+        """
+        width: int = self.surface.get_width() // self.block_size
+        height: int = self.surface.get_height() // self.block_size
+        cached = cache.read(width, height)
+        if cached is None:
+            return False
+        walkable, adjacency = cached
+        for index, tile_walkable in enumerate(walkable):
+            if tile_walkable:
+                x, y = index % width, index // width
+                self.nodes[(x, y)] = TileNode(x, y)
+        for (x, y), node in self.nodes.items():
+            bits: int = adjacency[y * width + x]
+            for direction, (dx, dy) in enumerate(DIRECTIONS):
+                if bits >> direction & 1:
+                    self.add_connection(node, self.nodes[(x + dx, y + dy)], 1.0)
+        return True
+
+    def save_graph(self, cache: GraphCache):
+        width: int = self.surface.get_width() // self.block_size
+        height: int = self.surface.get_height() // self.block_size
+        walkable: bytearray = bytearray(width * height)
+        adjacency: bytearray = bytearray(width * height)
+        for (x, y), node in self.nodes.items():
+            walkable[y * width + x] = 1
+            for connection in self.get_connections(node):
+                direction: int = DIRECTIONS.index((connection.to_node.x - x, connection.to_node.y - y))
+                adjacency[y * width + x] |= 1 << direction
+        cache.write(width, height, walkable, adjacency)
     
     def is_wall(self, x: int, y: int) -> bool:
         pixel_x: int = x * self.block_size + self.block_size // 2
@@ -54,10 +104,9 @@ class GameGraph(Graph):
             return True
     
     def add_connections_for_tile(self, x: int, y: int):
-        directions: List[Tuple[int, int]] = [(0, 1), (1, 0), (0, -1), (-1, 0)]  # N, E, S, W
         current_node = self.nodes[(x, y)]
         
-        for dx, dy in directions:
+        for dx, dy in DIRECTIONS:
             new_x, new_y = x + dx, y + dy
             if (new_x, new_y) in self.nodes:
                 neighbor_node: TileNode = self.nodes[(new_x, new_y)]
@@ -0,0 +1,96 @@
+import hashlib
+import mmap
+import os
+import struct
+from typing import Tuple
+
+# Changed whenever the layout of the file changes, so files of older layouts are rebuilt
+FORMAT_VERSION: int = 2
+MAGIC: bytes = b"NAVG"
+# Magic, format version, key, and width and height in tiles
+HEADER: struct.Struct = struct.Struct("<4sH32sII")
+
+class GraphCache:
+    """
+    ### Description
+    A binary file holding the navigation graph of a map, so later launches load it instead
+    of scanning the pixels of the map again. The file holds a header, one byte per tile
+    with 1 if the tile is walkable, and one byte per tile with a bit for every connection
+    that leaves it.
+
+    The key of the cache is a hash of the bytes of the map image, the zoom and the block
+    size; a file written for another key or format version is stale and gets rebuilt.
+
+    ### Attributes
+    - `path`: The path of the cache file.
+    - `key`: The 32 byte key the file must have been written with.
+
+    ### Methods
+    - `for_image(image_path: str, zoom: float, block_size: int, path: str) -> GraphCache`: Returns the cache of a map.
+    - `read(width: int, height: int) -> Tuple[bytearray, bytes]|None`: Returns the cached graph, or None if stale.
+    - `write(width: int, height: int, walkable: bytes, adjacency: bytes)`: Writes the graph.
+    """
+    def __init__(self, path: str, key: bytes):
+        self.path: str = path
+        self.key: bytes = key
+
+    @classmethod
+    def for_image(cls, image_path: str, zoom: float, block_size: int, path: str = "navgraph.cache") -> 'GraphCache':
+        digest = hashlib.sha256()
+        with open(image_path, "rb") as file:
+            digest.update(file.read())
+        digest.update(f"{zoom!r}:{block_size}".encode())
+        return cls(path, digest.digest())
+
+    def read(self, width: int, height: int) -> Tuple[bytearray, bytes]|None:
+        """
+        ### Description
+        Reads the graph from the file through a memory map.
+
+        ### Parameters
+        - width: int. The width of the map, in tiles.
+        - height: int. The height of the map, in tiles.
+
+        ### Returns
+        Tuple[bytearray, bytes]|None: The walkable tiles and the connection bits of every tile,
+        or None if the file is missing or stale.
+        """
+        size: int = width * height
+        try:
+            with open(self.path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                if len(view) < HEADER.size:
+                    return None
+                if HEADER.unpack_from(view) != (MAGIC, FORMAT_VERSION, self.key, width, height):
+                    return None
+                if len(view) != HEADER.size + 2 * size:
+                    return None
+                offset: int = HEADER.size
+                walkable: bytearray = bytearray(view[offset:offset + size])
+                adjacency: bytes = view[offset + size:offset + 2 * size]
+                return walkable, adjacency
+        except (OSError, ValueError):
+            # A missing or empty file is a cache miss, the graph is built from the pixels
+            return None
+
+    def write(self, width: int, height: int, walkable: bytes, adjacency: bytes):
+        """
+        ### Description
+        Writes the graph to the file. The file is replaced at once, so a game closed while
+        writing never leaves a broken cache behind; if it cannot be written the game goes on
+        without it.
+
+        ### Parameters
+        - width: int. The width of the map, in tiles.
+        - height: int. The height of the map, in tiles.
+        - walkable: bytes. 1 for every walkable tile.
+        - adjacency: bytes. The bits of the connections that leave every tile.
+        """
+        temporary_path: str = f"{self.path}.tmp"
+        try:
+            with open(temporary_path, "wb") as file:
+                file.write(HEADER.pack(MAGIC, FORMAT_VERSION, self.key, width, height))
+                file.write(walkable)
+                file.write(adjacency)
+            os.replace(temporary_path, self.path)
+        except OSError:
+            pass
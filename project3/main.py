@@ -4,8 +4,16 @@ from typing import Dict, List
 import pygame, sys
 from utils.face import Face
 from utils.steering_output import SteeringOutput
-from utils.game import check_collision, draw_path, find_nearest_enemy, key_checker, test_player_in_range_and_zone, find_nearest_target_and_evade_obstacles
+from utils.game import check_collision, draw_path, key_checker, test_player_in_range_and_zone, update_flow_field, get_flow_field_path, find_nearest_enemy_with_flow_field, get_incremental_path, request_path_to_nearest, poll_path_to_nearest, submit_path_to_nearest, path_to_nearest_from_future, SEARCH_PROFILER
 from utils.game_graph import GameGraph
+from utils.graph_cache import GraphCache
+from utils.flow_field import FlowField
+from utils.landmark_heuristic import LandmarkTable
+from utils.lpa_star import LPAStar
+from utils.path_request_queue import PathRequestQueue
+from utils.path_worker_pool import PathFuture, PathWorkerPool
+from utils.collision_bitmap import CollisionBitmap
+from utils.path_smoothing import smooth_path
 from utils.arrive import Arrive
 from utils.arrive_descision import ArriveAction, PatrolAction, InRangeDecision, AttackAction, PlayerReachedDecision
 from utils.flee import Flee
@@ -14,6 +22,7 @@ from utils.drawer import draw_polygon_by_class
 from utils.kinematic import Kinematic
 from utils.trigonometry import atan2, normalize
 from utils.finder_descision import FaceAction, FinderAction
+from utils.search_stats import SearchStats
 
 # Initialize Pygame
 pygame.init()
@@ -39,9 +48,22 @@ zoomed_world: pygame.Surface = pygame.transform.scale(
 # Draw the background image
 SCREEN.blit(background_image, (0,0))
 
+# Collision bitmap of the world, used to find the walkable tiles and to cut the corners of the paths
+collision_bitmap: CollisionBitmap = CollisionBitmap(zoomed_world)
+
 # Create the game graph
 block_size: int = 40
-game_graph: GameGraph = GameGraph(zoomed_world, block_size)
+# The graph is loaded from its cache file while the map, the zoom and the block size stay the same
+graph_cache: GraphCache = GraphCache.for_image("./imgs/background.jpg", ZOOM, block_size)
+game_graph: GameGraph = GameGraph(zoomed_world, block_size, collision_bitmap, graph_cache)
+# Landmark distances of the map, built once and loaded on later launches
+LANDMARKS_PATH: str = "landmarks.cache"
+landmarks: LandmarkTable = LandmarkTable.load_or_build(LANDMARKS_PATH, game_graph)
+PATH_CLEARANCE: int = 2
+# The hunter's paths to the black holes may cost up to 20% more than the best ones, in exchange for fewer expanded tiles
+HUNTER_SEARCH_WEIGHT: float = 1.2
+# File the stats of the pathfinding queries are written to when the game is closed
+SEARCH_STATS_PATH: str = "search_stats.json"
 
 # Player
 camera_x: int = 0
@@ -83,6 +105,22 @@ scaled_enemy_experiment: pygame.Surface = pygame.transform.scale(
      int(enemy_stand_by.get_height() * ENEMY_SCALE))
 )
 
+# The enemies plan on the tiles their scaled sprite fits in, the grid of the graph fits the player's triangle
+ENEMY_RADIUS: int = max(scaled_enemy_experiment.get_size()) // 2
+
+# Distance maps towards the player, one for the player's own searches and one for the enemies that pursue it
+player_flow_field: FlowField = FlowField(game_graph)
+enemy_flow_field: FlowField = FlowField(game_graph, ENEMY_RADIUS)
+
+# Incremental planner of enemy 1 when it goes to charge enemy 2
+charge_planner: LPAStar = LPAStar(game_graph, landmarks, ENEMY_RADIUS)
+
+# Searches spread over several frames, so no frame spends more than its budget on paths
+path_requests: PathRequestQueue = PathRequestQueue(game_graph, expansions_per_frame=1500, time_budget_us=4000)
+
+# Workers planning the enemies' paths on other cores, they get the walkability grid of the enemy layer once
+path_workers: PathWorkerPool = PathWorkerPool(game_graph, workers=2, radius=ENEMY_RADIUS)
+
 
 # Scale the black hole sprite
 scaled_black_hole: pygame.Surface = pygame.transform.scale(
@@ -151,6 +189,7 @@ animation_speed: float = 0.5
 # Tactical Path Finding
 current_tactical_path: List[Connection]|None = None
 tactical_target_exp: int|None = None
+tactical_future: PathFuture|None = None
 
 # Normal Path Finding
 current_normal_path: List[Connection]|None = None
@@ -167,6 +206,8 @@ while True:
     # Event loop to close the game
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
+            path_workers.shutdown()
+            SEARCH_PROFILER.dump(SEARCH_STATS_PATH)
             pygame.quit()
             sys.exit()
     
@@ -185,8 +226,22 @@ while True:
     new_x = player.get_x()
     new_y = player.get_y()
 
+    # Rebuild the flow fields only if the player changed tile
+    flow_field_stats = SearchStats()
+    if update_flow_field(game_graph, block_size, player_flow_field, player.get_position(), flow_field_stats):
+        SEARCH_PROFILER.record("player_flow_field", flow_field_stats)
+    flow_field_stats = SearchStats()
+    if update_flow_field(game_graph, block_size, enemy_flow_field, player.get_position(), flow_field_stats):
+        SEARCH_PROFILER.record("enemy_flow_field", flow_field_stats)
+
+    # Resume the pending path requests within this frame's budget
+    path_requests.update()
+
     if keys[pygame.K_q]: # Path Finding
-        current_path, target_exp = find_nearest_enemy(game_graph, block_size, pygame.Vector2(player.get_x(), player.get_y()), [pygame.Vector2(e["x"], e["y"]) for e in enemy_positions])
+        with SEARCH_PROFILER.measure("player_q_path") as stats:
+            current_path, target_exp = find_nearest_enemy_with_flow_field(game_graph, block_size, player_flow_field, [pygame.Vector2(e["x"], e["y"]) for e in enemy_positions], stats)
+            if current_path:
+                current_path = smooth_path(current_path, collision_bitmap, block_size, (player.get_x(), player.get_y()), PATH_CLEARANCE)
         
         # Draw the path
         if current_path:
@@ -411,7 +466,9 @@ while True:
                 else:
                     enemy["x"] = new_x
             elif enemy_positions[2]["fuel"] < FUEL_LIMIT and enemy["charging"]:
-                persec_path2, persec_exp2 = find_nearest_enemy(game_graph, block_size, pygame.Vector2(enemy["x"], enemy["y"]), [pygame.Vector2(enemy_positions[2]["x"], enemy_positions[2]["y"])])
+                persec_exp2 = pygame.Vector2(enemy_positions[2]["x"], enemy_positions[2]["y"])
+                with SEARCH_PROFILER.measure("enemy1_charge") as stats:
+                    persec_path2 = get_incremental_path(game_graph, block_size, charge_planner, pygame.Vector2(enemy["x"], enemy["y"]), persec_exp2, stats)
 
                 if persec_path2 and len(persec_path2) > 0:
                     next_node = persec_path2[0].to_node
@@ -443,7 +500,11 @@ while True:
                 if (enemy_block_x == enemy2_block_x and enemy_block_y == enemy2_block_y):
                     enemy_positions[2]["fuel"] += 1
             else:
-                persec_path2, persec_exp2 = find_nearest_enemy(game_graph, block_size, pygame.Vector2(enemy["x"], enemy["y"]), [pygame.Vector2(player.get_x(), player.get_y())])
+                with SEARCH_PROFILER.measure("enemy1_pursuit") as stats:
+                    persec_path2 = get_flow_field_path(game_graph, block_size, enemy_flow_field, pygame.Vector2(enemy["x"], enemy["y"]), stats)
+                    persec_exp2 = player.get_position() if persec_path2 else None
+                    if persec_path2:
+                        persec_path2 = smooth_path(persec_path2, collision_bitmap, block_size, (enemy["x"], enemy["y"]), PATH_CLEARANCE)
             
                 if persec_path2 and len(persec_path2) > 0:
                     next_node_tactical = persec_path2[0].to_node
@@ -507,6 +568,8 @@ while True:
                 tactical_target_exp = None
                 current_normal_path = None
                 current_tactical_path = None
+                tactical_future = None
+                path_requests.cancel("normal_path")
                 enemy["persecution"] = False
                 steering = action.get_steering()
                 if steering:
@@ -527,18 +590,34 @@ while True:
                 if (enemy["x"] // block_size, enemy["y"] // block_size) == (nearest_black_hole["x"] // block_size, nearest_black_hole["y"] // block_size):
                     black_holes[nearest_black_hole_index] = None
                     current_tactical_path = None
-
-                current_normal_path, normal_target_exp = find_nearest_enemy(game_graph, block_size, pygame.Vector2(enemy["x"], enemy["y"]), [pygame.Vector2(bh["x"], bh["y"]) for bh in black_holes if bh is not None])
+                    tactical_future = None
+
+                # The normal path is only drawn, so the previous one is kept until the new one is ready
+                normal_path_stats = SearchStats()
+                found, path, target = poll_path_to_nearest(game_graph, path_requests, "normal_path", normal_path_stats)
+                if found:
+                    SEARCH_PROFILER.record("enemy2_normal_path", normal_path_stats)
+                    current_normal_path, normal_target_exp = path, target
+                request_path_to_nearest(game_graph, block_size, path_requests, "normal_path", pygame.Vector2(enemy["x"], enemy["y"]), [pygame.Vector2(bh["x"], bh["y"]) for bh in black_holes if bh is not None], weight=HUNTER_SEARCH_WEIGHT, radius=ENEMY_RADIUS)
                 if not current_tactical_path:
-                    current_tactical_path, tactical_target_exp = find_nearest_target_and_evade_obstacles(game_graph, 
-                                                                                                     block_size, 
-                                                                                                     pygame.Vector2(enemy["x"], enemy["y"]), 
-                                                                                                     [pygame.Vector2(bh["x"], bh["y"]) for bh in black_holes if bh is not None],
-                                                                                                     player.get_position()
-                                                                                                    )
+                    # The tactical path is planned by the workers, the enemy waits for it on the next frames
+                    if tactical_future is None:
+                        tactical_future = submit_path_to_nearest(game_graph, 
+                                                                 block_size, 
+                                                                 path_workers, 
+                                                                 pygame.Vector2(enemy["x"], enemy["y"]), 
+                                                                 [pygame.Vector2(bh["x"], bh["y"]) for bh in black_holes if bh is not None],
+                                                                 player.get_position(),
+                                                                 HUNTER_SEARCH_WEIGHT
+                                                                )
+                    if tactical_future is not None:
+                        found, current_tactical_path, tactical_target_exp = path_to_nearest_from_future(game_graph, tactical_future)
+                        if found:
+                            SEARCH_PROFILER.record("tactical_hunter", tactical_future.stats())
+                            tactical_future = None
             
                 if current_tactical_path and len(current_tactical_path) > 0:
-                    next_node_tactical = current_tactical_path.pop(0).to_node
+                    next_node_tactical = current_tactical_path.advance()
                     target_x = next_node_tactical.x * block_size
                     target_y = next_node_tactical.y * block_size
 
@@ -566,9 +645,11 @@ while True:
                 enemy["is_attacking"] = False
                 # Find the path
                 if not persec_path:
-                    persec_path, persec_exp = find_nearest_enemy(game_graph, block_size, pygame.Vector2(enemy["x"], enemy["y"]), [player.get_position()])
+                    with SEARCH_PROFILER.measure("enemy2_pursuit") as stats:
+                        persec_path = get_flow_field_path(game_graph, block_size, enemy_flow_field, pygame.Vector2(enemy["x"], enemy["y"]), stats)
+                    persec_exp = player.get_position() if persec_path else None
                 if persec_path:
-                    next_node = persec_path.pop(0).to_node
+                    next_node = persec_path.advance()
                     target_x = next_node.x * block_size
                     target_y = next_node.y * block_size
 
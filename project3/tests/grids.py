@@ -0,0 +1,70 @@
+from collections import deque
+from typing import Dict, List
+import pygame
+from utils.game_graph import GameGraph
+from utils.walkability_grid import WalkabilityGrid
+
+# '.' is a walkable tile and '#' a blocked one. The two tiles at the top right are walled in.
+MAZE: List[str] = [
+    "################",
+    "#....#.......#.#",
+    "#.##.#.#####.#.#",
+    "#.#..#.#...#.###",
+    "#.#.##.#.#.#...#",
+    "#.#....#.#.###.#",
+    "#.######.#.....#",
+    "#........#.###.#",
+    "#.######.#.#...#",
+    "#......#...#.#.#",
+    "################",
+]
+
+OPEN: List[str] = [
+    "############",
+    "#..........#",
+    "#..........#",
+    "#....##....#",
+    "#....##....#",
+    "#..........#",
+    "#..........#",
+    "############",
+]
+
+def grid_from_rows(rows: List[str]) -> WalkabilityGrid:
+    grid = WalkabilityGrid(len(rows[0]), len(rows), bytearray(tile == "." for row in rows for tile in row))
+    grid.label_components()
+    return grid
+
+def graph_from_rows(rows: List[str], block_size: int = 8, implicit: bool = False) -> GameGraph:
+    # A single bright pixel on the point of a tile blocks that tile and none of its neighbours
+    surface = pygame.Surface((len(rows[0]) * block_size, len(rows) * block_size))
+    surface.fill((0, 0, 0))
+    for y, row in enumerate(rows):
+        for x, tile in enumerate(row):
+            if tile == "#":
+                surface.set_at((x * block_size, y * block_size), (255, 255, 255))
+    return GameGraph(surface, block_size, implicit=implicit)
+
+def walkable_tiles(grid: WalkabilityGrid) -> List[int]:
+    return [index for index in range(len(grid)) if grid.walkable[index]]
+
+def bfs_distances(grid: WalkabilityGrid, start: int) -> Dict[int, int]:
+    # Plain breadth first search, the reference every engine is compared with
+    distances: Dict[int, int] = {start: 0}
+    frontier = deque([start])
+    while frontier:
+        current: int = frontier.popleft()
+        x, y = grid.coordinates(current)
+        for neighbor_x, neighbor_y in ((x, y + 1), (x + 1, y), (x, y - 1), (x - 1, y)):
+            neighbor: int = grid.index(neighbor_x, neighbor_y)
+            if grid.is_walkable(neighbor_x, neighbor_y) and neighbor not in distances:
+                distances[neighbor] = distances[current] + 1
+                frontier.append(neighbor)
+    return distances
+
+def assert_valid_path(grid: WalkabilityGrid, path: List[int], start: int, goal: int):
+    assert path[0] == start and path[-1] == goal
+    for a, b in zip(path, path[1:]):
+        assert grid.walkable[b]
+        (ax, ay), (bx, by) = grid.coordinates(a), grid.coordinates(b)
+        assert abs(ax - bx) + abs(ay - by) == 1
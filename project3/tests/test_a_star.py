@@ -0,0 +1,93 @@
+import heapq
+import pytest
+from grids import MAZE, bfs_distances, graph_from_rows, walkable_tiles
+from utils.a_star import ClosedList, NodeRecord, PathfindingList, pathfind_astar
+from utils.dijkstra import pathfind_dijkstra
+from utils.manhattan_heuristic import ManhattanHeuristic
+from utils.node import Node
+from utils.search_stats import SearchStats
+from utils.tactical_a_star import pathfind_tactical_astar
+from utils.threat_field import ThreatField
+
+def test_open_list_pops_the_cheapest_current_record():
+    records = [NodeRecord(Node(name), estimated_total_cost=cost) for name, cost in (("a", 5), ("b", 3), ("c", 4))]
+    open_list = PathfindingList()
+    for record in records:
+        open_list.add(record)
+    assert open_list.smallest_element() is records[1]
+    # Refreshing a record replaces its old entry instead of adding a second record
+    records[0].estimated_total_cost = 1
+    open_list.add(records[0])
+    assert len(open_list) == 3
+    assert open_list.smallest_element() is records[0]
+    open_list.remove(records[0])
+    open_list.remove(records[1])
+    assert open_list.smallest_element() is records[2]
+    open_list.remove(records[2])
+    with pytest.raises(ValueError):
+        open_list.smallest_element()
+
+def test_closed_list_only_indexes_records():
+    record = NodeRecord(Node("a"), cost_so_far=2)
+    closed_list = ClosedList()
+    closed_list.add(record)
+    assert closed_list.contains(record.node) and closed_list.find(record.node) is record
+    assert not hasattr(closed_list, "_heap")
+    # Removing a record that was replaced in the list leaves the new one alone
+    closed_list.remove(NodeRecord(record.node))
+    assert closed_list.find(record.node) is record
+    closed_list.remove(record)
+    assert len(closed_list) == 0
+
+def test_astar_and_dijkstra_paths_are_shortest():
+    graph = graph_from_rows(MAZE)
+    for start in walkable_tiles(graph.grid)[::6]:
+        distances = bfs_distances(graph.grid, start)
+        for goal in walkable_tiles(graph.grid)[::2]:
+            start_node, goal_node = graph.node_at(start), graph.node_at(goal)
+            astar_path = pathfind_astar(graph, start_node, goal_node, ManhattanHeuristic(goal_node))
+            dijkstra_path = pathfind_dijkstra(graph, start_node, goal_node)
+            if goal not in distances:
+                assert astar_path is None and dijkstra_path is None
+            else:
+                assert len(astar_path) == len(dijkstra_path) == distances[goal]
+
+def tactical_costs(graph, start, threat):
+    # Brute force Dijkstra over the tactical cost of entering every tile
+    costs = {start: 0.0}
+    frontier = [(0.0, start)]
+    while frontier:
+        cost, current = heapq.heappop(frontier)
+        if cost > costs[current]:
+            continue
+        for neighbor in graph.grid.neighbors(current):
+            neighbor_cost = cost + 1 + threat.threat[neighbor]
+            if neighbor_cost < costs.get(neighbor, float("inf")):
+                costs[neighbor] = neighbor_cost
+                heapq.heappush(frontier, (neighbor_cost, neighbor))
+    return costs
+
+def test_tactical_paths_have_the_lowest_threat_cost():
+    graph = graph_from_rows(MAZE)
+    player = graph.grid.index(8, 7)
+    threat = ThreatField()
+    threat.update(graph.grid, [player])
+    start = graph.grid.index(1, 1)
+    costs = tactical_costs(graph, start, threat)
+    for goal in (graph.grid.index(12, 9), graph.grid.index(14, 5), graph.grid.index(10, 1)):
+        goal_node = graph.node_at(goal)
+        path = pathfind_tactical_astar(graph, graph.node_at(start), goal_node, ManhattanHeuristic(goal_node), graph.node_at(player), threat)
+        assert path[-1].to_node is goal_node
+        assert sum(1 + threat.threat_at(connection.to_node) for connection in path) == pytest.approx(costs[goal])
+
+def test_weighted_paths_stay_within_the_reported_bound():
+    graph = graph_from_rows(MAZE)
+    start = walkable_tiles(graph.grid)[0]
+    distances = bfs_distances(graph.grid, start)
+    for weight in (1.5, 3.0):
+        for goal in list(distances)[::4]:
+            goal_node = graph.node_at(goal)
+            stats = SearchStats()
+            path = pathfind_astar(graph, graph.node_at(start), goal_node, ManhattanHeuristic(goal_node), weight, stats)
+            assert 1 <= stats.suboptimality_bound <= weight
+            assert len(path) <= stats.suboptimality_bound * distances[goal] + 1e-9
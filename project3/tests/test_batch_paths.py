@@ -0,0 +1,46 @@
+import random
+import pytest
+from grids import MAZE, assert_valid_path, graph_from_rows, walkable_tiles
+from utils.batch_paths import batch_shortest_paths
+from utils.grid_a_star import pathfind_grid_astar
+
+def random_queries(grid, count, seed):
+    rng = random.Random(seed)
+    tiles = walkable_tiles(grid) + [grid.index(2, 2)]
+    starts = [rng.choice(tiles[:8]) for _ in range(count)]
+    goals = [rng.choice(tiles) for _ in range(count)]
+    return starts, goals
+
+def test_answers_match_single_searches():
+    grid = graph_from_rows(MAZE).grid
+    starts, goals = random_queries(grid, 200, seed=3)
+    result = batch_shortest_paths(grid, starts, goals, with_paths=True)
+    assert len(result) == 200
+    for start, goal, length, path in zip(starts, goals, result.lengths, result.paths):
+        tiles = pathfind_grid_astar(grid, start, goal)
+        if tiles is None:
+            assert length == -1 and path is None
+        else:
+            assert length == len(tiles) - 1
+            assert_valid_path(grid, list(path), start, goal)
+
+def test_repeated_pairs_are_solved_once():
+    grid = graph_from_rows(MAZE).grid
+    a, b, c = grid.index(1, 1), grid.index(12, 9), grid.index(6, 3)
+    result = batch_shortest_paths(grid, [a, a, c, a], [b, b, b, c], with_paths=True)
+    assert (result.unique_pairs, result.sources) == (3, 2)
+    assert result.paths[0] is result.paths[1]
+
+def test_worker_processes_give_the_same_answers():
+    grid = graph_from_rows(MAZE).grid
+    starts, goals = random_queries(grid, 120, seed=5)
+    local = batch_shortest_paths(grid, starts, goals, with_paths=True)
+    pooled = batch_shortest_paths(grid, starts, goals, with_paths=True, workers=2)
+    assert pooled.lengths == local.lengths and pooled.paths == local.paths
+
+def test_lengths_only_and_mismatched_queries():
+    grid = graph_from_rows(MAZE).grid
+    result = batch_shortest_paths(grid, [grid.index(1, 1)], [grid.index(14, 1)])
+    assert list(result.lengths) == [-1] and result.paths is None
+    with pytest.raises(ValueError):
+        batch_shortest_paths(grid, [1, 2], [3])
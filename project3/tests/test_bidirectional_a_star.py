@@ -0,0 +1,59 @@
+import random
+import pytest
+from grids import MAZE, bfs_distances, graph_from_rows, walkable_tiles
+from utils.a_star import Heuristic
+from utils.bidirectional_a_star import pathfind_bidirectional_astar
+from utils.dijkstra import pathfind_dijkstra
+from utils.graph import Graph
+from utils.manhattan_heuristic import ManhattanHeuristic
+from utils.node import Node
+from utils.search_stats import SearchStats
+
+class NoHeuristic(Heuristic):
+    def estimate_between(self, from_node, to_node):
+        return 0
+
+def assert_joined(path, start, goal):
+    assert path[0].from_node is start and path[-1].to_node is goal
+    for before, after in zip(path, path[1:]):
+        assert before.to_node is after.from_node
+
+def test_maze_paths_are_shortest():
+    graph = graph_from_rows(MAZE)
+    for start in walkable_tiles(graph.grid)[::5]:
+        distances = bfs_distances(graph.grid, start)
+        for goal in walkable_tiles(graph.grid)[1::3]:
+            start_node, goal_node = graph.node_at(start), graph.node_at(goal)
+            path = pathfind_bidirectional_astar(graph, start_node, goal_node, ManhattanHeuristic(goal_node))
+            if goal not in distances:
+                assert path is None
+            elif start == goal:
+                assert path == []
+            else:
+                assert len(path) == distances[goal]
+                assert_joined(path, start_node, goal_node)
+
+def test_one_way_connections_cost_the_same_as_dijkstra():
+    rng = random.Random(7)
+    nodes = [Node(str(name)) for name in range(40)]
+    graph = Graph()
+    for _ in range(120):
+        from_node, to_node = rng.sample(nodes, 2)
+        graph.add_connection(from_node, to_node, rng.randint(1, 9))
+    for _ in range(60):
+        start, goal = rng.sample(nodes, 2)
+        path = pathfind_bidirectional_astar(graph, start, goal, NoHeuristic(goal))
+        expected = pathfind_dijkstra(graph, start, goal)
+        if expected is None:
+            assert path is None
+        else:
+            assert_joined(path, start, goal)
+            assert sum(c.get_cost() for c in path) == pytest.approx(sum(c.get_cost() for c in expected))
+
+def test_stats_count_both_searches():
+    graph = graph_from_rows(MAZE)
+    start, goal = graph.node_at(graph.grid.index(1, 1)), graph.node_at(graph.grid.index(12, 9))
+    stats = SearchStats()
+    path = pathfind_bidirectional_astar(graph, start, goal, ManhattanHeuristic(goal), stats)
+    assert stats.reached and stats.path_length == len(path)
+    assert stats.nodes_expanded > 0 and stats.edges_relaxed >= stats.nodes_expanded and stats.peak_open >= 2
@@ -0,0 +1,61 @@
+import pytest
+from grids import MAZE, assert_valid_path, graph_from_rows
+from utils.compact_path import CompactPath
+from utils.grid_a_star import pathfind_grid_astar
+
+def hops(path):
+    return [((c.from_node.x, c.from_node.y), (c.to_node.x, c.to_node.y)) for c in path]
+
+def maze_path():
+    graph = graph_from_rows(MAZE)
+    tiles = pathfind_grid_astar(graph.grid, graph.grid.index(1, 1), graph.grid.index(12, 9))
+    return graph, tiles, CompactPath(graph, tiles)
+
+def test_behaves_like_the_list_of_connections():
+    graph, tiles, path = maze_path()
+    connections = graph.connections_for_tiles(tiles)
+    path.pop(0)
+    connections.pop(0)
+    path.advance(2)
+    del connections[:2]
+    assert len(path) == len(connections)
+    assert hops(path) == hops(connections)
+    assert hops([path[-1]]) == hops([connections[-1]])
+    for start in range(-3, len(connections) + 2):
+        for stop in (None, start + 1, start + 4, -1):
+            assert hops(path[start:stop]) == hops(connections[start:stop])
+    with pytest.raises(IndexError):
+        path[len(connections)]
+    with pytest.raises(ValueError):
+        path[::2]
+
+def test_following_the_path_to_its_end():
+    graph, tiles, path = maze_path()
+    assert path.next_node() is graph.node_at(tiles[1])
+    assert path.advance(len(tiles) + 5) is graph.node_at(tiles[-1])
+    assert len(path) == 0 and path.next_node() is None and path.advance() is None
+    with pytest.raises(IndexError):
+        path.pop()
+    assert list(path.remaining_tiles()) == [tiles[-1]]
+
+def test_repairing_from_the_first_blocked_hop():
+    graph, tiles, path = maze_path()
+    path.advance(3)
+    assert path.first_blocked(graph.grid) is None
+    blocked = tiles[10]
+    x, y = graph.grid.coordinates(blocked)
+    graph.set_walkable(x, y, False)
+    hop = path.first_blocked(graph.grid)
+    assert path.remaining_tiles()[hop + 1] == blocked
+    detour = pathfind_grid_astar(graph.grid, path.remaining_tiles()[hop], tiles[-1])
+    repaired = path.repaired(hop, detour)
+    assert repaired.first_blocked(graph.grid) is None
+    assert list(repaired.remaining_tiles()[:hop + 1]) == list(path.remaining_tiles()[:hop + 1])
+    assert_valid_path(graph.grid, list(repaired.remaining_tiles()), tiles[3], tiles[-1])
+
+def test_round_trip_through_connections_and_points():
+    graph, tiles, path = maze_path()
+    rebuilt = CompactPath.from_connections(graph, path.to_connections())
+    assert list(rebuilt.tiles) == tiles
+    assert rebuilt.points(8)[0] == (8, 8) and rebuilt.points(8)[-1] == (12 * 8, 9 * 8)
+    assert len(CompactPath.from_connections(graph, [])) == 0
@@ -0,0 +1,96 @@
+import multiprocessing
+import pickle
+import random
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import pytest
+from grids import MAZE, graph_from_rows, walkable_tiles
+from utils.csr_graph import CSRGraph
+from utils.csr_search import pathfind_csr_astar
+from utils.dijkstra import pathfind_dijkstra
+from utils.graph import Graph
+from utils.node import Node
+
+def random_graph(seed):
+    rng = random.Random(seed)
+    nodes = [Node(str(name)) for name in range(30)]
+    graph = Graph()
+    for _ in range(90):
+        from_node, to_node = rng.sample(nodes, 2)
+        graph.add_connection(from_node, to_node, rng.randint(1, 9))
+    return graph
+
+def adjacency(csr):
+    return [[(csr.nodes[csr.targets[edge]], csr.costs[edge]) for edge in csr.neighbors(number)] for number in range(len(csr))]
+
+def test_frozen_graphs_keep_every_connection_in_order():
+    graph = random_graph(1)
+    csr = graph.freeze()
+    for number, node in enumerate(csr.nodes):
+        assert csr.index[node] == number
+        assert adjacency(csr)[number] == [(c.to_node, c.get_cost()) for c in graph.get_connections(node)]
+
+def test_searches_cost_the_same_as_dijkstra():
+    graph = random_graph(2)
+    csr = graph.freeze()
+    rng = random.Random(2)
+    for _ in range(40):
+        start, goal = rng.sample(csr.nodes, 2)
+        numbers = pathfind_csr_astar(csr, csr.index[start], csr.index[goal])
+        expected = pathfind_dijkstra(graph, start, goal)
+        if expected is None:
+            assert numbers is None
+        else:
+            path = csr.connections_for_path(numbers)
+            assert path[0].from_node is start and path[-1].to_node is goal
+            assert sum(c.get_cost() for c in path) == sum(c.get_cost() for c in expected)
+
+def test_game_graphs_number_every_walkable_tile():
+    graph = graph_from_rows(MAZE)
+    csr = graph.freeze()
+    assert len(csr) == len(walkable_tiles(graph.grid))
+    # The sealed pocket has connections only between its two tiles
+    pocket = csr.index[graph.nodes[(14, 1)]]
+    assert [csr.nodes[csr.targets[edge]] for edge in csr.neighbors(pocket)] == [graph.nodes[(14, 2)]]
+
+def test_local_graphs_pickle_their_arrays():
+    csr = random_graph(3).freeze()
+    copy = pickle.loads(pickle.dumps(csr))
+    assert copy.memory is None
+    assert [[(node.name, cost) for node, cost in row] for row in adjacency(copy)] == [[(node.name, cost) for node, cost in row] for row in adjacency(csr)]
+
+def test_shared_graphs_pickle_only_the_name_of_the_block():
+    csr = graph_from_rows(MAZE).freeze()
+    shared = csr.share()
+    try:
+        local_size = len(pickle.dumps(csr))
+        data = pickle.dumps(shared)
+        assert len(data) < local_size
+        copy = pickle.loads(data)
+        assert copy.memory.name == shared.memory.name
+        assert list(copy.targets) == list(csr.targets) and list(copy.costs) == list(csr.costs)
+        copy.close()
+    finally:
+        shared.close()
+        shared.unlink()
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=shared.memory.name)
+
+def search_in_worker(csr, start, goal):
+    return pathfind_csr_astar(csr, start, goal), csr.memory is not None
+
+def test_workers_search_the_shared_arrays():
+    if "fork" not in multiprocessing.get_all_start_methods():
+        pytest.skip("needs forked workers")
+    graph = graph_from_rows(MAZE)
+    csr = graph.freeze()
+    shared = csr.share()
+    start, goal = csr.index[graph.nodes[(1, 1)]], csr.index[graph.nodes[(12, 9)]]
+    try:
+        with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context("fork")) as executor:
+            numbers, attached = executor.submit(search_in_worker, shared, start, goal).result()
+        assert attached
+        assert numbers == pathfind_csr_astar(csr, start, goal)
+    finally:
+        shared.close()
+        shared.unlink()
@@ -0,0 +1,77 @@
+import pygame
+from grids import MAZE, OPEN, bfs_distances, graph_from_rows, walkable_tiles
+from utils.flow_field import FlowField
+from utils.game import find_nearest_enemy_with_flow_field, get_flow_field_path, update_flow_field
+
+BLOCK_SIZE = 8
+
+def position(x, y):
+    return pygame.Vector2(x * BLOCK_SIZE + 1, y * BLOCK_SIZE + 1)
+
+def test_distances_match_bfs_from_the_target():
+    graph = graph_from_rows(MAZE)
+    field = FlowField(graph)
+    target = graph.grid.index(8, 7)
+    field.update(target)
+    distances = bfs_distances(graph.grid, target)
+    for tile in walkable_tiles(graph.grid):
+        if tile in distances:
+            path = field.path_from(tile)
+            assert field.distance(tile) == distances[tile] == len(path) - 1
+            assert path[-1] == target
+        else:
+            assert field.distance(tile) == float("inf") and field.path_from(tile) is None
+
+def test_rebuilds_only_when_the_target_changes_tile_or_the_graph_is_edited():
+    graph = graph_from_rows(MAZE)
+    field = FlowField(graph)
+    assert update_flow_field(graph, BLOCK_SIZE, field, position(1, 1))
+    assert not update_flow_field(graph, BLOCK_SIZE, field, position(1, 1) + pygame.Vector2(3, 3))
+    assert update_flow_field(graph, BLOCK_SIZE, field, position(1, 2))
+    graph.set_walkable(4, 1, False)
+    assert update_flow_field(graph, BLOCK_SIZE, field, position(1, 2))
+    assert field.rebuilds == 3
+
+def test_unbuilt_field_gives_no_path():
+    graph = graph_from_rows(MAZE)
+    field = FlowField(graph)
+    assert find_nearest_enemy_with_flow_field(graph, BLOCK_SIZE, field, [position(12, 9)]) == (None, None)
+    assert get_flow_field_path(graph, BLOCK_SIZE, field, position(12, 9)) is None
+
+def test_target_on_a_blocked_tile_clears_the_field():
+    graph = graph_from_rows(MAZE)
+    field = FlowField(graph)
+    update_flow_field(graph, BLOCK_SIZE, field, position(1, 1))
+    assert get_flow_field_path(graph, BLOCK_SIZE, field, position(12, 9)) is not None
+    # The player steps onto a wall tile: nothing may keep chasing the tile it left
+    assert not update_flow_field(graph, BLOCK_SIZE, field, position(2, 2))
+    assert field.target is None
+    assert get_flow_field_path(graph, BLOCK_SIZE, field, position(12, 9)) is None
+    assert find_nearest_enemy_with_flow_field(graph, BLOCK_SIZE, field, [position(12, 9)]) == (None, None)
+    assert update_flow_field(graph, BLOCK_SIZE, field, position(1, 1))
+
+def test_nearest_enemy_is_read_from_the_field():
+    graph = graph_from_rows(MAZE)
+    field = FlowField(graph)
+    update_flow_field(graph, BLOCK_SIZE, field, position(1, 1))
+    distances = bfs_distances(graph.grid, graph.grid.index(1, 1))
+    enemies = [position(12, 9), position(6, 3), position(14, 1), None]
+    path, enemy = find_nearest_enemy_with_flow_field(graph, BLOCK_SIZE, field, enemies)
+    assert enemy is enemies[1]
+    assert len(path) == distances[graph.grid.index(6, 3)]
+    assert (path[0].from_node.x, path[0].from_node.y) == (1, 1)
+    assert (path[-1].to_node.x, path[-1].to_node.y) == (6, 3)
+
+def test_fields_with_a_radius_follow_its_layer():
+    graph = graph_from_rows(OPEN)
+    field = FlowField(graph, 8)
+    layer = graph.layer(8)
+    assert update_flow_field(graph, BLOCK_SIZE, field, position(2, 2))
+    distances = bfs_distances(layer, layer.index(2, 2))
+    for tile in walkable_tiles(graph.grid):
+        assert field.distance(tile) == distances.get(tile, float("inf"))
+    assert len(get_flow_field_path(graph, BLOCK_SIZE, field, position(3, 5))) == 4
+    # Tiles the agent does not fit in give no path, like blocked ones
+    assert get_flow_field_path(graph, BLOCK_SIZE, field, position(1, 5)) is None
+    assert not update_flow_field(graph, BLOCK_SIZE, field, position(1, 1))
+    assert field.target is None
@@ -0,0 +1,64 @@
+import random
+import pygame
+import pytest
+from grids import MAZE, OPEN, assert_valid_path, bfs_distances, graph_from_rows, grid_from_rows, walkable_tiles
+from utils.game_graph import GameGraph
+from utils.grid_a_star import pathfind_grid_astar
+
+@pytest.mark.parametrize("rows", [MAZE, OPEN])
+def test_graph_matches_its_rows(rows):
+    graph = graph_from_rows(rows)
+    assert graph.grid.walkable == grid_from_rows(rows).walkable
+    # The window of has_obstacle is the layer of half a block
+    assert graph.layer(graph.block_size // 2).walkable == graph.grid.walkable
+
+def test_unblocked_tiles_still_need_the_room_of_the_agent():
+    graph = graph_from_rows(OPEN)
+    # Next to the pillar, walkable for small agents only
+    x, y = 4, 3
+    index = graph.grid.index(x, y)
+    assert graph.layer(4).walkable[index] and not graph.layer(8).walkable[index]
+    graph.set_walkable(x, y, False)
+    assert not graph.layer(4).walkable[index] and not graph.layer(8).walkable[index]
+    graph.set_walkable(x, y, True)
+    assert graph.grid.walkable[index]
+    assert graph.layer(4).walkable[index] and not graph.layer(8).walkable[index]
+
+def test_blocked_tiles_leave_every_layer():
+    graph = graph_from_rows(OPEN)
+    x, y = 2, 2
+    index = graph.grid.index(x, y)
+    assert graph.layer(8).walkable[index]
+    graph.set_walkable(x, y, False)
+    for radius in (2, 4, 8):
+        assert not graph.layer(radius).walkable[index]
+    graph.set_walkable(x, y, True)
+    assert graph.layer(8).walkable[index]
+
+def test_layer_paths_are_as_short_as_bfs():
+    graph = graph_from_rows(OPEN)
+    graph.set_walkable(3, 4, False)
+    layer = graph.layer(8)
+    for start in walkable_tiles(layer):
+        distances = bfs_distances(layer, start)
+        for goal in walkable_tiles(layer):
+            path = pathfind_grid_astar(layer, start, goal)
+            if goal not in distances:
+                assert path is None
+                continue
+            assert_valid_path(layer, path, start, goal)
+            assert len(path) - 1 == distances[goal]
+
+@pytest.mark.parametrize("block_size", [5, 8, 9])
+def test_walkable_tiles_match_the_pixel_checks(block_size):
+    rng = random.Random(block_size)
+    surface = pygame.Surface((83, 61))
+    surface.fill((0, 0, 0))
+    for _ in range(40):
+        # Pixels with a dark channel do not collide, so they must not block anything either
+        color = rng.choice([(255, 255, 255), (30, 200, 90), (255, 0, 255), (0, 0, 0)])
+        surface.set_at((rng.randrange(83), rng.randrange(61)), color)
+    graph = GameGraph(surface, block_size)
+    for index in range(len(graph.grid)):
+        x, y = graph.grid.coordinates(index)
+        assert graph.grid.walkable[index] == (not graph.is_wall(x, y) and not graph.has_obstacle(x, y))
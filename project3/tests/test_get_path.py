@@ -0,0 +1,47 @@
+import pytest
+from grids import MAZE, graph_from_rows
+from utils import game
+from utils.game import get_path
+from utils.path_cache import PathCache
+
+BLOCK_SIZE = 8
+
+def spy(calls, name, search):
+    def wrapper(*args, **kwargs):
+        calls.append(name)
+        return search(*args, **kwargs)
+    return wrapper
+
+@pytest.fixture
+def calls(monkeypatch):
+    calls = []
+    monkeypatch.setitem(game.GRID_SEARCHES, "astar", spy(calls, "grid", game.GRID_SEARCHES["astar"]))
+    monkeypatch.setitem(game.GRAPH_SEARCHES, "astar", spy(calls, "graph", game.GRAPH_SEARCHES["astar"]))
+    return calls
+
+def test_the_node_graph_is_searched_unless_flat_is_set(calls):
+    graph = graph_from_rows(MAZE)
+    graph_path = get_path(graph, BLOCK_SIZE, 8, 8, 12 * 8, 9 * 8, cache=None)
+    grid_path = get_path(graph, BLOCK_SIZE, 8, 8, 12 * 8, 9 * 8, flat=True, cache=None)
+    assert calls == ["graph", "grid"]
+    assert len(graph_path) == len(grid_path)
+    assert [(c.to_node.x, c.to_node.y) for c in grid_path][-1] == (12, 9)
+
+def test_cached_paths_are_kept_apart_by_engine(calls):
+    graph = graph_from_rows(MAZE)
+    cache = PathCache(capacity=8)
+    get_path(graph, BLOCK_SIZE, 8, 8, 12 * 8, 9 * 8, cache=cache)
+    get_path(graph, BLOCK_SIZE, 8, 8, 12 * 8, 9 * 8, flat=True, cache=cache)
+    get_path(graph, BLOCK_SIZE, 8, 8, 12 * 8, 9 * 8, cache=cache)
+    assert calls == ["graph", "grid"]
+
+def test_options_are_keyword_only():
+    graph = graph_from_rows(MAZE)
+    with pytest.raises(TypeError):
+        get_path(graph, BLOCK_SIZE, 8, 8, 12 * 8, 9 * 8, True)
+
+def test_layers_need_the_flat_engine():
+    graph = graph_from_rows(MAZE)
+    with pytest.raises(ValueError):
+        get_path(graph, BLOCK_SIZE, 8, 8, 12 * 8, 9 * 8, radius=4)
+    assert get_path(graph, BLOCK_SIZE, 8, 8, 12 * 8, 9 * 8, flat=True, radius=4, cache=None)
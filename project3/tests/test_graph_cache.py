@@ -0,0 +1,69 @@
+import struct
+import pygame
+from grids import MAZE
+from utils.game_graph import GameGraph
+from utils.graph_cache import GraphCache
+
+BLOCK_SIZE = 8
+
+def maze_surface():
+    surface = pygame.Surface((len(MAZE[0]) * BLOCK_SIZE, len(MAZE) * BLOCK_SIZE))
+    surface.fill((0, 0, 0))
+    for y, row in enumerate(MAZE):
+        for x, tile in enumerate(row):
+            if tile == "#":
+                surface.set_at((x * BLOCK_SIZE, y * BLOCK_SIZE), (255, 255, 255))
+    return surface
+
+def edges(graph):
+    return sorted(((c.from_node.x, c.from_node.y), (c.to_node.x, c.to_node.y)) for node in graph.nodes.values() for c in graph.get_connections(node))
+
+def test_loaded_graphs_match_built_ones(tmp_path, monkeypatch):
+    cache = GraphCache(str(tmp_path / "navgraph.cache"), b"k" * 32)
+    built = GameGraph(maze_surface(), BLOCK_SIZE, cache=cache)
+    # A second graph must not look at the pixels at all
+    def from_pixels(self):
+        raise AssertionError("the graph was built from the pixels")
+    monkeypatch.setattr(GameGraph, "find_walkable_tiles", from_pixels)
+    loaded = GameGraph(maze_surface(), BLOCK_SIZE, cache=cache)
+    assert loaded.grid.walkable == built.grid.walkable
+    assert loaded.grid.components == built.grid.components
+    assert edges(loaded) == edges(built)
+    assert not (tmp_path / "navgraph.cache.tmp").exists()
+
+def test_stale_files_are_misses(tmp_path):
+    path = str(tmp_path / "navgraph.cache")
+    cache = GraphCache(path, b"k" * 32)
+    GameGraph(maze_surface(), BLOCK_SIZE, cache=cache)
+    width, height = len(MAZE[0]), len(MAZE)
+    assert cache.read(width, height) is not None
+    assert GraphCache(path, b"x" * 32).read(width, height) is None
+    assert cache.read(width + 1, height) is None
+    with open(path, "rb") as file:
+        data = file.read()
+    # Truncated files, and files written with another layout
+    with open(path, "wb") as file:
+        file.write(data[:-1])
+    assert cache.read(width, height) is None
+    with open(path, "wb") as file:
+        file.write(data[:4] + struct.pack("<H", 99) + data[6:])
+    assert cache.read(width, height) is None
+    with open(path, "wb"):
+        pass
+    assert cache.read(width, height) is None
+    assert GraphCache(str(tmp_path / "missing.cache"), b"k" * 32).read(width, height) is None
+
+def test_unwritable_caches_are_ignored(tmp_path):
+    cache = GraphCache(str(tmp_path / "missing" / "navgraph.cache"), b"k" * 32)
+    graph = GameGraph(maze_surface(), BLOCK_SIZE, cache=cache)
+    assert len(graph.nodes) > 0
+
+def test_keys_change_with_the_map_settings(tmp_path):
+    image = tmp_path / "map.bmp"
+    pygame.image.save(maze_surface(), str(image))
+    key = GraphCache.for_image(str(image), 1.5, 40).key
+    assert GraphCache.for_image(str(image), 1.5, 40).key == key
+    assert GraphCache.for_image(str(image), 1.25, 40).key != key
+    assert GraphCache.for_image(str(image), 1.5, 32).key != key
+    pygame.image.save(pygame.Surface((8, 8)), str(image))
+    assert GraphCache.for_image(str(image), 1.5, 40).key != key
@@ -0,0 +1,54 @@
+from grids import MAZE, OPEN, assert_valid_path, bfs_distances, graph_from_rows, walkable_tiles
+from utils.hierarchical_pathfinding import HierarchicalGraph
+
+def test_refined_paths_join_every_reachable_pair():
+    for rows in (MAZE, OPEN):
+        graph = graph_from_rows(rows)
+        hierarchy = HierarchicalGraph(graph, cluster_size=4)
+        for start in walkable_tiles(graph.grid)[::3]:
+            distances = bfs_distances(graph.grid, start)
+            for goal in walkable_tiles(graph.grid)[::2]:
+                path = hierarchy.find_path(start, goal)
+                if goal not in distances:
+                    assert path is None
+                    continue
+                tiles = path.tiles()
+                assert_valid_path(graph.grid, tiles, start, goal)
+                # Paths go through the entrances, so they may be longer than the shortest ones
+                assert len(tiles) - 1 >= distances[goal]
+
+def test_segments_are_refined_one_at_a_time():
+    graph = graph_from_rows(MAZE)
+    hierarchy = HierarchicalGraph(graph, cluster_size=4)
+    start, goal = graph.grid.index(1, 1), graph.grid.index(12, 9)
+    path = hierarchy.find_path(start, goal)
+    waypoints = len(path)
+    tiles = [start]
+    while len(path) > 0:
+        segment = path.next_segment()
+        assert segment[0] == tiles[-1]
+        tiles.extend(segment[1:])
+        waypoints -= 1
+        assert len(path) == waypoints
+    assert path.next_segment() == []
+    assert_valid_path(graph.grid, tiles, start, goal)
+
+def test_open_room_paths_are_shortest_inside_a_cluster():
+    graph = graph_from_rows(OPEN)
+    hierarchy = HierarchicalGraph(graph, cluster_size=12)
+    start, goal = graph.grid.index(1, 1), graph.grid.index(10, 6)
+    assert len(hierarchy.find_path(start, goal).tiles()) - 1 == bfs_distances(graph.grid, start)[goal]
+
+def test_edits_rebuild_the_abstract_graph():
+    graph = graph_from_rows(OPEN)
+    hierarchy = HierarchicalGraph(graph, cluster_size=4)
+    start, goal = graph.grid.index(1, 3), graph.grid.index(10, 3)
+    # Wall off the right side of the room except through the bottom row
+    for y in range(1, 6):
+        graph.set_walkable(8, y, False)
+    tiles = hierarchy.find_path(start, goal).tiles()
+    assert hierarchy.version == graph.version
+    assert_valid_path(graph.grid, tiles, start, goal)
+    assert graph.grid.index(8, 6) in tiles
+    graph.set_walkable(8, 6, False)
+    assert hierarchy.find_path(start, goal) is None
@@ -0,0 +1,58 @@
+from grids import MAZE, OPEN, graph_from_rows, walkable_tiles
+from utils.a_star import pathfind_astar
+from utils.game_graph import CONNECTION_POOL_SIZE
+from utils.manhattan_heuristic import ManhattanHeuristic
+
+def hops(connections):
+    return [((c.from_node.x, c.from_node.y), (c.to_node.x, c.to_node.y), c.get_cost()) for c in connections]
+
+def assert_same_adjacency(explicit, implicit, ordered=True):
+    assert sorted(explicit.nodes) == sorted(implicit.nodes)
+    for position, node in explicit.nodes.items():
+        other = implicit.nodes[position]
+        # Built graphs list them in the same order too, so searches break ties the same way.
+        # Edited stored graphs append the connections of added tiles at the end instead
+        if ordered:
+            assert hops(implicit.get_connections(other)) == hops(explicit.get_connections(node))
+        assert sorted(hops(implicit.get_connections(other))) == sorted(hops(explicit.get_connections(node)))
+        assert sorted(hops(implicit.get_reverse_connections(other))) == sorted(hops(explicit.get_reverse_connections(node)))
+
+def test_implicit_connections_match_the_stored_ones():
+    for rows in (MAZE, OPEN):
+        assert_same_adjacency(graph_from_rows(rows), graph_from_rows(rows, implicit=True))
+
+def test_edits_keep_both_graphs_in_step():
+    explicit, implicit = graph_from_rows(MAZE), graph_from_rows(MAZE, implicit=True)
+    for graph in (explicit, implicit):
+        # Read the neighbours once so the implicit graph has pooled lists to drop
+        for node in list(graph.nodes.values()):
+            graph.get_connections(node)
+    for x, y, walkable in ((4, 1, False), (2, 2, True), (7, 5, True), (1, 1, False), (4, 1, True)):
+        removed = implicit.nodes.get((x, y))
+        versions = (explicit.version, implicit.version)
+        explicit.set_walkable(x, y, walkable)
+        implicit.set_walkable(x, y, walkable)
+        # Searches and caches notice the edit on both graphs
+        assert explicit.version != versions[0] and implicit.version != versions[1]
+        assert_same_adjacency(explicit, implicit, ordered=False)
+        if removed is not None and not walkable:
+            assert implicit.get_connections(removed) == []
+
+def test_searches_find_the_same_paths():
+    explicit, implicit = graph_from_rows(MAZE), graph_from_rows(MAZE, implicit=True)
+    for start in walkable_tiles(explicit.grid)[::7]:
+        for goal in walkable_tiles(explicit.grid)[::5]:
+            paths = []
+            for graph in (explicit, implicit):
+                goal_node = graph.node_at(goal)
+                path = pathfind_astar(graph, graph.node_at(start), goal_node, ManhattanHeuristic(goal_node))
+                paths.append(None if path is None else hops(path))
+            assert paths[0] == paths[1]
+
+def test_implicit_graphs_store_no_connections():
+    implicit = graph_from_rows(OPEN, implicit=True)
+    assert implicit.connections == {} and implicit.reverse_connections == {}
+    for node in implicit.nodes.values():
+        implicit.get_connections(node)
+        implicit.get_reverse_connections(node)
+    assert len(implicit._connection_pool) <= CONNECTION_POOL_SIZE
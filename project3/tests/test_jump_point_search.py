@@ -0,0 +1,20 @@
+import pytest
+from grids import MAZE, OPEN, assert_valid_path, bfs_distances, grid_from_rows, walkable_tiles
+from utils.jump_point_search import pathfind_jps
+
+@pytest.mark.parametrize("rows", [MAZE, OPEN])
+def test_paths_are_as_short_as_bfs(rows):
+    grid = grid_from_rows(rows)
+    for start in walkable_tiles(grid)[::3]:
+        distances = bfs_distances(grid, start)
+        for goal in walkable_tiles(grid):
+            path = pathfind_jps(grid, start, goal)
+            if goal not in distances:
+                assert path is None
+                continue
+            assert_valid_path(grid, path, start, goal)
+            assert len(path) - 1 == distances[goal]
+
+def test_start_is_goal():
+    grid = grid_from_rows(OPEN)
+    assert pathfind_jps(grid, grid.index(3, 3), grid.index(3, 3)) == [grid.index(3, 3)]
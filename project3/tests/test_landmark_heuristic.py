@@ -0,0 +1,57 @@
+from grids import MAZE, OPEN, bfs_distances, graph_from_rows, walkable_tiles
+from utils.landmark_heuristic import LandmarkTable
+from utils.lpa_star import LPAStar
+
+def test_estimates_are_lower_bounds_that_see_the_walls():
+    graph = graph_from_rows(MAZE)
+    table = LandmarkTable.build(graph, count=4)
+    assert len(table.landmarks) == 4
+    beats_manhattan = False
+    for start in walkable_tiles(graph.grid):
+        distances = bfs_distances(graph.grid, start)
+        start_x, start_y = graph.grid.coordinates(start)
+        for goal, distance in distances.items():
+            estimate = table.estimate_index(start, goal)
+            assert estimate <= distance
+            goal_x, goal_y = graph.grid.coordinates(goal)
+            beats_manhattan |= estimate > abs(start_x - goal_x) + abs(start_y - goal_y)
+    assert beats_manhattan
+
+def test_tables_are_reused_only_for_the_same_map(tmp_path):
+    path = str(tmp_path / "landmarks.cache")
+    graph = graph_from_rows(MAZE)
+    table = LandmarkTable.load_or_build(path, graph, count=3)
+    loaded = LandmarkTable.load(path, graph)
+    assert loaded.landmarks == table.landmarks and loaded.distances == table.distances
+    assert loaded.is_valid(graph)
+    assert LandmarkTable.load(path, graph_from_rows(OPEN)) is None
+    assert LandmarkTable.load(str(tmp_path / "missing.cache"), graph) is None
+    graph.set_walkable(4, 1, False)
+    assert not loaded.is_valid(graph)
+
+def test_unwritable_files_still_give_a_table(tmp_path):
+    graph = graph_from_rows(MAZE)
+    table = LandmarkTable.load_or_build(str(tmp_path), graph, count=2)
+    assert len(table.landmarks) == 2
+
+def test_incremental_plans_with_landmarks_are_shortest():
+    graph = graph_from_rows(MAZE)
+    planner = LPAStar(graph, LandmarkTable.build(graph, count=4))
+    start = graph.grid.index(1, 1)
+    distances = bfs_distances(graph.grid, start)
+    for goal in walkable_tiles(graph.grid)[::3]:
+        path = planner.plan(start, goal)
+        assert (path is None) == (goal not in distances)
+        if path is not None:
+            assert len(path) - 1 == distances[goal]
+
+def test_edits_drop_the_landmarks_of_the_planner():
+    graph = graph_from_rows(MAZE)
+    planner = LPAStar(graph, LandmarkTable.build(graph, count=4))
+    start, goal = graph.grid.index(1, 1), graph.grid.index(12, 9)
+    planner.plan(start, goal)
+    # Opening a wall adds shortcuts the table does not know about
+    graph.set_walkable(5, 1, True)
+    path = planner.plan(start, goal)
+    assert planner.landmarks is None
+    assert len(path) - 1 == bfs_distances(graph.grid, start)[goal]
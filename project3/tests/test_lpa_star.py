@@ -0,0 +1,76 @@
+import pygame
+from grids import MAZE, OPEN, assert_valid_path, bfs_distances, graph_from_rows
+from utils.game import get_incremental_path
+from utils.lpa_star import LPAStar
+from utils.search_stats import SearchStats
+
+def assert_shortest(graph, path, start, goal):
+    distances = bfs_distances(graph.grid, start)
+    if goal not in distances:
+        assert path is None
+        return
+    assert_valid_path(graph.grid, path, start, goal)
+    assert len(path) - 1 == distances[goal]
+
+def test_replans_as_the_goal_moves():
+    graph = graph_from_rows(MAZE)
+    grid = graph.grid
+    planner = LPAStar(graph)
+    start = grid.index(1, 1)
+    # The goal walks along the bottom corridor and up the middle of the maze
+    route = [grid.index(x, 7) for x in range(1, 9)] + [grid.index(8, y) for y in (6, 5, 4, 3)] + [grid.index(9, 3), grid.index(10, 3)]
+    for goal in route:
+        assert grid.walkable[goal]
+        assert_shortest(graph, planner.plan(start, goal), start, goal)
+    assert planner.resets == 1
+
+def test_replans_after_tile_edits():
+    graph = graph_from_rows(OPEN)
+    grid = graph.grid
+    planner = LPAStar(graph)
+    start, goal = grid.index(1, 3), grid.index(10, 4)
+    assert_shortest(graph, planner.plan(start, goal), start, goal)
+    # Build a wall across the room leaving a gap on the bottom row, then close and reopen the gap
+    for y in range(1, 6):
+        graph.set_walkable(7, y, False)
+        assert_shortest(graph, planner.plan(start, goal), start, goal)
+    graph.set_walkable(7, 6, False)
+    assert planner.plan(start, goal) is None
+    graph.set_walkable(7, 6, True)
+    assert_shortest(graph, planner.plan(start, goal), start, goal)
+    graph.set_walkable(7, 3, True)
+    assert_shortest(graph, planner.plan(start, goal), start, goal)
+
+def test_follows_the_start_along_its_path():
+    graph = graph_from_rows(MAZE)
+    grid = graph.grid
+    planner = LPAStar(graph)
+    start, goal = grid.index(1, 1), grid.index(12, 9)
+    path = planner.plan(start, goal)
+    for position in path[1:6]:
+        assert_shortest(graph, planner.plan(position, goal), position, goal)
+
+def test_incremental_paths_report_every_counter():
+    graph = graph_from_rows(MAZE)
+    planner = LPAStar(graph)
+    stats = SearchStats()
+    path = get_incremental_path(graph, 8, planner, pygame.Vector2(9, 9), pygame.Vector2(12 * 8 + 1, 9 * 8 + 1), stats)
+    assert stats.reached and stats.path_length == len(path)
+    assert stats.nodes_expanded == planner.expansions > 0
+    assert stats.edges_relaxed == planner.relaxed >= planner.expansions
+    assert stats.peak_open == planner.peak_queue > 0
+    # Nothing changed, so the next plan is read from the tree
+    planner.plan(graph.grid.index(1, 1), graph.grid.index(12, 9))
+    assert (planner.expansions, planner.relaxed, planner.peak_queue) == (0, 0, 0)
+
+def test_planners_with_a_radius_search_its_layer():
+    graph = graph_from_rows(OPEN)
+    layer = graph.layer(8)
+    planner = LPAStar(graph, radius=8)
+    start = layer.index(2, 2)
+    for goal in (layer.index(3, 5), layer.index(2, 4), layer.index(3, 2)):
+        path = planner.plan(start, goal)
+        assert_valid_path(layer, path, start, goal)
+        assert len(path) - 1 == bfs_distances(layer, start)[goal]
+    assert planner.plan(start, layer.index(9, 2)) is None
+    assert get_incremental_path(graph, 8, planner, pygame.Vector2(17, 17), pygame.Vector2(9, 9)) is None
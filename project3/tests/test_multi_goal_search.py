@@ -0,0 +1,38 @@
+import random
+import pytest
+from grids import MAZE, OPEN, assert_valid_path, bfs_distances, grid_from_rows, walkable_tiles
+from utils.multi_goal_search import pathfind_grid_nearest_goal
+
+@pytest.mark.parametrize("rows", [MAZE, OPEN])
+def test_reaches_the_nearest_goal(rows):
+    grid = grid_from_rows(rows)
+    tiles = walkable_tiles(grid)
+    rng = random.Random(4)
+    for start in tiles[::4]:
+        distances = bfs_distances(grid, start)
+        goals = rng.sample(tiles, 4)
+        path, goal = pathfind_grid_nearest_goal(grid, start, goals)
+        reachable = [distances[candidate] for candidate in goals if candidate in distances]
+        if not reachable:
+            assert (path, goal) == (None, None)
+            continue
+        assert goal in goals
+        assert_valid_path(grid, path, start, goal)
+        assert len(path) - 1 == distances[goal] == min(reachable)
+
+def test_weighted_search_stays_within_its_bound():
+    grid = grid_from_rows(MAZE)
+    tiles = walkable_tiles(grid)
+    rng = random.Random(7)
+    for start in tiles[::4]:
+        distances = bfs_distances(grid, start)
+        goals = rng.sample(tiles, 3)
+        path, goal = pathfind_grid_nearest_goal(grid, start, goals, weight=1.5)
+        reachable = [distances[candidate] for candidate in goals if candidate in distances]
+        if reachable:
+            assert_valid_path(grid, path, start, goal)
+            assert len(path) - 1 <= 1.5 * min(reachable)
+
+def test_no_reachable_goal():
+    grid = grid_from_rows(MAZE)
+    assert pathfind_grid_nearest_goal(grid, grid.index(1, 1), [grid.index(14, 1), grid.index(14, 2)]) == (None, None)
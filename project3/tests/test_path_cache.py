@@ -0,0 +1,57 @@
+from grids import MAZE, graph_from_rows
+from utils.game import get_path
+from utils.graph import Graph
+from utils.node import Node
+from utils.path_cache import PathCache
+
+def test_hits_misses_and_evictions():
+    graph = Graph()
+    cache = PathCache(capacity=2)
+    assert cache.get(graph, "a") == (False, None)
+    cache.put(graph, "a", ["a"])
+    cache.put(graph, "b", None)
+    assert cache.get(graph, "a") == (True, ["a"])
+    # "b" is now the least recently used path and makes room for "c"
+    cache.put(graph, "c", ["c"])
+    assert cache.get(graph, "b") == (False, None)
+    assert cache.get(graph, "c") == (True, ["c"])
+    assert cache.stats() == {"size": 2, "capacity": 2, "hits": 2, "misses": 2, "evictions": 1, "invalidations": 0}
+
+def test_unreachable_goals_are_cached():
+    graph = Graph()
+    cache = PathCache()
+    cache.put(graph, "a", None)
+    assert cache.get(graph, "a") == (True, None)
+
+def test_callers_get_their_own_copy():
+    graph = Graph()
+    cache = PathCache()
+    path = ["a", "b"]
+    cache.put(graph, "a", path)
+    path.pop(0)
+    _, cached = cache.get(graph, "a")
+    cached.pop(0)
+    assert cache.get(graph, "a") == (True, ["a", "b"])
+
+def test_editing_the_graph_drops_every_path():
+    graph = Graph()
+    cache = PathCache()
+    cache.put(graph, "a", ["a"])
+    cache.put(graph, "b", ["b"])
+    graph.add_connection(Node("a"), Node("b"), 1)
+    assert cache.get(graph, "a") == (False, None)
+    assert len(cache) == 0
+    assert cache.invalidations == 1
+
+def test_get_path_searches_again_after_an_edit():
+    graph = graph_from_rows(MAZE)
+    cache = PathCache()
+    first = get_path(graph, 8, 8, 8, 12 * 8, 9 * 8, cache=cache)
+    assert get_path(graph, 8, 8, 8, 12 * 8, 9 * 8, cache=cache) == first
+    assert (cache.hits, cache.misses) == (1, 1)
+    # Blocking a tile of the path forces a new search around it
+    blocked = first[len(first) // 2].to_node
+    graph.set_walkable(blocked.x, blocked.y, False)
+    second = get_path(graph, 8, 8, 8, 12 * 8, 9 * 8, cache=cache)
+    assert cache.invalidations == 1
+    assert second is None or all(connection.to_node is not blocked for connection in second)
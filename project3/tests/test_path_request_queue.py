@@ -0,0 +1,76 @@
+from grids import MAZE, OPEN, assert_valid_path, bfs_distances, graph_from_rows
+from utils.grid_a_star import GridAStarSearch
+from utils.path_request_queue import PathRequestQueue
+
+def search_factory(graph, start, goal, created):
+    def factory():
+        created.append(graph.version)
+        return GridAStarSearch(graph.grid, start, goal)
+    return factory
+
+def test_frames_never_expand_more_than_the_budget():
+    graph = graph_from_rows(MAZE)
+    queue = PathRequestQueue(graph, expansions_per_frame=10, slice_size=4)
+    start, goal = graph.grid.index(1, 1), graph.grid.index(12, 9)
+    request = queue.submit("enemy", search_factory(graph, start, goal, []))
+    frames = 0
+    while not request.done:
+        assert queue.update() <= 10
+        frames += 1
+    assert frames > 1 and request.frames == frames
+    finished = queue.poll("enemy")
+    assert finished is request and queue.poll("enemy") is None
+    assert len(finished.tiles) - 1 == bfs_distances(graph.grid, start)[goal]
+
+def test_unfinished_searches_take_turns():
+    graph = graph_from_rows(OPEN)
+    queue = PathRequestQueue(graph, expansions_per_frame=4, slice_size=4)
+    first = queue.submit("first", search_factory(graph, graph.grid.index(1, 1), graph.grid.index(10, 6), []))
+    second = queue.submit("second", search_factory(graph, graph.grid.index(10, 1), graph.grid.index(1, 6), []))
+    queue.update()
+    queue.update()
+    assert first.search.expanded > 0 and second.search.expanded > 0
+
+def test_a_new_request_replaces_the_pending_one():
+    graph = graph_from_rows(OPEN)
+    queue = PathRequestQueue(graph)
+    queue.submit("enemy", search_factory(graph, graph.grid.index(1, 1), graph.grid.index(10, 6), []), "old")
+    queue.submit("enemy", search_factory(graph, graph.grid.index(1, 1), graph.grid.index(3, 1), []), "new")
+    assert len(queue) == 1
+    queue.update()
+    request = queue.poll("enemy")
+    assert request.context == "new" and request.tiles[-1] == graph.grid.index(3, 1)
+
+def test_searches_restart_when_the_graph_is_edited():
+    graph = graph_from_rows(OPEN)
+    queue = PathRequestQueue(graph, expansions_per_frame=3, slice_size=3)
+    start, goal = graph.grid.index(1, 3), graph.grid.index(10, 3)
+    created = []
+    request = queue.submit("enemy", search_factory(graph, start, goal, created))
+    queue.update()
+    before = graph.version
+    for y in range(1, 6):
+        graph.set_walkable(8, y, False)
+    while not request.done:
+        queue.update()
+    assert created == [before, graph.version]
+    assert_valid_path(graph.grid, request.tiles, start, goal)
+    assert len(request.tiles) - 1 == bfs_distances(graph.grid, start)[goal]
+
+def test_results_from_before_an_edit_are_dropped():
+    graph = graph_from_rows(OPEN)
+    queue = PathRequestQueue(graph)
+    queue.submit("enemy", search_factory(graph, graph.grid.index(1, 1), graph.grid.index(10, 6), []))
+    queue.update()
+    graph.set_walkable(5, 1, False)
+    assert queue.poll("enemy") is None
+
+def test_cancel_drops_pending_and_finished_requests():
+    graph = graph_from_rows(OPEN)
+    queue = PathRequestQueue(graph, expansions_per_frame=2, slice_size=2)
+    queue.submit("pending", search_factory(graph, graph.grid.index(1, 1), graph.grid.index(10, 6), []))
+    queue.submit("finished", search_factory(graph, graph.grid.index(1, 1), graph.grid.index(1, 1), []))
+    queue.cancel("pending")
+    queue.update()
+    queue.cancel("finished")
+    assert not queue.is_pending("pending") and queue.poll("finished") is None
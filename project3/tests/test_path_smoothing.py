@@ -0,0 +1,73 @@
+import math
+import pygame
+import pytest
+from utils.collision_bitmap import CollisionBitmap
+from utils.connection import Connection
+from utils.node import TileNode
+from utils.path_smoothing import smooth_path
+
+BLOCK_SIZE = 8
+
+def bitmap_with_wall(wall):
+    # An 80x80 pixel world with one bright rectangle
+    surface = pygame.Surface((80, 80))
+    surface.fill((0, 0, 0))
+    surface.fill((255, 255, 255), wall)
+    return CollisionBitmap(surface)
+
+def tile_path(*corners):
+    # Unit steps through the given corner tiles
+    nodes = [TileNode(*corners[0])]
+    for x, y in corners[1:]:
+        while (nodes[-1].x, nodes[-1].y) != (x, y):
+            last = nodes[-1]
+            nodes.append(TileNode(last.x + (x > last.x) - (x < last.x), last.y + (y > last.y) - (y < last.y)))
+    return [Connection(a, b, 1) for a, b in zip(nodes, nodes[1:])]
+
+def segment_is_clear(wall, a, b, clearance):
+    # Samples the segment every quarter pixel and keeps them out of the grown rectangle
+    grown = pygame.Rect(wall).inflate(2 * clearance, 2 * clearance)
+    ax, ay, bx, by = a.x * BLOCK_SIZE, a.y * BLOCK_SIZE, b.x * BLOCK_SIZE, b.y * BLOCK_SIZE
+    steps = int(4 * math.dist((ax, ay), (bx, by))) + 1
+    return not any(grown.collidepoint(ax + (bx - ax) * i / steps, ay + (by - ay) * i / steps) for i in range(steps + 1))
+
+def assert_subsequence(smoothed, path):
+    nodes = [path[0].from_node] + [connection.to_node for connection in path]
+    kept = [smoothed[0].from_node] + [connection.to_node for connection in smoothed]
+    positions = [nodes.index(node) for node in kept]
+    assert positions[0] == 0 and positions[-1] == len(nodes) - 1
+    assert positions == sorted(positions)
+    for before, after in zip(smoothed, smoothed[1:]):
+        assert before.to_node is after.from_node
+
+def test_open_paths_become_a_single_segment():
+    bitmap = bitmap_with_wall((70, 70, 4, 4))
+    path = tile_path((1, 1), (1, 6), (6, 6))
+    smoothed = smooth_path(path, bitmap, BLOCK_SIZE)
+    assert len(smoothed) == 1
+    assert smoothed[0].get_cost() == pytest.approx(math.dist((1, 1), (6, 6)))
+
+@pytest.mark.parametrize("clearance", [0, 2])
+def test_segments_keep_away_from_walls(clearance):
+    wall = (36, 0, 8, 56)
+    bitmap = bitmap_with_wall(wall)
+    path = tile_path((2, 1), (2, 8), (7, 8), (7, 1))
+    smoothed = smooth_path(path, bitmap, BLOCK_SIZE, clearance=clearance)
+    assert_subsequence(smoothed, path)
+    assert 1 < len(smoothed) < len(path)
+    for connection in smoothed:
+        assert segment_is_clear(wall, connection.from_node, connection.to_node, clearance)
+
+def test_the_first_segment_starts_at_the_agent():
+    # Seen from the corner of its tile the second corner is hidden, but not from the agent
+    wall = (20, 20, 8, 8)
+    bitmap = bitmap_with_wall(wall)
+    path = tile_path((1, 1), (1, 5), (5, 5))
+    assert len(smooth_path(path, bitmap, BLOCK_SIZE)) == 2
+    assert len(smooth_path(path, bitmap, BLOCK_SIZE, start=(8, 36))) == 1
+
+def test_short_paths_are_kept():
+    bitmap = bitmap_with_wall((70, 70, 4, 4))
+    path = tile_path((1, 1), (2, 1))
+    assert smooth_path(path, bitmap, BLOCK_SIZE) is path
+    assert smooth_path([], bitmap, BLOCK_SIZE) == []
@@ -0,0 +1,114 @@
+import os
+import threading
+import pytest
+import pygame
+from concurrent.futures import BrokenExecutor
+from grids import MAZE, OPEN, assert_valid_path, bfs_distances, graph_from_rows
+from utils.game import path_to_nearest_from_future, submit_path_to_nearest
+from utils.path_worker_pool import PathWorkerPool
+
+BLOCK_SIZE = 8
+
+def position(x, y):
+    return pygame.Vector2(x * BLOCK_SIZE + 1, y * BLOCK_SIZE + 1)
+
+@pytest.fixture(params=[False, True], ids=["threads", "processes"])
+def pool_of(request):
+    pools = []
+    def make(graph, workers=1, radius=None):
+        pool = PathWorkerPool(graph, workers=workers, use_processes=request.param, radius=radius)
+        pools.append(pool)
+        return pool
+    yield make
+    for pool in pools:
+        pool.shutdown()
+
+def test_every_mode_finds_the_shortest_path(pool_of):
+    graph = graph_from_rows(MAZE)
+    pool = pool_of(graph, workers=2)
+    start, goal = graph.grid.index(1, 1), graph.grid.index(12, 9)
+    distance = bfs_distances(graph.grid, start)[goal]
+    for mode in ("astar", "jps"):
+        tiles, reached = pool.submit(start, goal, mode).result()
+        assert reached == goal
+        if mode == "astar":
+            assert_valid_path(graph.grid, tiles, start, goal)
+            assert len(tiles) - 1 == distance
+    tiles, reached = pool.submit(start, [goal, graph.grid.index(6, 3)], "nearest").result()
+    assert reached == graph.grid.index(6, 3)
+    with pytest.raises(ValueError):
+        pool.submit(start, goal, "dijkstra")
+
+def test_the_pool_restarts_with_the_edited_grid(pool_of):
+    graph = graph_from_rows(MAZE)
+    pool = pool_of(graph)
+    start, goal = graph.grid.index(1, 1), graph.grid.index(1, 9)
+    assert pool.submit(start, goal).result()[0] is not None
+    graph.set_walkable(1, 5, False)
+    request = pool.submit(start, goal)
+    assert request.version == graph.version and pool.restarts == 2
+    tiles, _ = request.result()
+    assert graph.grid.index(1, 5) not in tiles
+
+def test_requests_cancelled_by_an_edit_give_no_path():
+    graph = graph_from_rows(MAZE)
+    pool = PathWorkerPool(graph, workers=1, use_processes=False)
+    release = threading.Event()
+    # Keep the only worker busy so the next request is still queued when the pool restarts
+    pool._ensure_executor().submit(release.wait)
+    request = submit_path_to_nearest(graph, BLOCK_SIZE, pool, position(1, 1), [position(12, 9)], position(8, 7))
+    graph.set_walkable(4, 1, False)
+    pool.submit(graph.grid.index(1, 1), graph.grid.index(12, 9))
+    release.set()
+    assert request.future.cancelled()
+    assert path_to_nearest_from_future(graph, request) == (True, None, None)
+    assert request.stats().nodes_expanded == 0
+    pool.shutdown()
+
+def test_a_dead_worker_does_not_stop_the_pool():
+    graph = graph_from_rows(MAZE)
+    pool = PathWorkerPool(graph, workers=1)
+    if not pool.use_processes:
+        pytest.skip("needs process workers")
+    try:
+        dead = pool._ensure_executor().submit(os._exit, 1)
+        with pytest.raises(BrokenExecutor):
+            dead.result()
+        request = submit_path_to_nearest(graph, BLOCK_SIZE, pool, position(1, 1), [position(12, 9)])
+        request.future.result()
+        finished, path, target = path_to_nearest_from_future(graph, request)
+        assert finished and target == position(12, 9)
+        assert len(path) == bfs_distances(graph.grid, graph.grid.index(1, 1))[graph.grid.index(12, 9)]
+        assert pool.restarts == 2
+    finally:
+        pool.shutdown()
+
+def test_weighted_requests_stay_within_the_weight(pool_of):
+    graph = graph_from_rows(MAZE)
+    pool = pool_of(graph)
+    start = graph.grid.index(1, 1)
+    distances = bfs_distances(graph.grid, start)
+    goals = [graph.grid.index(12, 9), graph.grid.index(14, 5)]
+    tiles, reached = pool.submit(start, goals, "nearest", weight=2.0).result()
+    assert len(tiles) - 1 <= 2.0 * min(distances[goal] for goal in goals)
+    request = pool.submit(start, goals[0], "astar", weight=2.0)
+    assert 1 <= request.stats().suboptimality_bound <= 2.0
+    with pytest.raises(ValueError):
+        pool.submit(start, goals[0], "jps", weight=2.0)
+
+def test_pools_with_a_radius_search_its_layer(pool_of):
+    graph = graph_from_rows(OPEN)
+    pool = pool_of(graph, radius=8)
+    layer = graph.layer(8)
+    start = layer.index(2, 2)
+    tiles, reached = pool.submit(start, layer.index(3, 5)).result()
+    assert_valid_path(layer, tiles, start, layer.index(3, 5))
+    # The pillar seals the layer in two, though the grid of the graph goes around it
+    assert pool.submit(start, layer.index(9, 2)).result()[0] is None
+    targets = [position(9, 2), position(1, 1), position(3, 4)]
+    request = submit_path_to_nearest(graph, BLOCK_SIZE, pool, position(2, 2), targets)
+    request.future.result()
+    found, path, target = path_to_nearest_from_future(graph, request)
+    assert found and target is targets[2]
+    assert (path[-1].to_node.x, path[-1].to_node.y) == (3, 4)
+    assert submit_path_to_nearest(graph, BLOCK_SIZE, pool, position(1, 1), [position(3, 4)]) is None
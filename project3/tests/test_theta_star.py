@@ -0,0 +1,63 @@
+import math
+import pygame
+from grids import MAZE, OPEN, bfs_distances, grid_from_rows
+from utils.collision_bitmap import CollisionBitmap
+from utils.game_graph import GameGraph
+from utils.theta_star import pathfind_theta_star
+
+BLOCK_SIZE = 8
+
+def world_from_rows(rows):
+    # Walls are solid squares around the point of their tile, so rays cannot slip between them
+    surface = pygame.Surface((len(rows[0]) * BLOCK_SIZE, len(rows) * BLOCK_SIZE))
+    surface.fill((0, 0, 0))
+    for y, row in enumerate(rows):
+        for x, tile in enumerate(row):
+            if tile == "#":
+                square = pygame.Rect(x * BLOCK_SIZE - 3, y * BLOCK_SIZE - 3, 7, 7)
+                surface.fill((255, 255, 255), square.clip(surface.get_rect()))
+    graph = GameGraph(surface, BLOCK_SIZE)
+    assert graph.grid.walkable == grid_from_rows(rows).walkable
+    return graph, CollisionBitmap(surface)
+
+def waypoints(path):
+    return [path[0].from_node] + [connection.to_node for connection in path]
+
+def test_paths_are_straight_segments_in_sight():
+    graph, bitmap = world_from_rows(MAZE)
+    start = graph.nodes[(1, 1)]
+    for goal_tile in ((12, 9), (6, 1), (14, 5), (3, 3)):
+        goal = graph.nodes[goal_tile]
+        path = pathfind_theta_star(graph, start, goal, bitmap)
+        points = waypoints(path)
+        assert points[0] is start and points[-1] is goal
+        length = 0
+        for connection in path:
+            a, b = connection.from_node, connection.to_node
+            assert bitmap.line_of_sight(a.x * BLOCK_SIZE, a.y * BLOCK_SIZE, b.x * BLOCK_SIZE, b.y * BLOCK_SIZE)
+            assert math.isclose(connection.get_cost(), math.dist((a.x, a.y), (b.x, b.y)))
+            length += connection.get_cost()
+        # Never longer than walking the tiles, never shorter than the straight line
+        tiles = bfs_distances(graph.grid, graph.grid.index(1, 1))[graph.grid.index(*goal_tile)]
+        assert math.dist((start.x, start.y), goal_tile) - 1e-9 <= length <= tiles + 1e-9
+
+def test_open_space_needs_few_waypoints():
+    graph, bitmap = world_from_rows(OPEN)
+    path = pathfind_theta_star(graph, graph.nodes[(1, 1)], graph.nodes[(3, 6)], bitmap)
+    assert len(path) == 1
+    # The pillar in the middle of the room has to be walked around
+    path = pathfind_theta_star(graph, graph.nodes[(4, 3)], graph.nodes[(7, 4)], bitmap)
+    assert 1 < len(path) < bfs_distances(graph.grid, graph.grid.index(4, 3))[graph.grid.index(7, 4)]
+
+def test_unreachable_and_trivial_goals():
+    graph, bitmap = world_from_rows(MAZE)
+    assert pathfind_theta_star(graph, graph.nodes[(1, 1)], graph.nodes[(14, 1)], bitmap) is None
+    assert pathfind_theta_star(graph, graph.nodes[(1, 1)], graph.nodes[(1, 1)], bitmap) == []
+
+def test_clearance_keeps_segments_off_the_walls():
+    graph, bitmap = world_from_rows(OPEN)
+    path = pathfind_theta_star(graph, graph.nodes[(4, 3)], graph.nodes[(7, 4)], bitmap, clearance=2)
+    inflated = bitmap.inflated(2)
+    for connection in path:
+        a, b = connection.from_node, connection.to_node
+        assert inflated.line_of_sight(a.x * BLOCK_SIZE, a.y * BLOCK_SIZE, b.x * BLOCK_SIZE, b.y * BLOCK_SIZE)
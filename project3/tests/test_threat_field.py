@@ -0,0 +1,48 @@
+import pygame
+import pytest
+from grids import MAZE, graph_from_rows
+from utils.game import update_threat_field
+from utils.manhattan_heuristic import ManhattanHeuristic
+from utils.tactical_a_star import pathfind_tactical_astar
+from utils.threat_field import DISTANCE_FROM_PLAYER, ThreatField
+from utils.walkability_grid import WalkabilityGrid
+
+def test_threat_is_summed_over_every_source():
+    grid = WalkabilityGrid(7, 5)
+    sources = [grid.index(1, 1), grid.index(5, 3), grid.index(6, 0)]
+    field = ThreatField(weight=60)
+    field.update(grid, sources)
+    for index in range(len(grid)):
+        x, y = grid.coordinates(index)
+        expected = sum(60 / (abs(x - sx) + abs(y - sy) + 1) for sx, sy in map(grid.coordinates, sources))
+        assert field.threat[index] == pytest.approx(expected)
+
+def test_rebuilds_only_when_the_sources_or_the_grid_change():
+    grid = WalkabilityGrid(6, 4)
+    field = ThreatField()
+    assert field.update(grid, [3, 9])
+    assert not field.update(grid, [9, 3, 3])
+    assert field.update(grid, [9])
+    assert field.update(WalkabilityGrid(8, 4), [9])
+    assert field.rebuilds == 3
+
+def test_tactical_search_costs_the_same_with_the_field():
+    graph = graph_from_rows(MAZE)
+    player = graph.node_at(graph.grid.index(8, 7))
+    field = ThreatField()
+    field.update(graph.grid, [graph.grid.index(8, 7)])
+    start = graph.node_at(graph.grid.index(1, 1))
+    goal = graph.node_at(graph.grid.index(12, 9))
+    with_field = pathfind_tactical_astar(graph, start, goal, ManhattanHeuristic(goal), player, field)
+    per_edge = pathfind_tactical_astar(graph, start, goal, ManhattanHeuristic(goal), player)
+    def cost(path):
+        return sum(1 + DISTANCE_FROM_PLAYER / (abs(c.to_node.x - player.x) + abs(c.to_node.y - player.y) + 1) for c in path)
+    assert cost(with_field) == pytest.approx(cost(per_edge))
+
+def test_positions_off_the_walkable_tiles_are_not_sources():
+    graph = graph_from_rows(MAZE)
+    field = ThreatField()
+    # (2, 2) is a wall tile
+    tiles = update_threat_field(graph, 8, field, [pygame.Vector2(8 * 8 + 3, 7 * 8 + 3), pygame.Vector2(2 * 8 + 3, 2 * 8 + 3)])
+    assert tiles == [graph.grid.index(8, 7)]
+    assert field.sources == (graph.grid.index(8, 7),)
@@ -0,0 +1,40 @@
+import random
+from grids import MAZE, OPEN, bfs_distances, grid_from_rows, walkable_tiles
+
+def assert_components_match_bfs(grid):
+    tiles = walkable_tiles(grid)
+    for start in tiles:
+        reachable = bfs_distances(grid, start)
+        for other in tiles:
+            assert grid.connected(start, other) == (other in reachable)
+
+def test_removing_a_tile_splits_a_corridor():
+    grid = grid_from_rows(["#######", "#.....#", "#######"])
+    left, middle, right = grid.index(1, 1), grid.index(3, 1), grid.index(5, 1)
+    grid.walkable[middle] = 0
+    grid.update_components(middle)
+    assert not grid.connected(left, right)
+    assert not grid.connected(left, middle)
+    grid.walkable[middle] = 1
+    grid.update_components(middle)
+    assert grid.connected(left, right)
+    assert grid.connected(middle, right)
+
+def test_adding_a_tile_merges_components():
+    grid = grid_from_rows(MAZE)
+    pocket, outside = grid.index(14, 1), grid.index(1, 1)
+    assert not grid.connected(pocket, outside)
+    grid.walkable[grid.index(14, 3)] = 1
+    grid.update_components(grid.index(14, 3))
+    assert grid.connected(pocket, outside)
+    assert_components_match_bfs(grid)
+
+def test_random_edits_keep_the_components_of_bfs():
+    rng = random.Random(16)
+    for rows in (MAZE, OPEN):
+        grid = grid_from_rows(rows)
+        for _ in range(40):
+            x, y = rng.randrange(1, grid.width - 1), rng.randrange(1, grid.height - 1)
+            grid.walkable[grid.index(x, y)] ^= 1
+            grid.update_components(grid.index(x, y))
+            assert_components_match_bfs(grid)
@@ -1,8 +1,11 @@
-from typing import List 
+import heapq
+import time
+from typing import Dict, List, Tuple
 from dataclasses import dataclass
 from utils.graph import Graph
 from utils.node import Node
 from utils.connection import Connection
+from utils.search_stats import SearchStats
 from abc import ABC, abstractmethod
 
 class Heuristic(ABC):
@@ -72,8 +75,8 @@ class PathfindingList:
     Class to store a list of node records for pathfinding.
 
     ### Attributes
-    #### records: List[NodeRecord]
-    The list of node records.
+    #### records: Dict[Node, NodeRecord]
+    The node records, indexed by their node.
 
     ### Methods
     #### __init__()
@@ -98,30 +101,88 @@ class PathfindingList:
     Find the record with the smallest estimated total cost.
     """
     def __init__(self):
-        self.records: List[NodeRecord] = []
+        self.records: Dict[Node, NodeRecord] = {}
+        self._heap: List[Tuple[float, int, NodeRecord]] = []
+        self._counter: int = 0
     
     def __len__(self):
         return len(self.records)
     
     def add(self, record: NodeRecord):
-        self.records.append(record)
+        # Adding a record that is already in the list just refreshes its priority
+        self.records[record.node] = record
+        self._counter += 1
+        heapq.heappush(self._heap, (record.estimated_total_cost, self._counter, record))
     
     def remove(self, record: NodeRecord):
-        self.records.remove(record)
+        # The heap entry is left behind and discarded lazily by smallest_element
+        if self.records.get(record.node) is record:
+            del self.records[record.node]
     
     def contains(self, node: Node) -> bool:
-        return any(record.node == node for record in self.records)
+        return node in self.records
     
     def find(self, node: Node) -> NodeRecord|None:
-        for record in self.records:
-            if record.node == node:
-                return record
-        return None
+        return self.records.get(node)
     
     def smallest_element(self) -> NodeRecord:
-        return min(self.records, key=lambda x: x.estimated_total_cost)
+        # Drop entries of removed records or of records whose cost has changed since they were pushed
+        while self._heap:
+            cost, _, record = self._heap[0]
+            if self.records.get(record.node) is record and cost == record.estimated_total_cost:
+                return record
+            heapq.heappop(self._heap)
+        raise ValueError("smallest_element() called on an empty list")
+
+class ClosedList:
+    """
+    ### Description
+    Class to store the node records that have already been processed. Unlike PathfindingList
+    it is never asked for its smallest element, so it keeps no heap, only the records by node.
+
+    ### Attributes
+    #### records: Dict[Node, NodeRecord]
+    The node records, indexed by their node.
+
+    ### Methods
+    #### __init__()
+    Initialize the list with an empty list.
+
+    #### __len__() -> int
+    Return the number of records in the list.
+
+    #### add(record: NodeRecord)
+    Add a node record to the list.
+
+    #### remove(record: NodeRecord)
+    Remove a node record from the list.
+
+    #### contains(node: Node) -> bool
+    Check if the list contains a record for the given node.
 
-def pathfind_astar(graph: Graph, start: Node, goal: Node, heuristic: Heuristic) -> List[Connection]|None:
+    #### find(node: Node) -> NodeRecord|None
+    Find the record for the given node in the list.
+    """
+    def __init__(self):
+        self.records: Dict[Node, NodeRecord] = {}
+    
+    def __len__(self):
+        return len(self.records)
+    
+    def add(self, record: NodeRecord):
+        self.records[record.node] = record
+    
+    def remove(self, record: NodeRecord):
+        if self.records.get(record.node) is record:
+            del self.records[record.node]
+    
+    def contains(self, node: Node) -> bool:
+        return node in self.records
+    
+    def find(self, node: Node) -> NodeRecord|None:
+        return self.records.get(node)
+
+def pathfind_astar(graph: Graph, start: Node, goal: Node, heuristic: Heuristic, weight: float = 1.0, stats: SearchStats|None = None) -> List[Connection]|None:
     """
     ### Description
     Perform the A* pathfinding algorithm to find the path between two nodes.
@@ -135,20 +196,34 @@ def pathfind_astar(graph: Graph, start: Node, goal: Node, heuristic: Heuristic)
 
     - heuristic: Heuristic. The heuristic function to estimate the cost between nodes.
 
+    - weight: float. The factor of the heuristic in the estimated total cost. Above 1 the
+    search expands fewer nodes and the path costs at most `weight` times the optimal one.
+
+    - stats: SearchStats|None. If given, filled in with the counters of the search and the
+    suboptimality bound achieved.
+
     ### Returns
     List[Connection]|None: The list of connections forming the path from start to goal.
     """
+    # Goals in another connected component are rejected without searching
+    if not graph.is_reachable(start, goal):
+        return None
+
     # Initialize the record for the start node
     start_record = NodeRecord(
         node=start,
         cost_so_far=0,
-        estimated_total_cost=heuristic.estimate(start)
+        estimated_total_cost=weight * heuristic.estimate(start)
     )
     
     # Initialize the open and closed lists
     open_list = PathfindingList()
     open_list.add(start_record)
-    closed_list = PathfindingList()
+    closed_list = ClosedList()
+    started = time.perf_counter()
+    expanded = 0
+    relaxed = 0
+    peak_open = 1
     
     # Iterate through processing each node
     while len(open_list) > 0:
@@ -157,9 +232,11 @@ def pathfind_astar(graph: Graph, start: Node, goal: Node, heuristic: Heuristic)
         # If it is the goal node, then terminate
         if current.node == goal:
             break
+        expanded += 1
             
         # Get its outgoing connections
         connections = graph.get_connections(current.node)
+        relaxed += len(connections)
         
         # Loop through each connection
         for connection in connections:
@@ -184,23 +261,37 @@ def pathfind_astar(graph: Graph, start: Node, goal: Node, heuristic: Heuristic)
             # Handle unvisited nodes
             else:
                 end_node_record = NodeRecord(node=end_node)
-                end_node_heuristic = heuristic.estimate(end_node)
+                end_node_heuristic = weight * heuristic.estimate(end_node)
             
             # Update the node record
             end_node_record.cost_so_far = end_node_cost
             end_node_record.connection = connection
             end_node_record.estimated_total_cost = end_node_cost + end_node_heuristic
             
-            # Add it to open list if not already there
-            if not open_list.contains(end_node):
-                open_list.add(end_node_record)
+            # Add it to open list, or refresh its priority if it is already there
+            open_list.add(end_node_record)
                 
+        if len(open_list) > peak_open:
+            peak_open = len(open_list)
+
         # Move current node from open to closed
         open_list.remove(current)
         closed_list.add(current)
     
+    if stats is not None:
+        stats.nodes_expanded += expanded
+        stats.edges_relaxed += relaxed
+        stats.peak_open = max(stats.peak_open, peak_open)
+        if weight != 1.0 and current.node == goal:
+            # Closed nodes are reopened, so some node of an optimal path is open with its
+            # optimal cost and the smallest unweighted estimate bounds the optimal cost
+            lower_bound = min(record.cost_so_far + (record.estimated_total_cost - record.cost_so_far) / weight for record in open_list.records.values())
+            stats.suboptimality_bound = current.cost_so_far / lower_bound if lower_bound > 0 else 1.0
+
     # Return null if no path found
     if current.node != goal:
+        if stats is not None:
+            stats.finish(started, None)
         return None
         
     # Compile the path
@@ -213,4 +304,6 @@ def pathfind_astar(graph: Graph, start: Node, goal: Node, heuristic: Heuristic)
         
     # Reverse the path and return it
     path.reverse()
+    if stats is not None:
+        stats.finish(started, len(path))
     return path
\ No newline at end of file
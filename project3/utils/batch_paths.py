@@ -0,0 +1,136 @@
+import multiprocessing
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Deque, Dict, List, Sequence, Tuple
+from utils.walkability_grid import WalkabilityGrid
+
+# Grid of a batch worker, set once by the pool initializer
+_batch_grid: WalkabilityGrid|None = None
+
+def _init_batch_worker(grid: WalkabilityGrid):
+    global _batch_grid
+    _batch_grid = grid
+
+def _run_source(start: int, goals: Tuple[int, ...], with_paths: bool) -> Tuple[array, List[array|None]|None]:
+    return shortest_paths_from(_batch_grid, start, goals, with_paths)
+
+class BatchResult:
+    """
+    ### Description
+    The answers of a batch of path queries, in the order of the queries.
+
+    ### Attributes
+    - `lengths`: The number of steps of the shortest path of every query, -1 if the goal is unreachable.
+    - `paths`: If paths were requested, the tile indices of every path, start and goal
+    included, or None for unreachable goals. Repeated queries share the same array.
+    - `unique_pairs`: The number of distinct (start, goal) pairs that were solved.
+    - `sources`: The number of distinct starts, one search tree each.
+    """
+    def __init__(self, lengths: array, paths: List[array|None]|None, unique_pairs: int, sources: int):
+        self.lengths: array = lengths
+        self.paths: List[array|None]|None = paths
+        self.unique_pairs: int = unique_pairs
+        self.sources: int = sources
+
+    def __len__(self) -> int:
+        return len(self.lengths)
+
+def shortest_paths_from(grid: WalkabilityGrid, start: int, goals: Sequence[int], with_paths: bool = False) -> Tuple[array, List[array|None]|None]:
+    """
+    ### Description
+    Grows one shortest path tree from a start tile until every goal is reached. Every step
+    costs the same, so Dijkstra's algorithm reduces to a breadth first search.
+
+    ### Parameters
+    - grid: WalkabilityGrid. The grid to search.
+    - start: int. The index of the start tile.
+    - goals: Sequence[int]. The indices of the goal tiles.
+    - with_paths: bool. Whether to return the paths as well as their lengths.
+
+    ### Returns
+    Tuple[array, List[array|None]|None]: The length of the path to every goal, -1 if it is
+    unreachable, and the tile indices of the paths if requested.
+    """
+    walkable: bytearray = grid.walkable
+    width: int = grid.width
+    height: int = grid.height
+    distances: array = array('i', [-1]) * len(walkable)
+    parents: array = array('i', [-1]) * len(walkable)
+
+    # Goals in another connected component would make the tree cover the whole component
+    remaining: set = {goal for goal in goals if grid.connected(start, goal)}
+    if walkable[start]:
+        distances[start] = 0
+        remaining.discard(start)
+        frontier: Deque[int] = deque([start])
+        while frontier and remaining:
+            current: int = frontier.popleft()
+            current_x, current_y = current % width, current // width
+            for neighbor, x, y in ((current + width, current_x, current_y + 1), (current + 1, current_x + 1, current_y),
+                                   (current - width, current_x, current_y - 1), (current - 1, current_x - 1, current_y)):
+                if 0 <= x < width and 0 <= y < height and walkable[neighbor] and distances[neighbor] < 0:
+                    distances[neighbor] = distances[current] + 1
+                    parents[neighbor] = current
+                    remaining.discard(neighbor)
+                    frontier.append(neighbor)
+
+    lengths: array = array('i', [distances[goal] for goal in goals])
+    if not with_paths:
+        return lengths, None
+    paths: List[array|None] = []
+    for goal in goals:
+        if distances[goal] < 0:
+            paths.append(None)
+            continue
+        path: array = array('i', [0]) * (distances[goal] + 1)
+        tile: int = goal
+        for position in range(distances[goal], -1, -1):
+            path[position] = tile
+            tile = parents[tile]
+        paths.append(path)
+    return lengths, paths
+
+def batch_shortest_paths(grid: WalkabilityGrid, starts: Sequence[int], goals: Sequence[int], with_paths: bool = False, workers: int = 0) -> BatchResult:
+    """
+    ### Description
+    Answers many path queries at once. Repeated (start, goal) pairs are solved once, the
+    pairs are grouped by start so each distinct start grows a single shortest path tree
+    for all of its goals, and the trees can be spread over a pool of worker processes that
+    receive the grid once.
+
+    ### Parameters
+    - grid: WalkabilityGrid. The grid to search.
+    - starts: Sequence[int]. The index of the start tile of every query.
+    - goals: Sequence[int]. The index of the goal tile of every query.
+    - with_paths: bool. Whether to return the paths as well as their lengths.
+    - workers: int. The number of worker processes, 0 to run in this process.
+
+    ### Returns
+    BatchResult: The lengths, and the paths if requested, in the order of the queries.
+    """
+    if len(starts) != len(goals):
+        raise ValueError("starts and goals must have the same length")
+
+    goals_by_start: Dict[int, List[int]] = {}
+    for start, goal in set(zip(starts, goals)):
+        goals_by_start.setdefault(start, []).append(goal)
+    sources: List[Tuple[int, Tuple[int, ...]]] = [(start, tuple(start_goals)) for start, start_goals in goals_by_start.items()]
+
+    if workers > 0 and len(sources) > 1:
+        # Forked workers inherit the grid instead of unpickling it
+        method: str = "fork" if "fork" in multiprocessing.get_all_start_methods() else "spawn"
+        with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context(method), initializer=_init_batch_worker, initargs=(grid,)) as executor:
+            results = list(executor.map(_run_source, *zip(*[(start, start_goals, with_paths) for start, start_goals in sources]), chunksize=max(1, len(sources) // (workers * 4))))
+    else:
+        results = [shortest_paths_from(grid, start, start_goals, with_paths) for start, start_goals in sources]
+
+    # Spread the answers of the distinct pairs back over the queries
+    answers: Dict[Tuple[int, int], Tuple[int, array|None]] = {}
+    for (start, start_goals), (lengths, paths) in zip(sources, results):
+        for position, goal in enumerate(start_goals):
+            answers[(start, goal)] = (lengths[position], paths[position] if paths is not None else None)
+
+    lengths: array = array('i', [answers[pair][0] for pair in zip(starts, goals)])
+    paths: List[array|None]|None = [answers[pair][1] for pair in zip(starts, goals)] if with_paths else None
+    return BatchResult(lengths, paths, len(answers), len(sources))
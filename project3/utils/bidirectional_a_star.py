@@ -0,0 +1,129 @@
+import heapq
+import time
+from typing import Dict, List, Tuple
+from utils.a_star import Heuristic
+from utils.connection import Connection
+from utils.graph import Graph
+from utils.node import Node
+from utils.search_stats import SearchStats
+
+def pathfind_bidirectional_astar(graph: Graph, start: Node, goal: Node, heuristic: Heuristic, stats: SearchStats|None = None) -> List[Connection]|None:
+    """
+    ### Description
+    Perform a bidirectional A* search: one search grows from the start along the
+    connections, another one grows from the goal along the reverse connections, and the
+    best path is the cheapest one through a node reached by both. Each step expands the
+    side with the smaller open list. The search stops as soon as the smallest estimated
+    total cost of either open list is no lower than the best path found, so the path has
+    the same cost as the one of pathfind_astar for consistent heuristics.
+
+    ### Parameters
+    - graph: Graph. The graph containing the nodes and connections.
+    - start: Node. The starting node for the path.
+    - goal: Node. The goal node to reach.
+    - heuristic: Heuristic. The heuristic function to estimate the cost between nodes. The
+    backward search uses it to estimate the cost from the start.
+    - stats: SearchStats|None. If given, filled in with the counters of both searches.
+
+    ### Returns
+    List[Connection]|None: The list of connections forming the path from start to goal.
+    """
+    if not graph.is_reachable(start, goal):
+        return None
+    if start == goal:
+        return []
+    started: float = time.perf_counter()
+
+    # Index 0 is the forward search, index 1 the backward one
+    costs: Tuple[Dict[Node, float], Dict[Node, float]] = ({start: 0}, {goal: 0})
+    # Connection used to reach every node: into it going forward, out of it going backward
+    parents: Tuple[Dict[Node, Connection], Dict[Node, Connection]] = ({}, {})
+    closed: Tuple[set, set] = (set(), set())
+    counter: int = 0
+    open_heaps: Tuple[List[Tuple[float, float, int, Node]], List[Tuple[float, float, int, Node]]] = (
+        [(heuristic.estimate(start), 0, counter, start)],
+        [(heuristic.estimate_between(start, goal), 0, counter + 1, goal)],
+    )
+    counter += 2
+
+    best_cost: float = float('inf')
+    meeting_node: Node|None = None
+    expanded: int = 0
+    relaxed: int = 0
+    peak_open: int = 2
+
+    def smallest_estimate(side: int) -> float:
+        # Drop the entries of nodes that were closed or improved since they were pushed
+        open_heap = open_heaps[side]
+        while open_heap:
+            _, cost, _, node = open_heap[0]
+            if node not in closed[side] and -cost == costs[side][node]:
+                return open_heap[0][0]
+            heapq.heappop(open_heap)
+        return float('inf')
+
+    while True:
+        forward_estimate: float = smallest_estimate(0)
+        backward_estimate: float = smallest_estimate(1)
+        if forward_estimate >= best_cost or backward_estimate >= best_cost:
+            break
+
+        side: int = 0 if len(open_heaps[0]) <= len(open_heaps[1]) else 1
+        _, _, _, current = heapq.heappop(open_heaps[side])
+        closed[side].add(current)
+        expanded += 1
+        current_cost: float = costs[side][current]
+
+        if side == 0:
+            connections = graph.get_connections(current)
+        else:
+            connections = graph.get_reverse_connections(current)
+        relaxed += len(connections)
+        for connection in connections:
+            end_node: Node = connection.to_node if side == 0 else connection.from_node
+            end_node_cost: float = current_cost + connection.get_cost()
+            if end_node_cost >= costs[side].get(end_node, float('inf')):
+                continue
+            costs[side][end_node] = end_node_cost
+            parents[side][end_node] = connection
+            closed[side].discard(end_node)
+            if side == 0:
+                estimate: float = heuristic.estimate(end_node)
+            else:
+                estimate = heuristic.estimate_between(start, end_node)
+            counter += 1
+            heapq.heappush(open_heaps[side], (end_node_cost + estimate, -end_node_cost, counter, end_node))
+
+            # A node reached by both searches joins a path from start to goal
+            other_cost: float|None = costs[1 - side].get(end_node)
+            if other_cost is not None and end_node_cost + other_cost < best_cost:
+                best_cost = end_node_cost + other_cost
+                meeting_node = end_node
+        if len(open_heaps[0]) + len(open_heaps[1]) > peak_open:
+            peak_open = len(open_heaps[0]) + len(open_heaps[1])
+
+    if stats is not None:
+        stats.nodes_expanded += expanded
+        stats.edges_relaxed += relaxed
+        stats.peak_open = max(stats.peak_open, peak_open)
+    if meeting_node is None:
+        if stats is not None:
+            stats.finish(started, None)
+        return None
+
+    # Work back from the meeting node to the start, then forward to the goal
+    path: List[Connection] = []
+    node: Node = meeting_node
+    while node != start:
+        connection = parents[0][node]
+        path.append(connection)
+        node = connection.from_node
+    path.reverse()
+    node = meeting_node
+    while node != goal:
+        connection = parents[1][node]
+        path.append(connection)
+        node = connection.to_node
+    if stats is not None:
+        stats.finish(started, len(path))
+    return path
@@ -0,0 +1,140 @@
+import math
+from array import array
+from typing import Iterator, List, Sequence, Tuple
+from utils.connection import Connection
+from utils.game_graph import GameGraph
+from utils.node import TileNode
+from utils.walkability_grid import WalkabilityGrid
+
+class CompactPath:
+    """
+    ### Description
+    A path stored as the grid indices of its tiles, with a cursor on the tile the agent
+    is leaving. Following the path moves the cursor instead of removing the first hop of a
+    list, and no connection is kept alive: hops are turned into connections only when they
+    are read. Hops between tiles that are not adjacent, like the ones of smoothed paths,
+    cost the straight distance between the tiles. Tiles of layers the graph has no node
+    for get the nodes of `GameGraph.tile_node`.
+
+    It can be used where a `List[Connection]` is expected: `len`, indexing, slicing,
+    iteration and `pop(0)` work on the hops left.
+
+    ### Attributes
+    - `game_graph`: The game graph the tiles belong to.
+    - `tiles`: The tile indices of the whole path, start included.
+    - `cursor`: The position in `tiles` of the tile the next hop leaves from.
+
+    ### Methods
+    - `from_connections(game_graph: GameGraph, path: List[Connection]) -> CompactPath`: Builds a path from connections.
+    - `next_node() -> TileNode|None`: Returns the node the next hop leads to.
+    - `advance(hops: int = 1) -> TileNode|None`: Moves along the path, returns the node reached.
+    - `pop(index: int = 0) -> Connection`: Takes the next hop, like `list.pop(0)`.
+    - `remaining_tiles() -> array`: Returns the tile indices left, the current tile included.
+    - `points(block_size: int) -> List[Tuple[int, int]]`: Returns the points the agent steers to.
+    - `first_blocked(grid: WalkabilityGrid) -> int|None`: Returns the first hop left that leads to a blocked tile.
+    - `repaired(hop: int, tiles: Sequence[int]) -> CompactPath`: Returns the path with its end replaced from a hop.
+    - `to_connections() -> List[Connection]`: Returns the hops left as connections.
+    """
+    def __init__(self, game_graph: GameGraph, tiles: Sequence[int], cursor: int = 0):
+        self.game_graph: GameGraph = game_graph
+        self.tiles: array = tiles if isinstance(tiles, array) else array('i', tiles)
+        self.cursor: int = cursor
+
+    @classmethod
+    def from_connections(cls, game_graph: GameGraph, path: List[Connection]) -> 'CompactPath':
+        if not path:
+            return cls(game_graph, array('i'))
+        tiles: array = array('i', [game_graph.tile_index(path[0].from_node)])
+        tiles.extend(game_graph.tile_index(connection.to_node) for connection in path)
+        return cls(game_graph, tiles)
+
+    def __len__(self) -> int:
+        return max(0, len(self.tiles) - 1 - self.cursor)
+
+    def _connection(self, position: int) -> Connection:
+        from_node: TileNode = self.game_graph.tile_node(self.tiles[position])
+        to_node: TileNode = self.game_graph.tile_node(self.tiles[position + 1])
+        return Connection(from_node, to_node, math.hypot(to_node.x - from_node.x, to_node.y - from_node.y))
+
+    def __getitem__(self, index: int|slice) -> 'Connection|CompactPath':
+        length: int = len(self)
+        if isinstance(index, slice):
+            start, stop, step = index.indices(length)
+            if step != 1:
+                raise ValueError("CompactPath slices must be contiguous")
+            # The tiles of hops start..stop - 1 go from the start of the first to the end of the last
+            return CompactPath(self.game_graph, self.tiles[self.cursor + start:self.cursor + max(start, stop) + 1])
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError("CompactPath index out of range")
+        return self._connection(self.cursor + index)
+
+    def __iter__(self) -> Iterator[Connection]:
+        for position in range(self.cursor, len(self.tiles) - 1):
+            yield self._connection(position)
+
+    def next_node(self) -> TileNode|None:
+        if len(self) == 0:
+            return None
+        return self.game_graph.tile_node(self.tiles[self.cursor + 1])
+
+    def advance(self, hops: int = 1) -> TileNode|None:
+        """
+        ### Description
+        Moves the cursor along the path, in constant time.
+
+        ### Parameters
+        - `hops: int`: The number of hops to take.
+
+        ### Returns
+        - `TileNode|None`: The node reached, or None if no hop was left.
+        """
+        hops = min(hops, len(self))
+        if hops <= 0:
+            return None
+        self.cursor += hops
+        return self.game_graph.tile_node(self.tiles[self.cursor])
+
+    def pop(self, index: int = 0) -> Connection:
+        if index != 0:
+            raise ValueError("Only the next hop of a CompactPath can be popped")
+        if len(self) == 0:
+            raise IndexError("pop from an empty CompactPath")
+        connection: Connection = self._connection(self.cursor)
+        self.cursor += 1
+        return connection
+
+    def remaining_tiles(self) -> array:
+        return self.tiles[self.cursor:]
+
+    def points(self, block_size: int) -> List[Tuple[int, int]]:
+        width: int = self.game_graph.grid.width
+        return [(tile % width * block_size, tile // width * block_size) for tile in self.tiles[self.cursor:]]
+
+    def first_blocked(self, grid: WalkabilityGrid) -> int|None:
+        walkable: bytearray = grid.walkable
+        for position in range(self.cursor + 1, len(self.tiles)):
+            if not walkable[self.tiles[position]]:
+                return position - self.cursor - 1
+        return None
+
+    def repaired(self, hop: int, tiles: Sequence[int]) -> 'CompactPath':
+        """
+        ### Description
+        Keeps the hops left before `hop` and continues with new tiles, so a path blocked
+        further ahead only needs a new search from the last tile still usable.
+
+        ### Parameters
+        - `hop: int`: The first hop to replace, counted from the cursor.
+        - `tiles: Sequence[int]`: The tiles of the new end of the path, starting at the tile `hop` leaves from.
+
+        ### Returns
+        - `CompactPath`: The repaired path, with its cursor on the current tile.
+        """
+        kept: array = self.tiles[self.cursor:self.cursor + hop]
+        kept.extend(tiles)
+        return CompactPath(self.game_graph, kept)
+
+    def to_connections(self) -> List[Connection]:
+        return list(self)
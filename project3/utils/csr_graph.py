@@ -0,0 +1,154 @@
+from array import array
+from multiprocessing import shared_memory
+from typing import Dict, Iterable, List, Tuple
+from utils.connection import Connection
+from utils.node import Node
+
+class CSRGraph:
+    """
+    ### Description
+    A frozen copy of a graph in compressed sparse row form: the connections that leave node
+    `i` are the entries `offsets[i]` to `offsets[i + 1]` of `targets` and `costs`, so a search
+    reads three flat arrays instead of lists of Connection objects. Nodes are numbered in the
+    order they are listed, and connections keep the order of `get_connections`.
+
+    The arrays can be moved to a shared memory block with `share`. Pickling a shared graph
+    only sends the name of the block, so worker processes read the same arrays instead of
+    getting a copy each; the process that called `share` must `close` and `unlink` it.
+
+    ### Attributes
+    - `nodes`: The nodes of the graph, by number.
+    - `index`: The number of every node.
+    - `offsets`: Where the connections of every node start in `targets` and `costs`, one more entry than nodes.
+    - `targets`: The number of the node every connection ends at.
+    - `costs`: The cost of every connection.
+    - `memory`: The shared memory block holding the arrays, or None if they are local.
+
+    ### Methods
+    - `from_graph(graph: Graph, nodes: Iterable[Node]|None) -> CSRGraph`: Freezes a graph.
+    - `neighbors(index: int) -> range`: Returns the positions of the connections that leave a node.
+    - `edge_cost(from_index: int, to_index: int) -> float`: Returns the cost of the connection between two nodes.
+    - `connections_for_path(indices: List[int]) -> List[Connection]`: Converts node numbers into a path.
+    - `share() -> CSRGraph`: Returns a copy backed by shared memory.
+    - `close()`: Stops using the shared memory block.
+    - `unlink()`: Frees the shared memory block.
+    """
+    def __init__(self, nodes: List[Node], offsets: array, targets: array, costs: array, memory: shared_memory.SharedMemory|None = None):
+        self.nodes: List[Node] = nodes
+        self.index: Dict[Node, int] = {node: number for number, node in enumerate(nodes)}
+        self.offsets: array|memoryview = offsets
+        self.targets: array|memoryview = targets
+        self.costs: array|memoryview = costs
+        self.memory: shared_memory.SharedMemory|None = memory
+
+    @classmethod
+    def from_graph(cls, graph, nodes: Iterable[Node]|None = None) -> 'CSRGraph':
+        """
+        ### Description
+        Freezes a graph. Later edits of the graph are not seen by the frozen copy.
+
+        ### Parameters
+        - graph: Graph. The graph to freeze.
+        - nodes: Iterable[Node]|None. The nodes to number, in order. By default the nodes
+        with connections, in the order they were added, then the nodes only reached by them.
+
+        ### Returns
+        CSRGraph: The frozen graph.
+        """
+        if nodes is None:
+            numbered: Dict[Node, None] = dict.fromkeys(graph.connections)
+            for connections in graph.connections.values():
+                numbered.update(dict.fromkeys(connection.to_node for connection in connections))
+            nodes = numbered
+        node_list: List[Node] = list(nodes)
+        index: Dict[Node, int] = {node: number for number, node in enumerate(node_list)}
+
+        offsets: array = array('i', [0])
+        targets: array = array('i')
+        costs: array = array('d')
+        for node in node_list:
+            for connection in graph.get_connections(node):
+                targets.append(index[connection.to_node])
+                costs.append(connection.get_cost())
+            offsets.append(len(targets))
+        return cls(node_list, offsets, targets, costs)
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def neighbors(self, index: int) -> range:
+        return range(self.offsets[index], self.offsets[index + 1])
+
+    def edge_cost(self, from_index: int, to_index: int) -> float:
+        # Keep the cheapest connection if there are several between the two nodes
+        return min(self.costs[edge] for edge in self.neighbors(from_index) if self.targets[edge] == to_index)
+
+    def connections_for_path(self, indices: List[int]) -> List[Connection]:
+        """
+        ### Description
+        Converts the node numbers returned by a search over the frozen graph into a list of connections.
+
+        ### Parameters
+        - `indices: List[int]`: The node numbers of the path, start and goal included.
+
+        ### Returns
+        - `List[Connection]`: The connections between consecutive nodes, with their costs.
+        """
+        return [Connection(self.nodes[indices[i]], self.nodes[indices[i + 1]], self.edge_cost(indices[i], indices[i + 1])) for i in range(len(indices) - 1)]
+
+    @staticmethod
+    def _layout(node_count: int, edge_count: int) -> Tuple[int, int, int]:
+        # Costs go first so the doubles are aligned, then the offsets and the targets
+        offsets_start: int = 8 * edge_count
+        targets_start: int = offsets_start + 4 * (node_count + 1)
+        return offsets_start, targets_start, targets_start + 4 * edge_count
+
+    @classmethod
+    def _attach(cls, nodes: List[Node], memory: shared_memory.SharedMemory, edge_count: int) -> 'CSRGraph':
+        offsets_start, targets_start, end = cls._layout(len(nodes), edge_count)
+        buffer: memoryview = memory.buf
+        costs: memoryview = buffer[:offsets_start].cast('d')
+        offsets: memoryview = buffer[offsets_start:targets_start].cast('i')
+        targets: memoryview = buffer[targets_start:end].cast('i')
+        return cls(nodes, offsets, targets, costs, memory)
+
+    def share(self) -> 'CSRGraph':
+        """
+        ### Description
+        Copies the arrays to a new shared memory block.
+
+        ### Returns
+        CSRGraph: The copy, which can be sent to other processes without copying its arrays.
+        """
+        edge_count: int = len(self.targets)
+        offsets_start, targets_start, end = self._layout(len(self.nodes), edge_count)
+        # Blocks cannot be empty
+        memory = shared_memory.SharedMemory(create=True, size=max(1, end))
+        memory.buf[:offsets_start] = array('d', self.costs).tobytes()
+        memory.buf[offsets_start:targets_start] = array('i', self.offsets).tobytes()
+        memory.buf[targets_start:end] = array('i', self.targets).tobytes()
+        return self._attach(self.nodes, memory, edge_count)
+
+    def close(self):
+        if self.memory is None:
+            return
+        # The block cannot be closed while views of it are alive
+        for view in (self.costs, self.offsets, self.targets):
+            view.release()
+        self.memory.close()
+
+    def unlink(self):
+        if self.memory is not None:
+            self.memory.unlink()
+
+    def __getstate__(self) -> Dict:
+        if self.memory is None:
+            return {"nodes": self.nodes, "offsets": self.offsets, "targets": self.targets, "costs": self.costs}
+        return {"nodes": self.nodes, "memory_name": self.memory.name, "edge_count": len(self.targets)}
+
+    def __setstate__(self, state: Dict):
+        if "memory_name" in state:
+            memory = shared_memory.SharedMemory(name=state["memory_name"])
+            self.__dict__.update(self._attach(state["nodes"], memory, state["edge_count"]).__dict__)
+        else:
+            self.__init__(state["nodes"], state["offsets"], state["targets"], state["costs"])
@@ -0,0 +1,82 @@
+import heapq
+import time
+from array import array
+from typing import List, Tuple
+from utils.a_star import Heuristic
+from utils.csr_graph import CSRGraph
+from utils.grid_a_star import rebuild_tile_path
+from utils.search_stats import SearchStats
+
+def pathfind_csr_astar(graph: CSRGraph, start: int, goal: int, heuristic: Heuristic|None = None, stats: SearchStats|None = None) -> List[int]|None:
+    """
+    ### Description
+    Perform the A* pathfinding algorithm on a frozen graph, reading its connections from
+    the CSR arrays. Costs, parents and the closed set live in flat arrays indexed by node
+    number, like in pathfind_grid_astar, so no node records or connections are allocated
+    during the search. Without a heuristic it is Dijkstra's algorithm.
+
+    ### Parameters
+    - graph: CSRGraph. The frozen graph to search.
+    - start: int. The number of the start node.
+    - goal: int. The number of the goal node.
+    - heuristic: Heuristic|None. If given, estimates the cost from the nodes of the graph to the goal.
+    - stats: SearchStats|None. If given, filled in with the counters of the search.
+
+    ### Returns
+    List[int]|None: The node numbers from start to goal, both included, or None if the goal
+    cannot be reached. `graph.connections_for_path` turns them into connections.
+    """
+    started: float = time.perf_counter()
+    nodes = graph.nodes
+    offsets = graph.offsets
+    targets = graph.targets
+    costs = graph.costs
+    size: int = len(nodes)
+    cost_so_far: array = array('d', [float('inf')]) * size
+    parents: array = array('i', [-1]) * size
+    closed: bytearray = bytearray(size)
+    cost_so_far[start] = 0
+    estimate: float = heuristic.estimate(nodes[start]) if heuristic is not None else 0
+    open_heap: List[Tuple[float, float, int]] = [(estimate, 0, start)]
+
+    expanded: int = 0
+    relaxed: int = 0
+    peak_open: int = 1
+    reached: bool = False
+    while open_heap:
+        _, _, current = heapq.heappop(open_heap)
+        if closed[current]:
+            continue
+        if current == goal:
+            reached = True
+            break
+        closed[current] = 1
+        expanded += 1
+
+        current_cost: float = cost_so_far[current]
+        for edge in range(offsets[current], offsets[current + 1]):
+            neighbor: int = targets[edge]
+            relaxed += 1
+            neighbor_cost: float = current_cost + costs[edge]
+            if neighbor_cost < cost_so_far[neighbor]:
+                cost_so_far[neighbor] = neighbor_cost
+                parents[neighbor] = current
+                # The heuristic may not be consistent, so closed nodes may be reopened
+                closed[neighbor] = 0
+                estimate = heuristic.estimate(nodes[neighbor]) if heuristic is not None else 0
+                heapq.heappush(open_heap, (neighbor_cost + estimate, -neighbor_cost, neighbor))
+        if len(open_heap) > peak_open:
+            peak_open = len(open_heap)
+
+    if stats is not None:
+        stats.nodes_expanded += expanded
+        stats.edges_relaxed += relaxed
+        stats.peak_open = max(stats.peak_open, peak_open)
+    if not reached:
+        if stats is not None:
+            stats.finish(started, None)
+        return None
+    path: List[int] = rebuild_tile_path(parents, start, goal)
+    if stats is not None:
+        stats.finish(started, len(path) - 1)
+    return path
@@ -1,8 +1,11 @@
-from typing import List
+import heapq
+import time
+from typing import Dict, List, Tuple
 from dataclasses import dataclass
 from utils.graph import Graph
 from utils.node import Node
 from utils.connection import Connection
+from utils.search_stats import SearchStats
 
 @dataclass
 class NodeRecord:
@@ -36,7 +39,7 @@ class PathfindingList:
     A list of node records used in the pathfinding algorithm.
 
     ### Attributes
-    - `records`: The list of node records.
+    - `records`: The node records, indexed by their node.
 
     ### Methods
     - `__init__()`: Initializes the list with an empty list.
@@ -48,37 +51,91 @@ class PathfindingList:
     - `smallest_element() -> NodeRecord`: Returns the record with the smallest cost so far.
     """
     def __init__(self):
-        self.records: List[NodeRecord] = []
+        self.records: Dict[Node, NodeRecord] = {}
+        self._heap: List[Tuple[float, int, NodeRecord]] = []
+        self._counter: int = 0
     
     def __len__(self):
         return len(self.records)
     
     def add(self, record: NodeRecord):
-        self.records.append(record)
+        # Adding a record that is already in the list just refreshes its priority
+        self.records[record.node] = record
+        self._counter += 1
+        heapq.heappush(self._heap, (record.cost_so_far, self._counter, record))
     
     def remove(self, record: NodeRecord):
-        self.records.remove(record)
+        # The heap entry is left behind and discarded lazily by smallest_element
+        if self.records.get(record.node) is record:
+            del self.records[record.node]
     
     def contains(self, node: Node) -> bool:
-        return any(record.node == node for record in self.records)
+        return node in self.records
     
     def find(self, node: Node) -> NodeRecord|None:
-        for record in self.records:
-            if record.node == node:
-                return record
-        return None
+        return self.records.get(node)
     
     def smallest_element(self) -> NodeRecord:
-        return min(self.records, key=lambda x: x.cost_so_far)
+        # Drop entries of removed records or of records whose cost has changed since they were pushed
+        while self._heap:
+            cost, _, record = self._heap[0]
+            if self.records.get(record.node) is record and cost == record.cost_so_far:
+                return record
+            heapq.heappop(self._heap)
+        raise ValueError("smallest_element() called on an empty list")
+
+class ClosedList:
+    """
+    ### Description
+    A list of the node records already processed in the pathfinding algorithm. Unlike
+    PathfindingList it is never asked for its smallest element, so it keeps no heap.
+
+    ### Attributes
+    - `records`: The node records, indexed by their node.
+
+    ### Methods
+    - `__init__()`: Initializes the list with an empty list.
+    - `__len__()`: Returns the number of records in the list.
+    - `add(record: NodeRecord)`: Adds a record to the list.
+    - `remove(record: NodeRecord)`: Removes a record from the list.
+    - `contains(node: Node) -> bool`: Returns whether the list contains a node.
+    - `find(node: Node) -> NodeRecord|None`: Finds a record in the list.
+    """
+    def __init__(self):
+        self.records: Dict[Node, NodeRecord] = {}
+    
+    def __len__(self):
+        return len(self.records)
+    
+    def add(self, record: NodeRecord):
+        self.records[record.node] = record
+    
+    def remove(self, record: NodeRecord):
+        if self.records.get(record.node) is record:
+            del self.records[record.node]
+    
+    def contains(self, node: Node) -> bool:
+        return node in self.records
+    
+    def find(self, node: Node) -> NodeRecord|None:
+        return self.records.get(node)
+
+def pathfind_dijkstra(graph: Graph, start: Node, goal: Node, stats: SearchStats|None = None) -> List[Connection]|None:
+    # Goals in another connected component are rejected without searching
+    if not graph.is_reachable(start, goal):
+        return None
 
-def pathfind_dijkstra(graph: Graph, start: Node, goal: Node) -> List[Connection]|None:
     # Initialize the record for the start node
     start_record = NodeRecord(node=start, cost_so_far=0)
     
     # Initialize the open and closed lists
     open_list = PathfindingList()
     open_list.add(start_record)
-    closed_list = PathfindingList()
+    closed_list = ClosedList()
+    started = time.perf_counter()
+    expanded = 0
+    relaxed = 0
+    peak_open = 1
     
     # Iterate through processing each node
     while len(open_list) > 0:
@@ -87,9 +144,11 @@ def pathfind_dijkstra(graph: Graph, start: Node, goal: Node) -> List[Connection]
         # If it is the goal node, then terminate
         if current.node == goal:
             break
+        expanded += 1
             
         # Get its outgoing connections
         connections: List[Connection] = graph.get_connections(current.node)
+        relaxed += len(connections)
         
         # Loop through each connection
         for connection in connections:
@@ -112,16 +171,25 @@ def pathfind_dijkstra(graph: Graph, start: Node, goal: Node) -> List[Connection]
             end_node_record.cost_so_far = end_node_cost
             end_node_record.connection = connection
             
-            # Add it to open list if not already there
-            if not open_list.contains(end_node):
-                open_list.add(end_node_record)
+            # Add it to open list, or refresh its priority if it is already there
+            open_list.add(end_node_record)
                 
+        if len(open_list) > peak_open:
+            peak_open = len(open_list)
+
         # Move current node from open to closed
         open_list.remove(current)
         closed_list.add(current)
     
+    if stats is not None:
+        stats.nodes_expanded += expanded
+        stats.edges_relaxed += relaxed
+        stats.peak_open = max(stats.peak_open, peak_open)
+
     # Return null if no path found
     if current.node != goal:
+        if stats is not None:
+            stats.finish(started, None)
         return None
         
     # Compile the path
@@ -134,4 +202,6 @@ def pathfind_dijkstra(graph: Graph, start: Node, goal: Node) -> List[Connection]
         
     # Reverse the path and return it
     path.reverse()
+    if stats is not None:
+        stats.finish(started, len(path))
     return path
\ No newline at end of file
@@ -0,0 +1,141 @@
+import time
+from array import array
+from collections import deque
+from typing import Deque, List
+from utils.game_graph import GameGraph
+from utils.search_stats import SearchStats
+from utils.walkability_grid import WalkabilityGrid
+
+class FlowField:
+    """
+    ### Description
+    A Dijkstra map of a game graph towards a single target tile.
+    The field stores, for every tile, its distance to the target and the next tile to
+    step on to get closer, so any number of agents can follow it with O(1) lookups.
+    It is only rebuilt when the target changes tile or the graph is edited.
+    With a radius the field is built on the layer of agents of that radius.
+
+    ### Attributes
+    - `game_graph`: The game graph the field is built on.
+    - `radius`: The radius in pixels of the agents following the field, or None for the grid of the graph.
+    - `target`: The grid index of the target tile, or None before the first update and after `clear`.
+    - `distances`: The distance of every tile to the target (infinity if unreachable).
+    - `next_tiles`: The next tile towards the target of every tile (-1 if none).
+    - `rebuilds`: The number of times the field has been rebuilt.
+
+    ### Methods
+    - `update(target: int, stats: SearchStats|None = None) -> bool`: Moves the target, rebuilding the field if needed.
+    - `clear()`: Drops the target, so no tile leads anywhere until the next update.
+    - `distance(index: int) -> float`: Returns the distance of a tile to the target.
+    - `next_step(index: int) -> int|None`: Returns the next tile towards the target.
+    - `path_from(index: int) -> List[int]|None`: Returns the tiles from a tile to the target.
+    """
+    def __init__(self, game_graph: GameGraph, radius: int|None = None):
+        self.game_graph: GameGraph = game_graph
+        self.radius: int|None = radius
+        self.target: int|None = None
+        self.distances: array = array('d')
+        self.next_tiles: array = array('i')
+        self.rebuilds: int = 0
+        self._version: int|None = None
+
+    @property
+    def grid(self) -> WalkabilityGrid:
+        # Layers are derived again after edits, so the current one is looked up every time
+        return self.game_graph.layer(self.radius)
+
+    def update(self, target: int, stats: SearchStats|None = None) -> bool:
+        """
+        ### Description
+        Points the field at a target tile. Nothing is done if the target is still on the
+        same tile and the graph has not been edited since the last build.
+
+        ### Parameters
+        - target: int. The grid index of the target tile.
+        - stats: SearchStats|None. If given, filled in with the counters of the rebuild.
+
+        ### Returns
+        bool: Whether the field was rebuilt.
+        """
+        if target == self.target and self.game_graph.version == self._version:
+            return False
+        self.target = target
+        self._version = self.game_graph.version
+        self._build(stats)
+        return True
+
+    def clear(self):
+        self.target = None
+        self._version = None
+        self.distances = array('d')
+        self.next_tiles = array('i')
+
+    def _build(self, stats: SearchStats|None = None):
+        started: float = time.perf_counter()
+        grid: WalkabilityGrid = self.grid
+        size: int = len(grid)
+        self.distances = array('d', [float('inf')]) * size
+        self.next_tiles = array('i', [-1]) * size
+        self.rebuilds += 1
+        if not grid.walkable[self.target]:
+            if stats is not None:
+                stats.finish(started, None)
+            return
+
+        # Every connection costs 1 and goes both ways, so a breadth first search
+        # from the target settles the tiles in the same order as a reverse Dijkstra
+        self.distances[self.target] = 0
+        frontier: Deque[int] = deque([self.target])
+        expanded: int = 0
+        relaxed: int = 0
+        peak_open: int = 1
+        while frontier:
+            current: int = frontier.popleft()
+            expanded += 1
+            distance: float = self.distances[current] + 1
+            neighbors: List[int] = grid.neighbors(current)
+            relaxed += len(neighbors)
+            for neighbor in neighbors:
+                if distance < self.distances[neighbor]:
+                    self.distances[neighbor] = distance
+                    self.next_tiles[neighbor] = current
+                    frontier.append(neighbor)
+            if len(frontier) > peak_open:
+                peak_open = len(frontier)
+
+        if stats is not None:
+            stats.nodes_expanded += expanded
+            stats.edges_relaxed += relaxed
+            stats.peak_open = max(stats.peak_open, peak_open)
+            # The field has no path of its own, it reaches every tile connected to the target
+            stats.finish(started, 0)
+
+    def distance(self, index: int) -> float:
+        if self.target is None:
+            return float('inf')
+        return self.distances[index]
+
+    def next_step(self, index: int) -> int|None:
+        if self.target is None:
+            return None
+        next_tile: int = self.next_tiles[index]
+        return next_tile if next_tile >= 0 else None
+
+    def path_from(self, index: int) -> List[int]|None:
+        """
+        ### Description
+        Follows the field from a tile down to the target.
+
+        ### Parameters
+        - index: int. The grid index of the tile to start from.
+
+        ### Returns
+        List[int]|None: The tile indices from the tile to the target, both included,
+        or None if the target cannot be reached from the tile or the field has no target.
+        """
+        if self.distance(index) == float('inf'):
+            return None
+        path: List[int] = [index]
+        while path[-1] != self.target:
+            path.append(self.next_tiles[path[-1]])
+        return path
@@ -1,12 +1,32 @@
 import math
+import time
+from concurrent.futures import BrokenExecutor, CancelledError
 from typing import Dict, List, Tuple
 import pygame
 from utils.kinematic import Kinematic
 from utils.a_star import pathfind_astar
+from utils.bidirectional_a_star import pathfind_bidirectional_astar
+from utils.theta_star import pathfind_theta_star
 from utils.tactical_a_star import pathfind_tactical_astar
+from utils.grid_a_star import pathfind_grid_astar
+from utils.jump_point_search import pathfind_jps
+from utils.multi_goal_search import NearestGoalSearch, pathfind_grid_nearest_goal
+from utils.collision_bitmap import CollisionBitmap
+from utils.compact_path import CompactPath
 from utils.connection import Connection
 from utils.game_graph import GameGraph
+from utils.node import TileNode
 from utils.manhattan_heuristic import ManhattanHeuristic
+from utils.landmark_heuristic import LandmarkHeuristic, LandmarkTable
+from utils.path_cache import PathCache
+from utils.search_profiler import SearchProfiler
+from utils.search_stats import SearchStats
+from utils.path_request_queue import PathRequestQueue
+from utils.path_worker_pool import PathFuture, PathWorkerPool
+from utils.threat_field import ThreatField
+from utils.flow_field import FlowField
+from utils.lpa_star import LPAStar
+from utils.hierarchical_pathfinding import HierarchicalGraph
 
 def check_collision(zoomed_world: pygame.Surface, x: float, y: float) -> bool:
     """
@@ -42,11 +62,33 @@ def is_valid_position(zoomed_world: pygame.Surface, x: int, y: int) -> bool:
     """
     return not check_collision(zoomed_world, x, y)
 
+# Cache shared by the path helpers, invalidated whenever the game graph is edited
+PATH_CACHE: PathCache = PathCache(capacity=256)
+
+# Threat field shared by the tactical path helpers, recomputed when the threat sources move
+THREAT_FIELD: ThreatField = ThreatField()
+
+# Stats of the pathfinding queries of the game, by call site
+SEARCH_PROFILER: SearchProfiler = SearchProfiler()
+
+# Searches over the flat walkability grid that get_path can use
+GRID_SEARCHES = {
+    "astar": pathfind_grid_astar,
+    "jps": pathfind_jps,
+}
+
+# Searches over the node graph that get_path can use
+GRAPH_SEARCHES = {
+    "astar": pathfind_astar,
+    "bidirectional": pathfind_bidirectional_astar,
+}
+
 # Función para obtener el camino entre dos puntos
-def get_path(game_graph: GameGraph, block_size: int, start_x: int, start_y: int, end_x: int, end_y: int) -> List[Connection]:
+def get_path(game_graph: GameGraph, block_size: int, start_x: int, start_y: int, end_x: int, end_y: int, *, flat: bool = False, grid_search: str = "astar", graph_search: str = "astar", weight: float = 1.0, landmarks: LandmarkTable|None = None, radius: int|None = None, cache: PathCache|None = PATH_CACHE, stats: SearchStats|None = None) -> List[Connection]:
     """
     ### Description
-    Get the path between two points using the A* algorithm.
+    Get the path between two points using the A* algorithm. The node graph is searched
+    unless flat is set; the options after the end point are keyword only.
 
     ### Parameters
     - game_graph: The game graph.
@@ -55,30 +97,73 @@ def get_path(game_graph: GameGraph, block_size: int, start_x: int, start_y: int,
     - start_y: The y coordinate of the start point.
     - end_x: The x coordinate of the end point.
     - end_y: The y coordinate of the end point.
+    - flat: Whether to search the flat walkability grid instead of the node graph.
+    - grid_search: The name of the search of GRID_SEARCHES used when flat is set.
+    - graph_search: The name of the search of GRAPH_SEARCHES used when flat is not set.
+    - weight: The factor of the heuristic of the "astar" searches. Above 1 the path is found
+    faster and costs at most `weight` times the optimal one. 1 keeps the path optimal. Other
+    searches raise a ValueError if given a weight other than 1.
+    - landmarks: A landmark table to guide the search with. It is ignored once the graph has been edited.
+    - radius: If given, the radius in pixels of the agent, whose path is searched on the layer
+    of that radius. Layers are flat grids, so flat must be set. Landmarks are not used on layers.
+    - cache: The cache to reuse paths from, or None to always search.
+    - stats: If given, filled in with the counters of the search. Paths from the cache leave it untouched.
 
     ### Returns
     - The path between the two points
     """
-    start_node = game_graph.nodes.get((start_x // block_size, start_y // block_size))
-    end_node = game_graph.nodes.get((end_x // block_size, end_y // block_size))
+    # The node graph only knows the tiles of the grid of the graph
+    if radius is not None and not flat:
+        raise ValueError("Layers of a radius can only be searched with flat set")
+    # Only the A* searches take a weight, the others always return optimal paths
+    if weight != 1.0 and (grid_search if flat else graph_search) != "astar":
+        raise ValueError(f"The {grid_search if flat else graph_search} search does not take a weight")
+
+    start_node = game_graph.layer_node(radius, start_x // block_size, start_y // block_size)
+    end_node = game_graph.layer_node(radius, end_x // block_size, end_y // block_size)
     
+    if landmarks is not None and (radius is not None or not landmarks.is_valid(game_graph)):
+        landmarks = None
+    grid = game_graph.layer(radius)
+
     if start_node and end_node:
-        heuristic = ManhattanHeuristic(end_node)
-        path = pathfind_astar(game_graph, start_node, end_node, heuristic)
+        if not grid.connected(game_graph.tile_index(start_node), game_graph.tile_index(end_node)):
+            return None
+        key = ((start_node.x, start_node.y), (end_node.x, end_node.y), "landmarks" if landmarks else "manhattan", ("grid", grid_search, weight, radius) if flat else (graph_search, weight))
+        if cache is not None:
+            found, path = cache.get(game_graph, key)
+            if found:
+                return path
+
+        # Searches other than A* were checked above to be asked for no weight
+        options = {"weight": weight} if weight != 1.0 else {}
+        if flat:
+            tiles = GRID_SEARCHES[grid_search](grid, game_graph.tile_index(start_node), game_graph.tile_index(end_node), stats=stats, landmarks=landmarks, **options)
+            path = game_graph.connections_for_tiles(tiles) if tiles else None
+        else:
+            heuristic = LandmarkHeuristic(end_node, landmarks) if landmarks else ManhattanHeuristic(end_node)
+            path = GRAPH_SEARCHES[graph_search](game_graph, start_node, end_node, heuristic, stats=stats, **options)
+
+        if cache is not None:
+            cache.put(game_graph, key, path)
         return path
     return None
 
-def get_path_and_evade(game_graph: GameGraph, block_size: int, start: pygame.Vector2, end: pygame.Vector2, player: pygame.Vector2) -> List[Connection]:
+def get_any_angle_path(game_graph: GameGraph, block_size: int, bitmap: CollisionBitmap, start: pygame.Vector2, end: pygame.Vector2, clearance: int = 0, cache: PathCache|None = PATH_CACHE, stats: SearchStats|None = None) -> List[Connection]|None:
     """
     ### Description
-    Get the path between two points using the A* algorithm and evade the enemies.
+    Get the path between two points using Theta*, whose waypoints are joined by straight
+    segments through open space instead of following the tiles.
 
     ### Parameters
     - game_graph: The game graph.
     - block_size: The size of a block.
+    - bitmap: The collision bitmap of the zoomed world.
     - start: The start point.
     - end: The end point.
-    - player: The player's position that the enemy should evade.
+    - clearance: The distance in pixels the straight segments keep from obstacles.
+    - cache: The cache to reuse paths from, or None to always search.
+    - stats: If given, filled in with the counters of the search. Paths from the cache leave it untouched.
 
     ### Returns
     - The path between the two points
@@ -86,11 +171,107 @@ def get_path_and_evade(game_graph: GameGraph, block_size: int, start: pygame.Vec
     start_node = game_graph.nodes.get((start.x // block_size, start.y // block_size))
     end_node = game_graph.nodes.get((end.x // block_size, end.y // block_size))
 
-    player_node = game_graph.nodes.get((player.x // block_size, player.y // block_size))
+    if start_node and end_node:
+        if not game_graph.is_reachable(start_node, end_node):
+            return None
+        key = ((start_node.x, start_node.y), (end_node.x, end_node.y), "euclidean", ("theta", clearance))
+        if cache is not None:
+            found, path = cache.get(game_graph, key)
+            if found:
+                return path
+
+        path = pathfind_theta_star(game_graph, start_node, end_node, bitmap, clearance, stats)
+        if cache is not None:
+            cache.put(game_graph, key, path)
+        return path
+    return None
+
+def threat_source_tiles(game_graph: GameGraph, block_size: int, sources: pygame.Vector2|List[pygame.Vector2]) -> List[int]:
+    """
+    ### Description
+    Get the tiles of the positions to keep away from.
+
+    ### Parameters
+    - game_graph: The game graph.
+    - block_size: The size of a block.
+    - sources: The position, or the list of positions, to keep away from. Positions outside
+    the walkable tiles are ignored.
+
+    ### Returns
+    - The sorted grid indices of the threat sources.
+    """
+    if isinstance(sources, pygame.Vector2):
+        sources = [sources]
+    source_tiles: List[int] = []
+    for source in sources:
+        source_node = game_graph.nodes.get((source.x // block_size, source.y // block_size))
+        if source_node:
+            source_tiles.append(game_graph.tile_index(source_node))
+    return sorted(set(source_tiles))
+
+def update_threat_field(game_graph: GameGraph, block_size: int, threat_field: ThreatField, sources: pygame.Vector2|List[pygame.Vector2]) -> List[int]:
+    """
+    ### Description
+    Make a threat field match the positions to keep away from.
+
+    ### Parameters
+    - game_graph: The game graph.
+    - block_size: The size of a block.
+    - threat_field: The threat field to update.
+    - sources: The position, or the list of positions, to keep away from. Positions outside
+    the walkable tiles are ignored.
+
+    ### Returns
+    - The grid indices of the threat sources.
+    """
+    source_tiles = threat_source_tiles(game_graph, block_size, sources)
+    threat_field.update(game_graph.grid, source_tiles)
+    return source_tiles
+
+def get_path_and_evade(game_graph: GameGraph, block_size: int, start: pygame.Vector2, end: pygame.Vector2, player: pygame.Vector2|List[pygame.Vector2], *, flat: bool = False, cache: PathCache|None = PATH_CACHE, threat_field: ThreatField = THREAT_FIELD, stats: SearchStats|None = None) -> List[Connection]:
+    """
+    ### Description
+    Get the path between two points using the A* algorithm and evade the enemies.
+    The options after the player are keyword only.
+
+    ### Parameters
+    - game_graph: The game graph.
+    - block_size: The size of a block.
+    - start: The start point.
+    - end: The end point.
+    - player: The player's position that the enemy should evade, or a list of positions to evade.
+    - flat: Whether to search the flat walkability grid instead of the node graph.
+    - cache: The cache to reuse paths from, or None to always search.
+    - threat_field: The threat field to compute the tactical cost with.
+    - stats: If given, filled in with the counters of the search. Paths from the cache leave it untouched.
+
+    ### Returns
+    - The path between the two points
+    """
+    start_node = game_graph.nodes.get((start.x // block_size, start.y // block_size))
+    end_node = game_graph.nodes.get((end.x // block_size, end.y // block_size))
     
     if start_node and end_node:
-        heuristic = ManhattanHeuristic(end_node)
-        path = pathfind_tactical_astar(game_graph, start_node, end_node, heuristic, player_node)
+        if not game_graph.is_reachable(start_node, end_node):
+            return None
+        # The tactical cost depends on the tiles of the threats, so they are part of the search kind
+        source_tiles = update_threat_field(game_graph, block_size, threat_field, player)
+        key = ((start_node.x, start_node.y), (end_node.x, end_node.y), "manhattan", ("tactical-grid" if flat else "tactical", tuple(source_tiles)))
+        if cache is not None:
+            found, path = cache.get(game_graph, key)
+            if found:
+                return path
+
+        if flat:
+            tiles = pathfind_grid_astar(game_graph.grid, game_graph.tile_index(start_node), game_graph.tile_index(end_node), threat_field if source_tiles else None, stats)
+            path = game_graph.connections_for_tiles(tiles) if tiles else None
+        else:
+            heuristic = ManhattanHeuristic(end_node)
+            player_node = game_graph.node_at(source_tiles[0]) if source_tiles else None
+            path = pathfind_tactical_astar(game_graph, start_node, end_node, heuristic, player_node, threat_field, stats)
+
+        if cache is not None:
+            cache.put(game_graph, key, path)
         return path
     return
 
@@ -128,38 +309,370 @@ def test_player_in_range_and_zone(enemy_pos: pygame.Vector2, player_pos: pygame.
     
     return in_range and in_zone
 
-def find_nearest_enemy(game_graph: GameGraph, block_size: int, player: pygame.Vector2, enemy_positions: List[pygame.Vector2]) -> List[Connection]:
+def map_targets_to_tiles(game_graph: GameGraph, block_size: int, start_node: TileNode, targets: List[pygame.Vector2], radius: int|None = None) -> Dict[int, pygame.Vector2]:
     """
     ### Description
-    Find the nearest enemy to the player.
+    Map every reachable target tile to the first target standing on it. Targets in the
+    start tile are ignored, as they would give an empty path, and so are targets in another
+    connected component, which no search could reach.
+
+    ### Parameters
+    - game_graph: The game graph.
+    - block_size: The size of a block.
+    - start_node: The node of the start tile.
+    - targets: The positions of the targets. None entries are skipped.
+    - radius: If given, the radius of the agent, whose layer the targets must be reachable in.
+
+    ### Returns
+    - The targets by the grid index of their tile.
+    """
+    grid = game_graph.layer(radius)
+    target_by_tile: Dict[int, pygame.Vector2] = {}
+    for target in targets:
+        if target is None:
+            continue
+        target_node = game_graph.layer_node(radius, target.x // block_size, target.y // block_size)
+        if target_node and target_node is not start_node and grid.connected(game_graph.tile_index(start_node), game_graph.tile_index(target_node)):
+            target_by_tile.setdefault(game_graph.tile_index(target_node), target)
+    return target_by_tile
+
+def get_path_to_nearest(game_graph: GameGraph, block_size: int, start: pygame.Vector2, targets: List[pygame.Vector2], player: pygame.Vector2|List[pygame.Vector2]|None = None, *, weight: float = 1.0, radius: int|None = None, cache: PathCache|None = PATH_CACHE, threat_field: ThreatField = THREAT_FIELD, stats: SearchStats|None = None) -> Tuple[List[Connection]|None, pygame.Vector2|None]:
+    """
+    ### Description
+    Get the path to the nearest of several targets with a single search.
+    Targets in the start tile are ignored, as they would give an empty path.
+    The options after the player are keyword only.
+
+    ### Parameters
+    - game_graph: The game graph.
+    - block_size: The size of a block.
+    - start: The start point.
+    - targets: The positions of the targets. None entries are skipped.
+    - player: If given, the player's position that the path should evade, or a list of positions to evade.
+    - weight: The factor of the heuristic of the search. Above 1 the path is found faster,
+    but it may lead to another target if it costs at most `weight` times the nearest one.
+    - radius: If given, the radius in pixels of the agent, whose path is searched on the layer of that radius.
+    - cache: The cache to reuse paths from, or None to always search.
+    - threat_field: The threat field to compute the tactical cost with.
+    - stats: If given, filled in with the counters of the search. Paths from the cache leave it untouched.
+
+    ### Returns
+    - The path to the nearest target and the target.
+    """
+    start_node = game_graph.layer_node(radius, start.x // block_size, start.y // block_size)
+    if not start_node:
+        return None, None
+
+    target_by_tile = map_targets_to_tiles(game_graph, block_size, start_node, targets, radius)
+    if not target_by_tile:
+        return None, None
+
+    source_tiles = update_threat_field(game_graph, block_size, threat_field, player) if player is not None else []
+    start_index = game_graph.tile_index(start_node)
+
+    key = (start_index, tuple(sorted(target_by_tile)), "manhattan", ("nearest-grid", tuple(source_tiles), weight, radius))
+    found = False
+    if cache is not None:
+        found, path = cache.get(game_graph, key)
+    if not found:
+        tiles, _ = pathfind_grid_nearest_goal(game_graph.layer(radius), start_index, list(target_by_tile), threat_field if source_tiles else None, weight, stats)
+        path = game_graph.connections_for_tiles(tiles) if tiles else None
+        if cache is not None:
+            cache.put(game_graph, key, path)
+
+    if not path:
+        return None, None
+    return path, target_by_tile[game_graph.tile_index(path[-1].to_node)]
+
+def request_path_to_nearest(game_graph: GameGraph, block_size: int, queue: PathRequestQueue, owner: str, start: pygame.Vector2, targets: List[pygame.Vector2], player: pygame.Vector2|List[pygame.Vector2]|None = None, weight: float = 1.0, radius: int|None = None) -> bool:
+    """
+    ### Description
+    Queue a time-sliced search for the path to the nearest of several targets. Nothing is
+    queued while the agent still has a pending request, so a request made every frame is
+    not restarted before it can finish.
 
     ### Parameters
     - game_graph: The game graph.
     - block_size: The size of a block.
-    - player_x: The x coordinate of the player.
-    - player_y: The y coordinate of the player.
+    - queue: The queue spreading the searches over several frames.
+    - owner: The key of the agent making the request.
+    - start: The start point.
+    - targets: The positions of the targets. None entries are skipped.
+    - player: If given, the player's position that the path should evade, or a list of positions to evade.
+    - weight: The factor of the heuristic of the search, as in get_path_to_nearest.
+    - radius: If given, the radius in pixels of the agent, whose path is searched on the layer of that radius.
+
+    ### Returns
+    - True if a request was queued.
+    """
+    if queue.is_pending(owner):
+        return False
+    start_node = game_graph.layer_node(radius, start.x // block_size, start.y // block_size)
+    if not start_node:
+        return False
+
+    target_by_tile = map_targets_to_tiles(game_graph, block_size, start_node, targets, radius)
+    if not target_by_tile:
+        return False
+
+    # The request keeps its own threat field, the shared one may move before the search ends
+    threat_field = None
+    if player is not None:
+        threat_field = ThreatField()
+        if not update_threat_field(game_graph, block_size, threat_field, player):
+            threat_field = None
+    start_index = game_graph.tile_index(start_node)
+    # The layer is looked up when the search starts, requests restarted after an edit get the new one
+    queue.submit(owner, lambda: NearestGoalSearch(game_graph.layer(radius), start_index, list(target_by_tile), threat_field, weight), target_by_tile)
+    return True
+
+def poll_path_to_nearest(game_graph: GameGraph, queue: PathRequestQueue, owner: str, stats: SearchStats|None = None) -> Tuple[bool, List[Connection]|None, pygame.Vector2|None]:
+    """
+    ### Description
+    Take the result of a request made with request_path_to_nearest, if it has finished.
+
+    ### Parameters
+    - game_graph: The game graph.
+    - queue: The queue the request was made to.
+    - owner: The key of the agent that made the request.
+    - stats: If given and a result is available, filled in with the counters of the search
+    over all the frames it ran in.
+
+    ### Returns
+    - Whether a result was available, the path to the nearest target and the target.
+    """
+    request = queue.poll(owner)
+    if request is None:
+        return False, None, None
+    if stats is not None:
+        request.search.record(stats, request.wall_time)
+    if not request.tiles:
+        return True, None, None
+    return True, game_graph.connections_for_tiles(request.tiles), request.context[request.search.goal]
+
+def submit_path_to_nearest(game_graph: GameGraph, block_size: int, pool: PathWorkerPool, start: pygame.Vector2, targets: List[pygame.Vector2], player: pygame.Vector2|List[pygame.Vector2]|None = None, weight: float = 1.0) -> PathFuture|None:
+    """
+    ### Description
+    Ask the worker pool for the path to the nearest of several targets. The result is
+    taken with path_to_nearest_from_future on a later frame. The path is searched on the
+    layer of the radius of the pool.
+
+    ### Parameters
+    - game_graph: The game graph.
+    - block_size: The size of a block.
+    - pool: The worker pool running the search.
+    - start: The start point.
+    - targets: The positions of the targets. None entries are skipped.
+    - player: If given, the player's position that the path should evade, or a list of positions to evade.
+    - weight: The factor of the heuristic of the search, as in get_path_to_nearest.
+
+    ### Returns
+    - The pending result, or None if there is nothing to search.
+    """
+    start_node = game_graph.layer_node(pool.radius, start.x // block_size, start.y // block_size)
+    if not start_node:
+        return None
+    target_by_tile = map_targets_to_tiles(game_graph, block_size, start_node, targets, pool.radius)
+    if not target_by_tile:
+        return None
+
+    source_tiles = threat_source_tiles(game_graph, block_size, player) if player is not None else []
+    return pool.submit(game_graph.tile_index(start_node), list(target_by_tile), "nearest", source_tiles, target_by_tile, weight)
+
+def path_to_nearest_from_future(game_graph: GameGraph, request: PathFuture) -> Tuple[bool, CompactPath|None, pygame.Vector2|None]:
+    """
+    ### Description
+    Take the result of a request made with submit_path_to_nearest, if it has finished.
+    Results of requests made before the graph was edited are dropped.
+
+    ### Parameters
+    - game_graph: The game graph.
+    - request: The pending result.
+
+    ### Returns
+    - Whether the request has finished, the path to the nearest target and the target.
+    """
+    if not request.done():
+        return False, None, None
+    try:
+        tiles, goal = request.result()
+    except (BrokenExecutor, CancelledError):
+        # The worker died before answering, or the request was cancelled when the graph was
+        # edited; the pool starts a new one on the next request
+        return True, None, None
+    if not tiles or request.version != game_graph.version:
+        return True, None, None
+    return True, CompactPath(game_graph, tiles), request.context[goal]
+
+def get_incremental_path(game_graph: GameGraph, block_size: int, planner: LPAStar, start: pygame.Vector2, end: pygame.Vector2, stats: SearchStats|None = None) -> List[Connection]|None:
+    """
+    ### Description
+    Get the path between two points with an incremental planner, which reuses its previous
+    search when the end point moves or the agent advances along its path. The path is
+    searched on the layer of the radius of the planner.
+
+    ### Parameters
+    - game_graph: The game graph.
+    - block_size: The size of a block.
+    - planner: The planner of the agent.
+    - start: The start point.
+    - end: The end point.
+    - stats: If given, filled in with the counters of the planner.
+
+    ### Returns
+    - The path between the two points
+    """
+    start_node = game_graph.layer_node(planner.radius, start.x // block_size, start.y // block_size)
+    end_node = game_graph.layer_node(planner.radius, end.x // block_size, end.y // block_size)
+
+    if start_node and end_node:
+        started = time.perf_counter()
+        tiles = planner.plan(game_graph.tile_index(start_node), game_graph.tile_index(end_node))
+        if stats is not None:
+            stats.nodes_expanded += planner.expansions
+            stats.edges_relaxed += planner.relaxed
+            stats.peak_open = max(stats.peak_open, planner.peak_queue)
+            stats.finish(started, len(tiles) - 1 if tiles else None)
+        return game_graph.connections_for_tiles(tiles) if tiles else None
+    return None
+
+def get_hierarchical_path(game_graph: GameGraph, block_size: int, hierarchy: HierarchicalGraph, start: pygame.Vector2, end: pygame.Vector2) -> List[Connection]|None:
+    """
+    ### Description
+    Get the first stretch of the path between two points using hierarchical pathfinding.
+    Only the segment up to the next abstract node is refined, which is all an agent that
+    steers towards the first connection of its path needs.
+
+    ### Parameters
+    - game_graph: The game graph.
+    - block_size: The size of a block.
+    - hierarchy: The hierarchical graph built on the game graph.
+    - start: The start point.
+    - end: The end point.
+
+    ### Returns
+    - The path from the start point to the next abstract node towards the end point.
+    """
+    start_node = game_graph.nodes.get((start.x // block_size, start.y // block_size))
+    end_node = game_graph.nodes.get((end.x // block_size, end.y // block_size))
+
+    if start_node and end_node:
+        hierarchical_path = hierarchy.find_path(game_graph.tile_index(start_node), game_graph.tile_index(end_node))
+        if hierarchical_path:
+            return game_graph.connections_for_tiles(hierarchical_path.next_segment())
+    return None
+
+def update_flow_field(game_graph: GameGraph, block_size: int, flow_field: FlowField, target: pygame.Vector2, stats: SearchStats|None = None) -> bool:
+    """
+    ### Description
+    Point a flow field at the tile of a target. The field is only rebuilt when the target changes tile.
+    While the target stands on a tile blocked in the layer of the field, the field is cleared,
+    so agents following it get no path instead of one to a tile the target has left, like
+    searches to a blocked tile.
+
+    ### Parameters
+    - game_graph: The game graph.
+    - block_size: The size of a block.
+    - flow_field: The flow field to update.
+    - target: The position of the target.
+    - stats: If given, filled in with the counters of the rebuild.
+
+    ### Returns
+    - True if the field was rebuilt, False otherwise.
+    """
+    target_node = game_graph.layer_node(flow_field.radius, target.x // block_size, target.y // block_size)
+    if not target_node:
+        flow_field.clear()
+        return False
+    return flow_field.update(game_graph.tile_index(target_node), stats)
+
+def get_flow_field_path(game_graph: GameGraph, block_size: int, flow_field: FlowField, start: pygame.Vector2, stats: SearchStats|None = None) -> CompactPath|None:
+    """
+    ### Description
+    Get the path from a point to the target of a flow field.
+
+    ### Parameters
+    - game_graph: The game graph.
+    - block_size: The size of a block.
+    - flow_field: The flow field to follow.
+    - start: The start point.
+    - stats: If given, filled in with the path read from the field.
+
+    ### Returns
+    - The path from the point to the target of the field.
+    """
+    start_node = game_graph.layer_node(flow_field.radius, start.x // block_size, start.y // block_size)
+    if not start_node or flow_field.target is None:
+        return None
+    started = time.perf_counter()
+    tiles = flow_field.path_from(game_graph.tile_index(start_node))
+    if stats is not None:
+        stats.finish(started, len(tiles) - 1 if tiles else None)
+    return CompactPath(game_graph, tiles) if tiles else None
+
+def find_nearest_enemy_with_flow_field(game_graph: GameGraph, block_size: int, flow_field: FlowField, enemy_positions: List[pygame.Vector2], stats: SearchStats|None = None) -> Tuple[List[Connection]|None, pygame.Vector2|None]:
+    """
+    ### Description
+    Find the nearest enemy to the target of a flow field, reading the distances of the field
+    instead of searching. The path goes from the target of the field to the enemy.
+
+    ### Parameters
+    - game_graph: The game graph.
+    - block_size: The size of a block.
+    - flow_field: The flow field towards the player.
     - enemy_positions: The positions of the enemies.
+    - stats: If given, filled in with the path read from the field.
 
     ### Returns
-    - The path to the nearest enemy and the target enemy.
+    - The path to the nearest enemy and the target enemy, or None and None if the field has no target.
     """
+    if flow_field.target is None:
+        return None, None
+    started = time.perf_counter()
     best_distance: float = float('inf')
-    best_route: List[Connection] = None
+    best_tile: int|None = None
     target_enemy = None
 
     for enemy in enemy_positions:
         if enemy is None:
             continue
-        path_to_enemy = get_path(game_graph, block_size, player.x, player.y, enemy.x, enemy.y)
-        if path_to_enemy:
-            # Calculate distance to enemy
-            distance = len(path_to_enemy)
-            if distance < best_distance:
-                best_distance = distance
-                best_route = path_to_enemy
-                target_enemy = enemy
+        enemy_node = game_graph.layer_node(flow_field.radius, enemy.x // block_size, enemy.y // block_size)
+        if not enemy_node:
+            continue
+        enemy_tile = game_graph.tile_index(enemy_node)
+        distance = flow_field.distance(enemy_tile)
+        # Enemies on the player's tile are skipped, as they would give an empty path
+        if 0 < distance < best_distance:
+            best_distance = distance
+            best_tile = enemy_tile
+            target_enemy = enemy
+
+    if best_tile is None:
+        if stats is not None:
+            stats.finish(started, None)
+        return None, None
+    # Connections go both ways, so the enemy's way down the field reversed is the player's path
+    tiles = flow_field.path_from(best_tile)
+    tiles.reverse()
+    if stats is not None:
+        stats.finish(started, len(tiles) - 1)
+    return game_graph.connections_for_tiles(tiles), target_enemy
+
+def find_nearest_enemy(game_graph: GameGraph, block_size: int, player: pygame.Vector2, enemy_positions: List[pygame.Vector2]) -> List[Connection]:
+    """
+    ### Description
+    Find the nearest enemy to the player.
+
+    ### Parameters
+    - game_graph: The game graph.
+    - block_size: The size of a block.
+    - player: The position of the player.
+    - enemy_positions: The positions of the enemies.
 
-    return best_route, target_enemy
+    ### Returns
+    - The path to the nearest enemy and the target enemy.
+    """
+    return get_path_to_nearest(game_graph, block_size, player, enemy_positions)
 
 def find_nearest_target_and_evade_obstacles(game_graph: GameGraph, block_size: int, player: pygame.Vector2, blackhole_positions: List[Dict[str, int|pygame.Surface]], enemy: pygame.Vector2) -> List[Connection]:
     """
@@ -176,32 +689,16 @@ def find_nearest_target_and_evade_obstacles(game_graph: GameGraph, block_size: i
     ### Returns
     - The path to the nearest blackhole and the target blackhole.
     """
-    best_distance: float = float('inf')
-    best_route: List[Connection] = None
-    target_blackhole = None
-
-    for blackhole in blackhole_positions:
-        if blackhole is None:
-            continue
-        path_to_blackhole = get_path_and_evade(game_graph, block_size, player, blackhole, enemy)
-        if path_to_blackhole:
-            # Calculate distance to blackhole
-            distance = len(path_to_blackhole)
-            if distance < best_distance:
-                best_distance = distance
-                best_route = path_to_blackhole
-                target_blackhole = blackhole
-
-    return best_route, target_blackhole
+    return get_path_to_nearest(game_graph, block_size, player, blackhole_positions, enemy)
 
-def draw_path(screen: pygame.Surface, path: List[Connection], camera_x: int, camera_y: int, block_size: int, color: Tuple[int, int, int]|str = (255, 0, 0)) -> None:
+def draw_path(screen: pygame.Surface, path: List[Connection]|CompactPath, camera_x: int, camera_y: int, block_size: int, color: Tuple[int, int, int]|str = (255, 0, 0)) -> None:
     """
     ### Description
     Draw the path on the screen.
 
     ### Parameters
     - screen: The screen surface.
-    - path: The path to draw.
+    - path: The path to draw, as connections or as a compact path.
     - camera_x: The x coordinate of the camera.
     - camera_y: The y coordinate of the camera.
     - block_size: The size of a block.
@@ -209,7 +706,12 @@ def draw_path(screen: pygame.Surface, path: List[Connection], camera_x: int, cam
     ### Returns
     - None
     """
-    if path:
+    if isinstance(path, CompactPath):
+        # The points are read from the tile indices, without building the connections
+        points = [(x - camera_x, y - camera_y) for x, y in path.points(block_size)[:-1]]
+        if len(points) > 1:
+            pygame.draw.lines(screen, color, False, points, 2)
+    elif path:
         # Draw path nodes
         for i in range(len(path)-1):
             start = path[i].from_node
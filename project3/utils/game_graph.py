@@ -1,7 +1,21 @@
+from array import array
+from collections import OrderedDict
 from typing import Dict, List, Tuple
 import pygame
 from utils.node import Node, TileNode
 from utils.graph import Graph
+from utils.connection import Connection
+from utils.walkability_grid import WalkabilityGrid
+from utils.collision_bitmap import CollisionBitmap
+from utils.graph_cache import GraphCache
+from utils.csr_graph import CSRGraph
+
+# Directions of the connections of a tile, bit i of a tile in a GraphCache is direction i
+DIRECTIONS: List[Tuple[int, int]] = [(0, 1), (1, 0), (0, -1), (-1, 0)]  # N, E, S, W
+# Order in which a freshly built graph lists the connections that end at a tile
+REVERSE_DIRECTIONS: List[Tuple[int, int]] = [(0, -1), (-1, 0), (1, 0), (0, 1)]
+# Number of connection lists kept by a graph with implicit adjacency
+CONNECTION_POOL_SIZE: int = 512
 
 class GameGraph(Graph):
     """
@@ -12,38 +26,255 @@ class GameGraph(Graph):
     - `surface`: The surface representing the game world.
     - `block_size`: The size of each tile in the game world.
     - `nodes`: A dictionary mapping tile coordinates to nodes.
+    - `grid`: The flat walkability grid of the game world.
+    - `bitmap`: The collision bitmap of the surface, the walkable tiles are found on it. Built
+    when first needed, so graphs loaded from a cache never read the pixels.
+    - `implicit`: Whether connections are worked out from the grid when asked for instead of
+    being stored. The graph then holds no connection besides the ones of the last
+    CONNECTION_POOL_SIZE tiles asked for; searches on the grid never need any.
+    - `clearance`: The distance in pixels from the point of every tile to the nearest obstacle,
+    in the Chebyshev metric and capped at `clearance_limit`. Computed when a layer is first asked for.
+    - `clearance_limit`: The cap of `clearance`.
 
     ### Methods
     - `build_graph()`: Creates a graph from the game world.
+    - `load_graph(cache: GraphCache) -> bool`: Creates the graph from a cache file, if it is up to date.
+    - `save_graph(cache: GraphCache)`: Writes the graph to a cache file.
+    - `find_walkable_tiles() -> bytearray`: Returns 1 for every tile without walls nor obstacles.
+    - `compute_clearance(limit: int)`: Computes the distance of every tile to the obstacles, up to a limit.
+    - `layer(radius: int|None) -> WalkabilityGrid`: Returns the walkability grid of agents of a given radius.
+    - `layer_node(radius: int|None, x: int, y: int) -> TileNode|None`: Returns the node of a tile if it is walkable in a layer.
+    - `tile_node(index: int) -> TileNode`: Returns the node of a tile, made for it if the graph has none.
+    - `tile_index(node: TileNode) -> int`: Returns the grid index of a node.
+    - `node_at(index: int) -> TileNode|None`: Returns the node of a grid index.
+    - `connections_for_tiles(tiles: List[int]) -> List[Connection]`: Converts a list of grid indices into a path.
+    - `is_reachable(start: Node, goal: Node) -> bool`: Returns whether two nodes are in the same connected component.
     - `is_wall(x: int, y: int) -> bool`: Returns whether a tile is a wall.
     - `add_connections_for_tile(x: int, y: int)`: Adds connections for a tile.
+    - `get_connections(from_node: Node) -> List[Connection]`: Returns the connections that leave a node.
+    - `get_reverse_connections(to_node: Node) -> List[Connection]`: Returns the connections that end at a node.
+    - `freeze() -> CSRGraph`: Returns a copy of the graph in compressed sparse row arrays, tiles numbered in the order of `nodes`.
+    - `set_walkable(x: int, y: int, walkable: bool)`: Adds or removes a tile from the graph.
     - `draw_world_representation(surface: pygame.Surface, camera_x: int, camera_y: int)`: Draws the world representation.
 
     """
-    def __init__(self, surface: pygame.Surface, block_size: int = 32):
+    def __init__(self, surface: pygame.Surface, block_size: int = 32, bitmap: CollisionBitmap|None = None, cache: GraphCache|None = None, implicit: bool = False):
         super().__init__()
         self.block_size: int = block_size
         self.surface: pygame.Surface = surface
+        self.bitmap: CollisionBitmap|None = bitmap
+        self.implicit: bool = implicit
+        self._connection_pool: OrderedDict[Tuple[int, bool], List[Connection]] = OrderedDict()
+        self.clearance: array|None = None
+        self.clearance_limit: int = 0
+        self._layers: Dict[int, WalkabilityGrid] = {}
+        self._layer_nodes: Dict[Tuple[int, int], TileNode] = {}
+        self._edits: Dict[int, bool] = {}
         self.nodes: Dict[pygame.Vector2, TileNode] = {}
-        self.build_graph()
+        self.grid: WalkabilityGrid = WalkabilityGrid(0, 0)
+        if cache is None or not self.load_graph(cache):
+            self.build_graph()
+            if cache is not None:
+                self.save_graph(cache)
     
     def build_graph(self):
         width: int = self.surface.get_width() // self.block_size
         height: int = self.surface.get_height() // self.block_size
+        self.grid = WalkabilityGrid(width, height, self.find_walkable_tiles())
         
         # Create nodes for walkable tiles
         for y in range(height):
             for x in range(width):
-                if not self.is_wall(x, y) and not self.has_obstacle(x, y):
-                    node: TileNode = TileNode(x, y)
-                    self.nodes[(x, y)] = node
+                if self.grid.walkable[self.grid.index(x, y)]:
+                    self.nodes[(x, y)] = TileNode(x, y)
                     
-        # Create connections between adjacent walkable tiles
+        # Create connections between adjacent walkable tiles, implicit graphs work them out when asked
+        if not self.implicit:
+            for y in range(height):
+                for x in range(width):
+                    if (x, y) in self.nodes:
+                        self.add_connections_for_tile(x, y)
+
+        # Label the connected components so searches can reject unreachable goals at once
+        self.grid.label_components()
+
+    def load_graph(self, cache: GraphCache) -> bool:
+        """
+        ### Description
+        Creates the nodes, connections and grid of the graph from a cache file, adding the
+        connections in the same order as `build_graph`.
+
+        ### Parameters
+        - `cache: GraphCache`: The cache of the map.
+
+        ### Returns
+        - `bool`: Whether the cache was up to date and the graph was loaded.
+        """
+        width: int = self.surface.get_width() // self.block_size
+        height: int = self.surface.get_height() // self.block_size
+        cached = cache.read(width, height)
+        if cached is None:
+            return False
+        walkable, adjacency, components = cached
+        self.grid = WalkabilityGrid(width, height, walkable, components)
+        for index, tile_walkable in enumerate(walkable):
+            if tile_walkable:
+                x, y = self.grid.coordinates(index)
+                self.nodes[(x, y)] = TileNode(x, y)
+        if not self.implicit:
+            for (x, y), node in self.nodes.items():
+                bits: int = adjacency[self.grid.index(x, y)]
+                for direction, (dx, dy) in enumerate(DIRECTIONS):
+                    if bits >> direction & 1:
+                        self.add_connection(node, self.nodes[(x + dx, y + dy)], 1.0)
+        if components is None:
+            self.grid.label_components()
+        return True
+
+    def save_graph(self, cache: GraphCache):
+        adjacency: bytearray = bytearray(len(self.grid))
+        for (x, y), node in self.nodes.items():
+            for connection in self.get_connections(node):
+                direction: int = DIRECTIONS.index((connection.to_node.x - x, connection.to_node.y - y))
+                adjacency[self.grid.index(x, y)] |= 1 << direction
+        cache.write(self.grid.width, self.grid.height, self.grid.walkable, adjacency, self.grid.components)
+    
+    def find_walkable_tiles(self) -> bytearray:
+        """
+        ### Description
+        Runs `is_wall` and `has_obstacle` for every tile at once on the collision bitmap,
+        which holds a 1 for every bright pixel. The rows of the window of a row of tiles are
+        ORed together as integers, so every tile only needs one `bytes.find` on the merged row
+        instead of a `get_at` for each of its pixels.
+
+        ### Returns
+        - `bytearray`: 1 for every walkable tile, in the order of the walkability grid.
+        """
+        if self.bitmap is None:
+            self.bitmap = CollisionBitmap(self.surface)
+        bitmap: CollisionBitmap = self.bitmap
+        pixel_width: int = bitmap.width
+        pixel_height: int = bitmap.height
+        width: int = pixel_width // self.block_size
+        height: int = pixel_height // self.block_size
+        # Same window as has_obstacle, which starts one pixel further for odd block sizes
+        low: int = -self.block_size // 2
+        high: int = self.block_size // 2
+        walkable: bytearray = bytearray(width * height)
         for y in range(height):
+            # Pixels out of the surface count as obstacles, like the IndexError of get_at
+            top: int = y * self.block_size + low
+            bottom: int = y * self.block_size + high
+            if top < 0 or bottom >= pixel_height:
+                continue
+            window: int = 0
+            for pixel_y in range(top, bottom + 1):
+                window |= int.from_bytes(bitmap.blocked[pixel_y * pixel_width:(pixel_y + 1) * pixel_width], "big")
+            merged: bytes = window.to_bytes(pixel_width, "big")
+            center_row: int = (y * self.block_size + high) * pixel_width
             for x in range(width):
-                if (x, y) in self.nodes:
-                    self.add_connections_for_tile(x, y)
-    
+                left: int = x * self.block_size + low
+                right: int = x * self.block_size + high
+                if left < 0 or right >= pixel_width:
+                    continue
+                if merged.find(1, left, right + 1) == -1 and not bitmap.blocked[center_row + x * self.block_size + high]:
+                    walkable[y * width + x] = 1
+        return walkable
+
+    def compute_clearance(self, limit: int):
+        """
+        ### Description
+        Computes the distance transform of the collision bitmap at the point of every tile,
+        the one agents steer to: the Chebyshev distance to the nearest bright pixel, or to the
+        nearest pixel out of the surface, which count as obstacles like in `has_obstacle`.
+        For every row of tiles the pixel rows around it are ORed into a window one distance at
+        a time, so every tile only needs one `bytes.find` per pixel of distance.
+
+        ### Parameters
+        - `limit: int`: The largest distance worth measuring, larger ones are stored as `limit`.
+        """
+        if self.bitmap is None:
+            self.bitmap = CollisionBitmap(self.surface)
+        blocked: bytes = self.bitmap.blocked
+        pixel_width: int = self.bitmap.width
+        pixel_height: int = self.bitmap.height
+        width: int = pixel_width // self.block_size
+        height: int = pixel_height // self.block_size
+        clearance: array = array('i', [0]) * (width * height)
+        for y in range(height):
+            pixel_y: int = y * self.block_size
+            # The edges of the surface bound the distance before any pixel is read
+            bounds: List[int] = [min(limit, x * self.block_size + 1, pixel_width - x * self.block_size, pixel_y + 1, pixel_height - pixel_y) for x in range(width)]
+            pending: List[int] = list(range(width))
+            window: int = 0
+            distance: int = 0
+            while pending:
+                for row in {pixel_y - distance, pixel_y + distance}:
+                    if 0 <= row < pixel_height:
+                        window |= int.from_bytes(blocked[row * pixel_width:(row + 1) * pixel_width], "big")
+                merged: bytes = window.to_bytes(pixel_width, "big")
+                still_pending: List[int] = []
+                for x in pending:
+                    pixel_x: int = x * self.block_size
+                    if distance >= bounds[x]:
+                        clearance[y * width + x] = bounds[x]
+                    elif merged.find(1, pixel_x - distance, pixel_x + distance + 1) != -1:
+                        clearance[y * width + x] = distance
+                    else:
+                        still_pending.append(x)
+                pending = still_pending
+                distance += 1
+        self.clearance = clearance
+        self.clearance_limit = limit
+        self._layers.clear()
+
+    def layer(self, radius: int|None) -> WalkabilityGrid:
+        """
+        ### Description
+        Returns the walkability grid of agents of a given radius: a tile is walkable if no
+        obstacle is within `radius` pixels of its point in either axis. Layers are derived from
+        the clearance of the tiles, so the pixels are only read once for all the radii, and
+        they keep the tiles removed with `set_walkable`; tiles added with it are only walkable
+        if the agent fits in them. The block-sized window of
+        `has_obstacle` is the layer of radius `block_size // 2`.
+
+        ### Parameters
+        - `radius: int|None`: The radius of the agent in pixels, or None for the grid of the graph.
+
+        ### Returns
+        - `WalkabilityGrid`: The layer, with its connected components labelled.
+        """
+        if radius is None:
+            return self.grid
+        if radius in self._layers:
+            return self._layers[radius]
+        if self.clearance is None or radius >= self.clearance_limit:
+            self.compute_clearance(radius + 1)
+        walkable: bytearray = bytearray(distance > radius for distance in self.clearance)
+        # Tiles blocked by an edit stay blocked, tiles unblocked by one still need the room of the agent
+        for index, tile_walkable in self._edits.items():
+            walkable[index] = tile_walkable and self.clearance[index] > radius
+        layer = WalkabilityGrid(self.grid.width, self.grid.height, walkable)
+        layer.label_components()
+        self._layers[radius] = layer
+        return layer
+
+    def layer_node(self, radius: int|None, x: int, y: int) -> TileNode|None:
+        # Points of the agents are floats
+        x, y = int(x), int(y)
+        grid: WalkabilityGrid = self.layer(radius)
+        if not (0 <= x < grid.width and 0 <= y < grid.height and grid.walkable[grid.index(x, y)]):
+            return None
+        return self.tile_node(grid.index(x, y))
+
+    def tile_node(self, index: int) -> TileNode:
+        # Layers of small agents have tiles the graph has no node for, they get one of their own
+        x, y = self.grid.coordinates(index)
+        node: TileNode|None = self.nodes.get((x, y))
+        if node is None:
+            node = self._layer_nodes.setdefault((x, y), TileNode(x, y))
+        return node
+
     def is_wall(self, x: int, y: int) -> bool:
         pixel_x: int = x * self.block_size + self.block_size // 2
         pixel_y: int = y * self.block_size + self.block_size // 2
@@ -78,14 +309,113 @@ class GameGraph(Graph):
                     return True
     
     def add_connections_for_tile(self, x: int, y: int):
-        directions: List[Tuple[int, int]] = [(0, 1), (1, 0), (0, -1), (-1, 0)]  # N, E, S, W
         current_node = self.nodes[(x, y)]
         
-        for dx, dy in directions:
+        for dx, dy in DIRECTIONS:
             new_x, new_y = x + dx, y + dy
             if (new_x, new_y) in self.nodes:
                 neighbor_node: TileNode = self.nodes[(new_x, new_y)]
                 self.add_connection(current_node, neighbor_node, 1.0)
+
+    def get_connections(self, from_node: Node) -> List[Connection]:
+        if not self.implicit:
+            return super().get_connections(from_node)
+        return self._implicit_connections(from_node, False)
+
+    def get_reverse_connections(self, to_node: Node) -> List[Connection]:
+        if not self.implicit:
+            return super().get_reverse_connections(to_node)
+        return self._implicit_connections(to_node, True)
+
+    def freeze(self) -> CSRGraph:
+        # Every walkable tile is numbered, also the ones without connections, and implicit graphs work too
+        return CSRGraph.from_graph(self, self.nodes.values())
+
+    def _implicit_connections(self, node: Node, reverse: bool) -> List[Connection]:
+        # Nodes removed from the graph, or of another graph, have no connections
+        if not isinstance(node, TileNode) or self.nodes.get((node.x, node.y)) is not node:
+            return []
+        width: int = self.grid.width
+        height: int = self.grid.height
+        walkable: bytearray = self.grid.walkable
+        key: Tuple[int, bool] = (node.y * width + node.x, reverse)
+        connections: List[Connection]|None = self._connection_pool.get(key)
+        if connections is not None:
+            self._connection_pool.move_to_end(key)
+            return connections
+
+        # Same order as the lists of a built graph, so searches break ties the same way
+        connections = []
+        for dx, dy in REVERSE_DIRECTIONS if reverse else DIRECTIONS:
+            x, y = node.x + dx, node.y + dy
+            if 0 <= x < width and 0 <= y < height and walkable[y * width + x]:
+                neighbor: TileNode = self.nodes[(x, y)]
+                connections.append(Connection(neighbor, node, 1.0) if reverse else Connection(node, neighbor, 1.0))
+        self._connection_pool[key] = connections
+        if len(self._connection_pool) > CONNECTION_POOL_SIZE:
+            self._connection_pool.popitem(last=False)
+        return connections
+    
+    def set_walkable(self, x: int, y: int, walkable: bool):
+        """
+        ### Description
+        Edits the graph by adding or removing a tile, keeping the grid and the connections
+        of its neighbours in sync. Every edit changes the version of the graph.
+
+        ### Parameters
+        - `x: int`: The x-coordinate of the tile.
+        - `y: int`: The y-coordinate of the tile.
+        - `walkable: bool`: Whether the tile should be walkable.
+        """
+        if walkable == ((x, y) in self.nodes):
+            return
+        
+        if self.implicit:
+            # Nothing but the grid to edit, and the pooled lists of the neighbours go stale
+            if walkable:
+                self.nodes[(x, y)] = TileNode(x, y)
+            else:
+                self.nodes.pop((x, y))
+            self.grid.walkable[self.grid.index(x, y)] = int(walkable)
+            self._connection_pool.clear()
+        elif walkable:
+            self.nodes[(x, y)] = TileNode(x, y)
+            self.grid.walkable[self.grid.index(x, y)] = 1
+            self.add_connections_for_tile(x, y)
+            # Connect the neighbours back to the new tile
+            for connection in self.get_connections(self.nodes[(x, y)]):
+                self.add_connection(connection.to_node, connection.from_node, 1.0)
+        else:
+            self.remove_node(self.nodes.pop((x, y)))
+            self.grid.walkable[self.grid.index(x, y)] = 0
+        self.grid.update_components(self.grid.index(x, y))
+        # Layers are derived again with the edit on their next use
+        self._edits[self.grid.index(x, y)] = walkable
+        self._layers.clear()
+        self.version += 1
+    
+    def tile_index(self, node: TileNode) -> int:
+        return self.grid.index(node.x, node.y)
+    
+    def is_reachable(self, start: Node, goal: Node) -> bool:
+        return self.grid.connected(self.tile_index(start), self.tile_index(goal))
+
+    def node_at(self, index: int) -> TileNode|None:
+        return self.nodes.get(self.grid.coordinates(index))
+    
+    def connections_for_tiles(self, tiles: List[int]) -> List[Connection]:
+        """
+        ### Description
+        Converts the tile indices returned by a grid search into a list of connections.
+
+        ### Parameters
+        - `tiles: List[int]`: The grid indices of the path, start and goal included.
+
+        ### Returns
+        - `List[Connection]`: The connections between consecutive tiles.
+        """
+        path_nodes: List[TileNode] = [self.tile_node(index) for index in tiles]
+        return [Connection(path_nodes[i], path_nodes[i + 1], 1.0) for i in range(len(path_nodes) - 1)]
     
     def draw_world_representation(self, surface: pygame.Surface, camera_x: int, camera_y: int):
         # Dibuja la cuadrícula
@@ -1,4 +1,5 @@
 from utils.connection import Connection
+from utils.csr_graph import CSRGraph
 from utils.node import Node
 
 class Graph:
@@ -9,20 +10,59 @@ class Graph:
     ### Attributes
     - `connections`: dict[Node, list[Connection]]
         A dictionary that maps a node to a list of connections.
+    - `reverse_connections`: dict[Node, list[Connection]]
+        A dictionary that maps a node to the list of connections that end at it.
+    - `version`: int
+        A counter that changes every time the graph is edited.
 
     ### Methods
     - `add_connection(from_node: Node, to_node: Node, cost: float) -> None`
         Adds a connection from `from_node` to `to_node` with a cost of `cost`.
+    - `remove_node(node: Node) -> None`
+        Removes every connection that starts or ends at `node`.
     - `get_connections(from_node: Node) -> list[Connection]`
         Returns a list of connections from `from_node`.
+    - `get_reverse_connections(to_node: Node) -> list[Connection]`
+        Returns a list of connections to `to_node`.
+    - `is_reachable(start: Node, goal: Node) -> bool`
+        Returns False only if no path can join `start` to `goal`.
+    - `freeze() -> CSRGraph`
+        Returns a copy of the graph in compressed sparse row arrays.
     """
     def __init__(self):
         self.connections = {}
+        self.reverse_connections = {}
+        self.version = 0
 
     def add_connection(self, from_node: Node, to_node: Node, cost: float):
         if from_node not in self.connections:
             self.connections[from_node] = []
-        self.connections[from_node].append(Connection(from_node, to_node, cost))
+        if to_node not in self.reverse_connections:
+            self.reverse_connections[to_node] = []
+        connection = Connection(from_node, to_node, cost)
+        self.connections[from_node].append(connection)
+        self.reverse_connections[to_node].append(connection)
+        self.version += 1
+
+    def remove_node(self, node: Node):
+        # Only the neighbours of the node have connections to update
+        for connection in self.connections.pop(node, []):
+            if connection.to_node in self.reverse_connections:
+                self.reverse_connections[connection.to_node] = [other for other in self.reverse_connections[connection.to_node] if other.from_node is not node]
+        for connection in self.reverse_connections.pop(node, []):
+            if connection.from_node in self.connections:
+                self.connections[connection.from_node] = [other for other in self.connections[connection.from_node] if other.to_node is not node]
+        self.version += 1
 
     def get_connections(self, from_node: Node) -> list[Connection]:
-        return self.connections.get(from_node, [])
\ No newline at end of file
+        return self.connections.get(from_node, [])
+
+    def get_reverse_connections(self, to_node: Node) -> list[Connection]:
+        return self.reverse_connections.get(to_node, [])
+
+    def is_reachable(self, start: Node, goal: Node) -> bool:
+        # A plain graph does not know its components, so every goal may be reachable
+        return True
+
+    def freeze(self) -> CSRGraph:
+        return CSRGraph.from_graph(self)
\ No newline at end of file
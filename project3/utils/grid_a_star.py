@@ -0,0 +1,247 @@
+import heapq
+import time
+from array import array
+from typing import Callable, List, Tuple
+from utils.walkability_grid import WalkabilityGrid
+from utils.threat_field import ThreatField
+from utils.search_stats import SearchStats
+from utils.landmark_heuristic import LandmarkTable
+
+def rebuild_tile_path(parents: array, start: int, goal: int) -> List[int]:
+    """
+    ### Description
+    Walk back the parent array of a grid search from the goal to the start.
+
+    ### Parameters
+    - parents: array. The parent tile index of every reached tile.
+    - start: int. The index of the start tile.
+    - goal: int. The index of the goal tile.
+
+    ### Returns
+    List[int]: The tile indices from start to goal, both included.
+    """
+    path: List[int] = [goal]
+    current: int = goal
+    while current != start:
+        current = parents[current]
+        path.append(current)
+    path.reverse()
+    return path
+
+def achieved_bound(cost: float, open_heap: List[Tuple[float, float, int]], cost_so_far: array, closed: bytearray, estimate: Callable[[int], float]) -> float:
+    """
+    ### Description
+    Work out how far from optimal the path found by a weighted search can be. Searches
+    that reopen closed tiles keep some tile of an optimal path open with its optimal
+    cost, so the smallest cost plus admissible estimate of the open tiles is a lower
+    bound of the optimal cost.
+
+    ### Parameters
+    - cost: float. The cost of the path found.
+    - open_heap: List[Tuple[float, float, int]]. The open list of the search, with stale entries.
+    - cost_so_far: array. The cost of every reached tile.
+    - closed: bytearray. The closed tiles.
+    - estimate: Callable[[int], float]. An admissible estimate of the cost from a tile to the goal.
+
+    ### Returns
+    float: The cost of the path over the lower bound, at least 1.
+    """
+    lower_bound: float = cost
+    for _, negative_cost, tile in open_heap:
+        if not closed[tile] and -negative_cost == cost_so_far[tile]:
+            lower_bound = min(lower_bound, cost_so_far[tile] + estimate(tile))
+    return cost / lower_bound if lower_bound > 0 else 1.0
+
+class GridAStarSearch:
+    """
+    ### Description
+    The A* search of pathfind_grid_astar as an object that can be paused and resumed.
+    `run` expands at most the given number of tiles and keeps the open list and the
+    flat arrays between calls, so a long search can be spread over several frames.
+
+    ### Attributes
+    - `grid`: The grid to search.
+    - `start`: The index of the start tile.
+    - `goal`: The index of the goal tile.
+    - `done`: Whether the search has finished.
+    - `tiles`: The tile indices from start to goal once the search has finished, or None.
+    - `expanded`: The number of tiles expanded so far.
+    - `relaxed`: The number of steps to walkable tiles looked at so far.
+    - `peak_open`: The largest size of the open list so far, stale entries included.
+    - `weight`: The factor of the estimate in the priority of the tiles.
+    - `suboptimality_bound`: How many times the optimal cost the path found may cost at most.
+
+    ### Methods
+    - `run(max_expansions: int|None = None) -> bool`: Resumes the search, returns whether it finished.
+    - `record(stats: SearchStats, wall_time: float)`: Adds the counters of the finished search to `stats`.
+    - `admissible_estimate(index: int) -> float`: Returns a lower bound of the cost from a tile to the goal.
+    """
+    def __init__(self, grid: WalkabilityGrid, start: int, goal: int, threat: ThreatField|None = None, landmarks: LandmarkTable|None = None, weight: float = 1.0):
+        self.grid: WalkabilityGrid = grid
+        self.start: int = start
+        self.goal: int = goal
+        self.threat_costs: array|None = threat.threat if threat is not None else None
+        self.landmarks: LandmarkTable|None = landmarks
+        self.done: bool = False
+        self.tiles: List[int]|None = None
+        self.expanded: int = 0
+        self.relaxed: int = 0
+        self.peak_open: int = 1
+        self.weight: float = weight
+        self.suboptimality_bound: float = 1.0
+        # Also false for blocked tiles, and for goals in another connected component
+        if not grid.connected(start, goal):
+            self.done = True
+            return
+
+        size: int = len(grid.walkable)
+        width: int = grid.width
+        self.cost_so_far: array = array('d', [float('inf')]) * size
+        self.parents: array = array('i', [-1]) * size
+        self.closed: bytearray = bytearray(size)
+
+        # Ties on the estimated total cost are broken towards the deepest tile, which avoids
+        # expanding every tile of the many equally long paths of a uniform grid
+        self.cost_so_far[start] = 0
+        self.open_heap: List[Tuple[float, float, int]] = [(weight * (abs(start % width - goal % width) + abs(start // width - goal // width)), 0, start)]
+
+    def run(self, max_expansions: int|None = None) -> bool:
+        """
+        ### Description
+        Resumes the search until it finishes or has expanded `max_expansions` more tiles.
+
+        ### Parameters
+        - max_expansions: int|None. The number of tiles this call may expand, or None for no limit.
+
+        ### Returns
+        bool: True if the search has finished, in which case `tiles` holds its result.
+        """
+        if self.done:
+            return True
+
+        walkable: bytearray = self.grid.walkable
+        width: int = self.grid.width
+        height: int = self.grid.height
+        goal: int = self.goal
+        goal_x, goal_y = goal % width, goal // width
+        threat_costs: array|None = self.threat_costs
+        landmarks: LandmarkTable|None = self.landmarks
+        weight: float = self.weight
+        cost_so_far: array = self.cost_so_far
+        parents: array = self.parents
+        closed: bytearray = self.closed
+        open_heap: List[Tuple[float, float, int]] = self.open_heap
+
+        expanded: int = 0
+        relaxed: int = 0
+        peak_open: int = self.peak_open
+        reached: bool = False
+        while open_heap:
+            if max_expansions is not None and expanded >= max_expansions:
+                self.expanded += expanded
+                self.relaxed += relaxed
+                self.peak_open = peak_open
+                return False
+            _, _, current = heapq.heappop(open_heap)
+
+            # Skip stale entries of tiles that were already processed
+            if closed[current]:
+                continue
+            if current == goal:
+                reached = True
+                break
+            closed[current] = 1
+            expanded += 1
+
+            current_cost: float = cost_so_far[current]
+            current_x, current_y = current % width, current // width
+            # Same order as GameGraph.add_connections_for_tile: (0, 1), (1, 0), (0, -1), (-1, 0)
+            for neighbor, x, y in ((current + width, current_x, current_y + 1), (current + 1, current_x + 1, current_y),
+                                   (current - width, current_x, current_y - 1), (current - 1, current_x - 1, current_y)):
+                if not (0 <= x < width and 0 <= y < height and walkable[neighbor]):
+                    continue
+                relaxed += 1
+                estimate: float = abs(x - goal_x) + abs(y - goal_y)
+                if landmarks is not None:
+                    estimate = max(estimate, landmarks.estimate_index(neighbor, goal))
+                step: float = 1.0
+                if threat_costs is not None:
+                    step += threat_costs[neighbor]
+                    estimate += threat_costs[neighbor]
+
+                neighbor_cost: float = current_cost + step
+                if neighbor_cost < cost_so_far[neighbor]:
+                    cost_so_far[neighbor] = neighbor_cost
+                    parents[neighbor] = current
+                    # The tactical estimate is not consistent, so closed tiles may be reopened
+                    closed[neighbor] = 0
+                    heapq.heappush(open_heap, (neighbor_cost + weight * estimate, -neighbor_cost, neighbor))
+            if len(open_heap) > peak_open:
+                peak_open = len(open_heap)
+
+        self.expanded += expanded
+        self.relaxed += relaxed
+        self.peak_open = peak_open
+        self.done = True
+        if reached:
+            self.tiles = rebuild_tile_path(parents, self.start, goal)
+            if weight != 1.0:
+                self.suboptimality_bound = achieved_bound(cost_so_far[goal], open_heap, cost_so_far, closed, self.admissible_estimate)
+        return True
+
+    def record(self, stats: SearchStats, wall_time: float):
+        """
+        ### Description
+        Adds the counters of the finished search to `stats`.
+
+        ### Parameters
+        - stats: SearchStats. The stats to fill in.
+        - wall_time: float. The time the search took, which may have been spread over several calls to `run`.
+        """
+        stats.nodes_expanded += self.expanded
+        stats.edges_relaxed += self.relaxed
+        stats.peak_open = max(stats.peak_open, self.peak_open)
+        stats.suboptimality_bound = self.suboptimality_bound
+        stats.wall_time += wall_time
+        stats.reached = self.tiles is not None
+        stats.path_length = len(self.tiles) - 1 if self.tiles is not None else 0
+
+    def admissible_estimate(self, index: int) -> float:
+        # The threat is left out, it is not a lower bound of the cost left
+        width: int = self.grid.width
+        estimate: float = abs(index % width - self.goal % width) + abs(index // width - self.goal // width)
+        if self.landmarks is not None:
+            estimate = max(estimate, self.landmarks.estimate_index(index, self.goal))
+        return estimate
+
+def pathfind_grid_astar(grid: WalkabilityGrid, start: int, goal: int, threat: ThreatField|None = None, stats: SearchStats|None = None, landmarks: LandmarkTable|None = None, weight: float = 1.0) -> List[int]|None:
+    """
+    ### Description
+    Perform the A* pathfinding algorithm directly on a walkability grid.
+    Costs, parents and the closed set live in flat arrays indexed by tile, so no
+    node records or connections are allocated during the search. The Manhattan
+    distance is used as heuristic and every step costs 1, like the connections
+    built by GameGraph.
+
+    ### Parameters
+    - grid: WalkabilityGrid. The grid to search.
+    - start: int. The index of the start tile.
+    - goal: int. The index of the goal tile.
+    - threat: ThreatField|None. If given, the threat added to the cost of entering every tile,
+    like in pathfind_tactical_astar.
+    - stats: SearchStats|None. If given, filled in with the counters of the search.
+    - landmarks: LandmarkTable|None. If given, its lower bound is used when it beats the
+    Manhattan distance.
+    - weight: float. The factor of the estimate in the priority of the tiles. Above 1 the
+    search expands fewer tiles and the path costs at most `weight` times the optimal one;
+    the bound actually achieved is reported in `stats`.
+
+    ### Returns
+    List[int]|None: The tile indices from start to goal, both included.
+    """
+    started: float = time.perf_counter()
+    search = GridAStarSearch(grid, start, goal, threat, landmarks, weight)
+    search.run()
+    if stats is not None:
+        search.record(stats, time.perf_counter() - started)
+    return search.tiles
@@ -0,0 +1,246 @@
+import heapq
+from collections import deque
+from typing import Deque, Dict, List, Tuple
+from utils.game_graph import GameGraph
+
+class HierarchicalPath:
+    """
+    ### Description
+    A path found on the abstract graph of a HierarchicalGraph, refined into tiles lazily.
+    Only the segment the agent is about to walk needs to be refined.
+
+    ### Attributes
+    - `hierarchy`: The hierarchical graph the path was found on.
+    - `waypoints`: The grid indices of the abstract nodes of the path, start and goal included.
+    - `position`: The index of the waypoint the next segment starts from.
+
+    ### Methods
+    - `next_segment() -> List[int]`: Refines the next segment and advances past it.
+    - `tiles() -> List[int]`: Refines the whole remaining path.
+    """
+    def __init__(self, hierarchy: 'HierarchicalGraph', waypoints: List[int]):
+        self.hierarchy: HierarchicalGraph = hierarchy
+        self.waypoints: List[int] = waypoints
+        self.position: int = 0
+
+    def __len__(self) -> int:
+        return len(self.waypoints) - 1 - self.position
+
+    def next_segment(self) -> List[int]:
+        """
+        ### Description
+        Refines the segment between the current waypoint and the next one.
+
+        ### Returns
+        List[int]: The tile indices of the segment, both waypoints included, or an empty list
+        if the path has been fully walked.
+        """
+        if len(self) <= 0:
+            return []
+        segment: List[int] = self.hierarchy.refine(self.waypoints[self.position], self.waypoints[self.position + 1])
+        self.position += 1
+        return segment
+
+    def tiles(self) -> List[int]:
+        path: List[int] = [self.waypoints[self.position]]
+        while len(self) > 0:
+            path.extend(self.next_segment()[1:])
+        return path
+
+class HierarchicalGraph:
+    """
+    ### Description
+    Hierarchical pathfinding (HPA*) layer over the walkability grid of a game graph.
+    The grid is split into square clusters. Entrances are placed on the walkable stretches
+    of the borders between neighbouring clusters, and the distances between the entrances
+    of each cluster are precomputed. Queries search this small abstract graph and only
+    refine the segments that are actually walked, so their cost barely depends on how far
+    apart the endpoints are. Paths are near optimal, not always optimal.
+
+    ### Attributes
+    - `game_graph`: The game graph the hierarchy is built on.
+    - `cluster_size`: The side of a cluster, in tiles.
+    - `edges`: The abstract graph, mapping an entrance tile to its neighbours and their costs.
+    - `entrances`: The entrance tiles of every cluster.
+
+    ### Methods
+    - `build()`: Builds the abstract graph.
+    - `cluster_of(index: int) -> Tuple[int, int]`: Returns the cluster of a tile.
+    - `find_path(start: int, goal: int) -> HierarchicalPath|None`: Searches the abstract graph.
+    - `refine(start: int, goal: int) -> List[int]`: Returns the tiles between two abstract nodes.
+    """
+    # Border stretches at least this long get an entrance at each end instead of one in the middle
+    LONG_ENTRANCE: int = 6
+
+    def __init__(self, game_graph: GameGraph, cluster_size: int = 10):
+        self.game_graph: GameGraph = game_graph
+        self.cluster_size: int = cluster_size
+        self.edges: Dict[int, Dict[int, float]] = {}
+        self.entrances: Dict[Tuple[int, int], List[int]] = {}
+        self.version: int|None = None
+        self.build()
+
+    def cluster_of(self, index: int) -> Tuple[int, int]:
+        x, y = self.game_graph.grid.coordinates(index)
+        return x // self.cluster_size, y // self.cluster_size
+
+    def build(self):
+        grid = self.game_graph.grid
+        self.edges = {}
+        self.entrances = {}
+        self.version = self.game_graph.version
+
+        # Entrances on the borders between horizontally and vertically adjacent clusters
+        for border in range(self.cluster_size - 1, grid.width - 1, self.cluster_size):
+            for top in range(0, grid.height, self.cluster_size):
+                pairs = [(grid.index(border, y), grid.index(border + 1, y)) for y in range(top, min(top + self.cluster_size, grid.height))]
+                self.add_entrances(pairs)
+        for border in range(self.cluster_size - 1, grid.height - 1, self.cluster_size):
+            for left in range(0, grid.width, self.cluster_size):
+                pairs = [(grid.index(x, border), grid.index(x, border + 1)) for x in range(left, min(left + self.cluster_size, grid.width))]
+                self.add_entrances(pairs)
+
+        # Distances between the entrances of each cluster
+        for entrances in self.entrances.values():
+            for entrance in entrances:
+                distances, _ = self.cluster_search(entrance)
+                for other in entrances:
+                    if other != entrance and other in distances:
+                        self.edges[entrance][other] = distances[other]
+
+    def add_entrances(self, pairs: List[Tuple[int, int]]):
+        walkable: bytearray = self.game_graph.grid.walkable
+        run: List[Tuple[int, int]] = []
+        for pair in pairs + [None]:
+            if pair is not None and walkable[pair[0]] and walkable[pair[1]]:
+                run.append(pair)
+                continue
+            if run:
+                if len(run) >= self.LONG_ENTRANCE:
+                    chosen = [run[0], run[-1]]
+                else:
+                    chosen = [run[len(run) // 2]]
+                for inside, outside in chosen:
+                    for tile, other in ((inside, outside), (outside, inside)):
+                        if tile not in self.edges:
+                            self.edges[tile] = {}
+                            self.entrances.setdefault(self.cluster_of(tile), []).append(tile)
+                        self.edges[tile][other] = 1.0
+                run = []
+
+    def cluster_search(self, source: int, target: int|None = None) -> Tuple[Dict[int, float], Dict[int, int]]:
+        """
+        ### Description
+        Breadth first search from a tile that never leaves the tile's cluster.
+
+        ### Parameters
+        - source: int. The grid index of the tile to start from.
+        - target: int|None. If given, the search stops when this tile is reached.
+
+        ### Returns
+        Tuple[Dict[int, float], Dict[int, int]]: The distance and the parent of every reached tile.
+        """
+        grid = self.game_graph.grid
+        width: int = grid.width
+        cluster_x, cluster_y = self.cluster_of(source)
+        left, top = cluster_x * self.cluster_size, cluster_y * self.cluster_size
+        right, bottom = min(left + self.cluster_size, width), min(top + self.cluster_size, grid.height)
+        distances: Dict[int, float] = {source: 0}
+        parents: Dict[int, int] = {}
+        frontier: Deque[int] = deque([source])
+        while frontier:
+            current: int = frontier.popleft()
+            if current == target:
+                break
+            for neighbor in grid.neighbors(current):
+                if neighbor not in distances and left <= neighbor % width < right and top <= neighbor // width < bottom:
+                    distances[neighbor] = distances[current] + 1
+                    parents[neighbor] = current
+                    frontier.append(neighbor)
+        return distances, parents
+
+    def find_path(self, start: int, goal: int) -> HierarchicalPath|None:
+        """
+        ### Description
+        Connects the start and the goal to the entrances of their clusters and searches the
+        abstract graph with A*. Nothing is refined yet.
+
+        ### Parameters
+        - start: int. The grid index of the start tile.
+        - goal: int. The grid index of the goal tile.
+
+        ### Returns
+        HierarchicalPath|None: The abstract path from start to goal.
+        """
+        grid = self.game_graph.grid
+        if self.game_graph.version != self.version:
+            self.build()
+        if not grid.connected(start, goal):
+            return None
+        if start == goal:
+            return HierarchicalPath(self, [start])
+
+        # Temporary edges linking the start and the goal to the abstract graph
+        extra: Dict[int, Dict[int, float]] = {start: {}, goal: {}}
+        start_distances, _ = self.cluster_search(start)
+        for entrance in self.entrances.get(self.cluster_of(start), []):
+            if entrance in start_distances:
+                extra[start][entrance] = start_distances[entrance]
+        if goal in start_distances:
+            extra[start][goal] = start_distances[goal]
+        goal_distances, _ = self.cluster_search(goal)
+        for entrance in self.entrances.get(self.cluster_of(goal), []):
+            if entrance in goal_distances:
+                extra.setdefault(entrance, {})[goal] = goal_distances[entrance]
+
+        width: int = grid.width
+        goal_x, goal_y = goal % width, goal // width
+        cost_so_far: Dict[int, float] = {start: 0}
+        parents: Dict[int, int] = {}
+        closed: set = set()
+        open_heap: List[Tuple[float, int]] = [(abs(start % width - goal_x) + abs(start // width - goal_y), start)]
+        while open_heap:
+            _, current = heapq.heappop(open_heap)
+            if current in closed:
+                continue
+            if current == goal:
+                break
+            closed.add(current)
+            neighbors = list(self.edges.get(current, {}).items()) + list(extra.get(current, {}).items())
+            for neighbor, cost in neighbors:
+                neighbor_cost: float = cost_so_far[current] + cost
+                if neighbor_cost < cost_so_far.get(neighbor, float('inf')):
+                    cost_so_far[neighbor] = neighbor_cost
+                    parents[neighbor] = current
+                    estimate: float = abs(neighbor % width - goal_x) + abs(neighbor // width - goal_y)
+                    heapq.heappush(open_heap, (neighbor_cost + estimate, neighbor))
+
+        if goal not in cost_so_far:
+            return None
+        waypoints: List[int] = [goal]
+        while waypoints[-1] != start:
+            waypoints.append(parents[waypoints[-1]])
+        waypoints.reverse()
+        return HierarchicalPath(self, waypoints)
+
+    def refine(self, start: int, goal: int) -> List[int]:
+        """
+        ### Description
+        Returns the tiles between two consecutive abstract nodes, which are either adjacent
+        tiles of two clusters or tiles of the same cluster.
+
+        ### Parameters
+        - start: int. The grid index of the first abstract node.
+        - goal: int. The grid index of the second abstract node.
+
+        ### Returns
+        List[int]: The tile indices from start to goal, both included.
+        """
+        if goal in self.game_graph.grid.neighbors(start):
+            return [start, goal]
+        _, parents = self.cluster_search(start, goal)
+        path: List[int] = [goal]
+        while path[-1] != start:
+            path.append(parents[path[-1]])
+        path.reverse()
+        return path
@@ -0,0 +1,144 @@
+import heapq
+import time
+from array import array
+from typing import List, Tuple
+from utils.walkability_grid import WalkabilityGrid
+from utils.search_stats import SearchStats
+from utils.landmark_heuristic import LandmarkTable
+
+def pathfind_jps(grid: WalkabilityGrid, start: int, goal: int, stats: SearchStats|None = None, landmarks: LandmarkTable|None = None) -> List[int]|None:
+    """
+    ### Description
+    Perform Jump Point Search on a 4-connected walkability grid with uniform costs.
+    Instead of pushing every neighbour, the search jumps in straight lines and only stops
+    at tiles where an optimal path may turn (jump points), which removes the expansions
+    A* spends on the many symmetric paths of an open grid. Paths have the same cost as
+    the ones of pathfind_grid_astar.
+
+    Vertical jumps also probe horizontally at every step, while horizontal jumps only stop
+    at forced neighbours, so every optimal path has an equivalent made of jump points.
+
+    ### Parameters
+    - grid: WalkabilityGrid. The grid to search.
+    - start: int. The index of the start tile.
+    - goal: int. The index of the goal tile.
+    - stats: SearchStats|None. If given, filled in with the counters of the search.
+    - landmarks: LandmarkTable|None. If given, its lower bound is used when it beats the
+    Manhattan distance.
+
+    ### Returns
+    List[int]|None: The tile indices from start to goal, both included.
+    """
+    walkable: bytearray = grid.walkable
+    if not grid.connected(start, goal):
+        return None
+    started: float = time.perf_counter()
+
+    width: int = grid.width
+    height: int = grid.height
+    goal_x, goal_y = goal % width, goal // width
+
+    def is_walkable(x: int, y: int) -> bool:
+        return 0 <= x < width and 0 <= y < height and walkable[y * width + x] == 1
+
+    def jump_horizontal(x: int, y: int, dx: int) -> int|None:
+        while is_walkable(x, y):
+            if x == goal_x and y == goal_y:
+                return y * width + x
+            # A tile above or below opens up right after a wall: the path may turn here
+            if (is_walkable(x, y - 1) and not is_walkable(x - dx, y - 1)) or (is_walkable(x, y + 1) and not is_walkable(x - dx, y + 1)):
+                return y * width + x
+            x += dx
+        return None
+
+    def jump_vertical(x: int, y: int, dy: int) -> int|None:
+        while is_walkable(x, y):
+            if x == goal_x and y == goal_y:
+                return y * width + x
+            if (is_walkable(x - 1, y) and not is_walkable(x - 1, y - dy)) or (is_walkable(x + 1, y) and not is_walkable(x + 1, y - dy)):
+                return y * width + x
+            # Stop where a horizontal jump from this tile would find a jump point
+            if jump_horizontal(x + 1, y, 1) is not None or jump_horizontal(x - 1, y, -1) is not None:
+                return y * width + x
+            y += dy
+        return None
+
+    size: int = len(walkable)
+    cost_so_far: array = array('d', [float('inf')]) * size
+    parents: array = array('i', [-1]) * size
+    closed: bytearray = bytearray(size)
+
+    cost_so_far[start] = 0
+    open_heap: List[Tuple[float, float, int]] = [(abs(start % width - goal_x) + abs(start // width - goal_y), 0, start)]
+
+    expanded: int = 0
+    relaxed: int = 0
+    peak_open: int = 1
+    while open_heap:
+        _, _, current = heapq.heappop(open_heap)
+        if closed[current]:
+            continue
+        if current == goal:
+            break
+        closed[current] = 1
+        expanded += 1
+
+        x, y = current % width, current // width
+        parent: int = parents[current]
+        # Directions worth following, pruned by the direction we arrived from
+        if parent < 0:
+            directions = ((0, 1), (1, 0), (0, -1), (-1, 0))
+        elif parent // width == y:
+            dx = 1 if x > parent % width else -1
+            directions = ((0, 1), (0, -1), (dx, 0))
+        else:
+            dy = 1 if y > parent // width else -1
+            directions = ((1, 0), (-1, 0), (0, dy))
+
+        for dx, dy in directions:
+            if dx != 0:
+                jump_point = jump_horizontal(x + dx, y, dx)
+            else:
+                jump_point = jump_vertical(x, y + dy, dy)
+            if jump_point is None or closed[jump_point]:
+                continue
+            relaxed += 1
+
+            jump_x, jump_y = jump_point % width, jump_point // width
+            jump_cost: float = cost_so_far[current] + abs(jump_x - x) + abs(jump_y - y)
+            if jump_cost < cost_so_far[jump_point]:
+                cost_so_far[jump_point] = jump_cost
+                parents[jump_point] = current
+                estimate: float = abs(jump_x - goal_x) + abs(jump_y - goal_y)
+                if landmarks is not None:
+                    estimate = max(estimate, landmarks.estimate_index(jump_point, goal))
+                heapq.heappush(open_heap, (jump_cost + estimate, -jump_cost, jump_point))
+        if len(open_heap) > peak_open:
+            peak_open = len(open_heap)
+
+    if stats is not None:
+        stats.nodes_expanded += expanded
+        stats.edges_relaxed += relaxed
+        stats.peak_open = max(stats.peak_open, peak_open)
+    if cost_so_far[goal] == float('inf'):
+        if stats is not None:
+            stats.finish(started, None)
+        return None
+
+    # Fill in the straight segments between consecutive jump points
+    path: List[int] = [goal]
+    current = goal
+    while current != start:
+        parent = parents[current]
+        step: int = 1 if abs(current - parent) < width else width
+        if parent > current:
+            step = -step
+        tile: int = current
+        while tile != parent:
+            tile -= step
+            path.append(tile)
+        current = parent
+    path.reverse()
+    if stats is not None:
+        stats.finish(started, len(path) - 1)
+    return path
@@ -0,0 +1,197 @@
+import hashlib
+import struct
+from array import array
+from collections import deque
+from typing import Deque, List
+from utils.a_star import Heuristic
+from utils.game_graph import GameGraph
+from utils.node import TileNode
+from utils.walkability_grid import WalkabilityGrid
+
+# Distance stored for tiles a landmark cannot reach
+UNREACHABLE = 0xFFFF
+
+class LandmarkTable:
+    """
+    ### Description
+    Exact distances from a few landmark tiles to every tile of a walkability grid, used for
+    the ALT (A*, landmarks, triangle inequality) heuristic. By the triangle inequality,
+    `|d(L, a) - d(L, b)|` never overestimates the distance between `a` and `b`, and unlike the
+    Manhattan distance it accounts for the walls and asteroids in between.
+
+    Landmarks are picked by farthest point selection, and each one costs one array of
+    unsigned shorts with an entry per tile. The table can be saved and loaded again for the
+    same map, and is only valid for the graph version it was built on.
+
+    ### Attributes
+    - `width`: The number of tile columns of the grid.
+    - `landmarks`: The grid indices of the landmark tiles.
+    - `distances`: The distances from each landmark to every tile.
+    - `version`: The version of the game graph the table was built on.
+    - `walkable_digest`: A digest of the walkability grid the table was built on.
+
+    ### Methods
+    - `build(game_graph: GameGraph, count: int) -> LandmarkTable`: Picks the landmarks and computes the table.
+    - `is_valid(game_graph: GameGraph) -> bool`: Returns whether the table matches the current graph.
+    - `estimate_index(from_index: int, to_index: int) -> float`: Returns the landmark lower bound between two tiles.
+    - `save(path: str)`: Writes the table to a file.
+    - `load(path: str, game_graph: GameGraph) -> LandmarkTable|None`: Reads a table written for the same map.
+    - `load_or_build(path: str, game_graph: GameGraph, count: int) -> LandmarkTable`: Reads the table of the map, or builds and saves it.
+    """
+    MAGIC: bytes = b"ALT1"
+
+    def __init__(self, width: int, landmarks: List[int], distances: List[array], version: int, walkable_digest: bytes):
+        self.width: int = width
+        self.landmarks: List[int] = landmarks
+        self.distances: List[array] = distances
+        self.version: int = version
+        self.walkable_digest: bytes = walkable_digest
+
+    @staticmethod
+    def digest(grid: WalkabilityGrid) -> bytes:
+        return hashlib.sha1(struct.pack("<II", grid.width, grid.height) + bytes(grid.walkable)).digest()
+
+    @staticmethod
+    def distances_from(grid: WalkabilityGrid, source: int) -> array:
+        distances: array = array('H', [UNREACHABLE]) * len(grid)
+        distances[source] = 0
+        frontier: Deque[int] = deque([source])
+        while frontier:
+            current: int = frontier.popleft()
+            for neighbor in grid.neighbors(current):
+                if distances[neighbor] == UNREACHABLE:
+                    distances[neighbor] = distances[current] + 1
+                    frontier.append(neighbor)
+        return distances
+
+    @classmethod
+    def build(cls, game_graph: GameGraph, count: int = 8) -> 'LandmarkTable':
+        """
+        ### Description
+        Picks landmarks by farthest point selection: each new landmark is the reachable tile
+        farthest from all the previous ones, which spreads them over the edges of the map.
+
+        ### Parameters
+        - game_graph: GameGraph. The graph to build the table for.
+        - count: int. The number of landmarks.
+
+        ### Returns
+        LandmarkTable: The table for the current version of the graph.
+        """
+        grid: WalkabilityGrid = game_graph.grid
+        landmarks: List[int] = []
+        distances: List[array] = []
+        walkable_tiles: List[int] = [index for index in range(len(grid)) if grid.walkable[index]]
+        if walkable_tiles:
+            # Closest distance of every tile to the landmarks picked so far
+            closest: array = cls.distances_from(grid, walkable_tiles[0])
+            for _ in range(count):
+                candidate: int = max(walkable_tiles, key=lambda index: closest[index] if closest[index] != UNREACHABLE else -1)
+                if candidate in landmarks:
+                    break
+                landmark_distances: array = cls.distances_from(grid, candidate)
+                landmarks.append(candidate)
+                distances.append(landmark_distances)
+                for index in walkable_tiles:
+                    if landmark_distances[index] < closest[index]:
+                        closest[index] = landmark_distances[index]
+        return cls(grid.width, landmarks, distances, game_graph.version, cls.digest(grid))
+
+    def is_valid(self, game_graph: GameGraph) -> bool:
+        return self.version == game_graph.version and self.width == game_graph.grid.width
+
+    def estimate_index(self, from_index: int, to_index: int) -> float:
+        best: float = 0
+        for distances in self.distances:
+            from_distance: int = distances[from_index]
+            to_distance: int = distances[to_index]
+            if from_distance != UNREACHABLE and to_distance != UNREACHABLE:
+                difference: int = abs(from_distance - to_distance)
+                if difference > best:
+                    best = difference
+        return best
+
+    def save(self, path: str):
+        with open(path, "wb") as file:
+            file.write(self.MAGIC)
+            file.write(self.walkable_digest)
+            file.write(struct.pack("<II", self.width, len(self.landmarks)))
+            array('i', self.landmarks).tofile(file)
+            for distances in self.distances:
+                distances.tofile(file)
+
+    @classmethod
+    def load(cls, path: str, game_graph: GameGraph) -> 'LandmarkTable|None':
+        """
+        ### Description
+        Reads a table written by `save`. The table is only returned if it was built for the
+        same walkability grid as the one of the given graph.
+
+        ### Parameters
+        - path: str. The path of the file.
+        - game_graph: GameGraph. The graph the table will be used on.
+
+        ### Returns
+        LandmarkTable|None: The table, or None if the file is missing or was built for another map.
+        """
+        grid: WalkabilityGrid = game_graph.grid
+        try:
+            with open(path, "rb") as file:
+                if file.read(len(cls.MAGIC)) != cls.MAGIC or file.read(20) != cls.digest(grid):
+                    return None
+                width, count = struct.unpack("<II", file.read(8))
+                landmarks: array = array('i')
+                landmarks.fromfile(file, count)
+                distances: List[array] = []
+                for _ in range(count):
+                    landmark_distances: array = array('H')
+                    landmark_distances.fromfile(file, len(grid))
+                    distances.append(landmark_distances)
+        except (OSError, EOFError, struct.error):
+            return None
+        return cls(width, list(landmarks), distances, game_graph.version, cls.digest(grid))
+
+    @classmethod
+    def load_or_build(cls, path: str, game_graph: GameGraph, count: int = 8) -> 'LandmarkTable':
+        """
+        ### Description
+        Reads the table of the map from a file, or builds it and writes it to the file for
+        the next launches. If the file cannot be written the table is still returned.
+
+        ### Parameters
+        - path: str. The path of the file.
+        - game_graph: GameGraph. The graph to build the table for.
+        - count: int. The number of landmarks of a new table.
+
+        ### Returns
+        LandmarkTable: The table for the current version of the graph.
+        """
+        table: LandmarkTable|None = cls.load(path, game_graph)
+        if table is None:
+            table = cls.build(game_graph, count)
+            try:
+                table.save(path)
+            except OSError:
+                pass
+        return table
+
+class LandmarkHeuristic(Heuristic):
+    """
+    ### Description
+    A heuristic using a landmark table. It returns the largest of the landmark lower bound
+    and the Manhattan distance, so it is never worse than ManhattanHeuristic.
+
+    ### Methods
+    - `estimate_between(from_node: TileNode, to_node: TileNode) -> float`
+        Returns the landmark estimate of the distance between `from_node` and `to_node`.
+    """
+    def __init__(self, goal_node: TileNode, table: LandmarkTable):
+        super().__init__(goal_node)
+        self.table: LandmarkTable = table
+
+    def estimate_between(self, from_node: TileNode, to_node: TileNode) -> float:
+        if isinstance(from_node, TileNode) and isinstance(to_node, TileNode):
+            manhattan: float = abs(from_node.x - to_node.x) + abs(from_node.y - to_node.y)
+            width: int = self.table.width
+            return max(manhattan, self.table.estimate_index(from_node.y * width + from_node.x, to_node.y * width + to_node.x))
+        return 0
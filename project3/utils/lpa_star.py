@@ -0,0 +1,241 @@
+import heapq
+from array import array
+from typing import Dict, List, Tuple
+from utils.game_graph import GameGraph
+from utils.landmark_heuristic import LandmarkTable
+from utils.walkability_grid import WalkabilityGrid
+
+INFINITY = float('inf')
+
+class LPAStar:
+    """
+    ### Description
+    Incremental A* planner (Lifelong Planning A*) over the walkability grid of a game graph.
+    The planner keeps its search tree between calls. When the goal moves it only re-orders
+    its open list and resumes the search, and when tiles are edited it only repairs the
+    tiles around them, so a chaser whose target moved one tile replans with a handful of
+    expansions instead of a full search.
+
+    The tree is rooted at the start tile. If a later start lies on the last path the
+    remaining part of that path is returned, otherwise the planner starts a new tree.
+
+    With a landmark table the keys use the larger of the landmark lower bound and the
+    Manhattan distance. The table is dropped once the graph is edited, since tiles added
+    after it was built can make it overestimate.
+
+    With a radius the planner searches the layer of agents of that radius.
+
+    ### Attributes
+    - `game_graph`: The game graph to plan on.
+    - `landmarks`: The landmark table guiding the search, if any.
+    - `radius`: The radius in pixels of the agent, or None for the grid of the graph.
+    - `start`: The grid index of the root of the search tree.
+    - `goal`: The grid index of the current goal tile.
+    - `expansions`: The number of tiles expanded by the last call to `plan`.
+    - `relaxed`: The number of neighbours updated from the expanded tiles by the last call to `plan`.
+    - `peak_queue`: The largest size of the queue during the last call to `plan`.
+    - `resets`: The number of times a new search tree was started.
+
+    ### Methods
+    - `plan(start: int, goal: int) -> List[int]|None`: Returns the tiles from start to goal.
+    - `tile_changed(index: int)`: Repairs the search tree after a tile was edited.
+    """
+    def __init__(self, game_graph: GameGraph, landmarks: LandmarkTable|None = None, radius: int|None = None):
+        self.game_graph: GameGraph = game_graph
+        self.radius: int|None = radius
+        # Layers of agents smaller than the window of the graph have tiles the table never measured
+        if radius is not None and radius < game_graph.block_size // 2:
+            landmarks = None
+        self.landmarks: LandmarkTable|None = landmarks
+        self.start: int|None = None
+        self.goal: int|None = None
+        self.expansions: int = 0
+        self.relaxed: int = 0
+        self.peak_queue: int = 0
+        self.resets: int = 0
+        self.path: List[int]|None = None
+        self.g: array = array('d')
+        self.rhs: array = array('d')
+        self.queue: Dict[int, Tuple[float, float]] = {}
+        self.heap: List[Tuple[float, float, int]] = []
+        self.version: int = game_graph.version
+        self.walkable: bytes = bytes(self.grid.walkable)
+
+    @property
+    def grid(self) -> WalkabilityGrid:
+        # Layers are derived again after edits, so the current one is looked up every time
+        return self.game_graph.layer(self.radius)
+
+    def reset(self, start: int):
+        """
+        ### Description
+        Drops the search tree and starts a new one rooted at the given tile.
+
+        ### Parameters
+        - start: int. The grid index of the new root.
+        """
+        size: int = len(self.grid)
+        self.start = start
+        self.path = None
+        self.g = array('d', [INFINITY]) * size
+        self.rhs = array('d', [INFINITY]) * size
+        self.queue = {}
+        self.heap = []
+        self.resets += 1
+        self.version = self.game_graph.version
+        self.walkable = bytes(self.grid.walkable)
+        if self.grid.walkable[start]:
+            self.rhs[start] = 0
+            self.push(start)
+
+    def heuristic(self, index: int) -> float:
+        if self.goal is None:
+            return 0
+        width: int = self.grid.width
+        estimate: float = abs(index % width - self.goal % width) + abs(index // width - self.goal // width)
+        if self.landmarks is not None:
+            estimate = max(estimate, self.landmarks.estimate_index(index, self.goal))
+        return estimate
+
+    def calculate_key(self, index: int) -> Tuple[float, float]:
+        best: float = min(self.g[index], self.rhs[index])
+        return best + self.heuristic(index), best
+
+    def push(self, index: int):
+        key = self.calculate_key(index)
+        self.queue[index] = key
+        heapq.heappush(self.heap, (key[0], key[1], index))
+
+    def top_key(self) -> Tuple[float, float]:
+        # Entries whose key does not match the queue are stale and dropped
+        while self.heap:
+            k1, k2, index = self.heap[0]
+            if self.queue.get(index) == (k1, k2):
+                return k1, k2
+            heapq.heappop(self.heap)
+        return INFINITY, INFINITY
+
+    def update_vertex(self, index: int):
+        if index != self.start:
+            best: float = INFINITY
+            if self.grid.walkable[index]:
+                for neighbor in self.grid.neighbors(index):
+                    if self.g[neighbor] + 1 < best:
+                        best = self.g[neighbor] + 1
+            self.rhs[index] = best
+        self.queue.pop(index, None)
+        if self.g[index] != self.rhs[index]:
+            self.push(index)
+
+    def compute_shortest_path(self):
+        goal: int = self.goal
+        grid: WalkabilityGrid = self.grid
+        while self.top_key() < self.calculate_key(goal) or self.rhs[goal] != self.g[goal]:
+            _, _, index = heapq.heappop(self.heap)
+            del self.queue[index]
+            self.expansions += 1
+            if self.g[index] > self.rhs[index]:
+                self.g[index] = self.rhs[index]
+            else:
+                self.g[index] = INFINITY
+                self.update_vertex(index)
+            for neighbor in grid.neighbors(index):
+                self.relaxed += 1
+                self.update_vertex(neighbor)
+            if len(self.queue) > self.peak_queue:
+                self.peak_queue = len(self.queue)
+
+    def rekey(self):
+        # g and rhs are distances from the root and stay valid, only the keys depend on the heuristic
+        self.heap = []
+        for index in self.queue:
+            self.push(index)
+
+    def set_goal(self, goal: int):
+        self.goal = goal
+        self.rekey()
+
+    def tile_changed(self, index: int):
+        """
+        ### Description
+        Repairs the search tree after a tile became walkable or blocked.
+
+        ### Parameters
+        - index: int. The grid index of the edited tile.
+        """
+        if self.start is None:
+            return
+        grid = self.grid
+        if not grid.walkable[index]:
+            self.g[index] = INFINITY
+        x, y = grid.coordinates(index)
+        self.update_vertex(index)
+        for neighbor_x, neighbor_y in ((x, y + 1), (x + 1, y), (x, y - 1), (x - 1, y)):
+            if 0 <= neighbor_x < grid.width and 0 <= neighbor_y < grid.height:
+                self.update_vertex(grid.index(neighbor_x, neighbor_y))
+
+    def sync_graph(self):
+        # Repair the tiles edited since the last call, found by comparing walkability snapshots
+        if self.game_graph.version == self.version:
+            return
+        if self.landmarks is not None and not self.landmarks.is_valid(self.game_graph):
+            self.landmarks = None
+            self.rekey()
+        walkable: bytearray = self.grid.walkable
+        if len(walkable) != len(self.walkable):
+            self.reset(self.start)
+            return
+        changed: List[int] = [index for index in range(len(walkable)) if walkable[index] != self.walkable[index]]
+        self.version = self.game_graph.version
+        self.walkable = bytes(walkable)
+        if self.start is not None and not walkable[self.start]:
+            self.reset(self.start)
+            return
+        for index in changed:
+            self.tile_changed(index)
+
+    def extract_path(self) -> List[int]|None:
+        if self.g[self.goal] == INFINITY:
+            return None
+        path: List[int] = [self.goal]
+        while path[-1] != self.start:
+            current: int = path[-1]
+            path.append(min(self.grid.neighbors(current), key=lambda neighbor: self.g[neighbor]))
+        path.reverse()
+        return path
+
+    def plan(self, start: int, goal: int) -> List[int]|None:
+        """
+        ### Description
+        Plans a path from start to goal, reusing as much of the previous search as possible.
+
+        ### Parameters
+        - start: int. The grid index of the start tile.
+        - goal: int. The grid index of the goal tile.
+
+        ### Returns
+        List[int]|None: The tile indices from start to goal, both included.
+        """
+        self.expansions = 0
+        self.relaxed = 0
+        self.peak_queue = 0
+        if not self.grid.connected(start, goal):
+            return None
+        if self.start is None or (start != self.start and (self.path is None or start not in self.path)):
+            self.reset(start)
+        self.sync_graph()
+        if goal != self.goal:
+            self.set_goal(goal)
+
+        self.compute_shortest_path()
+        self.path = self.extract_path()
+
+        # The agent moved along the tree: keep the root while it is still on the path
+        if start != self.start:
+            if self.path is not None and start in self.path:
+                return self.path[self.path.index(start):]
+            self.reset(start)
+            self.set_goal(goal)
+            self.compute_shortest_path()
+            self.path = self.extract_path()
+        return self.path
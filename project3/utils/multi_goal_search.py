@@ -0,0 +1,181 @@
+import heapq
+import time
+from array import array
+from typing import List, Sequence, Tuple
+from utils.walkability_grid import WalkabilityGrid
+from utils.grid_a_star import achieved_bound, rebuild_tile_path
+from utils.threat_field import ThreatField
+from utils.search_stats import SearchStats
+
+class NearestGoalSearch:
+    """
+    ### Description
+    The search of pathfind_grid_nearest_goal as an object that can be paused and resumed,
+    like GridAStarSearch.
+
+    ### Attributes
+    - `grid`: The grid to search.
+    - `start`: The index of the start tile.
+    - `done`: Whether the search has finished.
+    - `tiles`: The tile indices from start to the reached goal once the search has finished, or None.
+    - `goal`: The index of the reached goal once the search has finished, or None.
+    - `expanded`: The number of tiles expanded so far.
+    - `relaxed`: The number of steps to walkable tiles looked at so far.
+    - `peak_open`: The largest size of the open list so far, stale entries included.
+    - `weight`: The factor of the estimate in the priority of the tiles.
+    - `suboptimality_bound`: How many times the cost of the nearest goal the path found may cost at most.
+
+    ### Methods
+    - `run(max_expansions: int|None = None) -> bool`: Resumes the search, returns whether it finished.
+    - `record(stats: SearchStats, wall_time: float)`: Adds the counters of the finished search to `stats`.
+    - `admissible_estimate(index: int) -> float`: Returns the Manhattan distance from a tile to the nearest goal.
+    """
+    def __init__(self, grid: WalkabilityGrid, start: int, goals: Sequence[int], threat: ThreatField|None = None, weight: float = 1.0):
+        self.grid: WalkabilityGrid = grid
+        self.start: int = start
+        self.threat_costs: array|None = threat.threat if threat is not None else None
+        self.done: bool = False
+        self.tiles: List[int]|None = None
+        self.goal: int|None = None
+        self.expanded: int = 0
+        self.relaxed: int = 0
+        self.peak_open: int = 1
+        self.weight: float = weight
+        self.suboptimality_bound: float = 1.0
+
+        walkable: bytearray = grid.walkable
+        width: int = grid.width
+        # Goals in another connected component can never be reached
+        self.goal_tiles: set = {goal for goal in goals if grid.connected(start, goal)}
+        if not walkable[start] or not self.goal_tiles:
+            self.done = True
+            return
+
+        self.goal_coordinates: List[Tuple[int, int]] = [(goal % width, goal // width) for goal in self.goal_tiles]
+        size: int = len(walkable)
+        self.cost_so_far: array = array('d', [float('inf')]) * size
+        self.parents: array = array('i', [-1]) * size
+        self.closed: bytearray = bytearray(size)
+
+        # The minimum of consistent estimates is still consistent, so settled tiles are final
+        start_x, start_y = start % width, start // width
+        self.cost_so_far[start] = 0
+        self.open_heap: List[Tuple[float, float, int]] = [(weight * min(abs(start_x - x) + abs(start_y - y) for x, y in self.goal_coordinates), 0, start)]
+
+    def run(self, max_expansions: int|None = None) -> bool:
+        """
+        ### Description
+        Resumes the search until it finishes or has expanded `max_expansions` more tiles.
+
+        ### Parameters
+        - max_expansions: int|None. The number of tiles this call may expand, or None for no limit.
+
+        ### Returns
+        bool: True if the search has finished, in which case `tiles` and `goal` hold its result.
+        """
+        if self.done:
+            return True
+
+        walkable: bytearray = self.grid.walkable
+        width: int = self.grid.width
+        height: int = self.grid.height
+        goal_tiles: set = self.goal_tiles
+        goal_coordinates: List[Tuple[int, int]] = self.goal_coordinates
+        threat_costs: array|None = self.threat_costs
+        weight: float = self.weight
+        cost_so_far: array = self.cost_so_far
+        parents: array = self.parents
+        closed: bytearray = self.closed
+        open_heap: List[Tuple[float, float, int]] = self.open_heap
+
+        expanded: int = 0
+        relaxed: int = 0
+        peak_open: int = self.peak_open
+        while open_heap:
+            if max_expansions is not None and expanded >= max_expansions:
+                self.expanded += expanded
+                self.relaxed += relaxed
+                self.peak_open = peak_open
+                return False
+            _, _, current = heapq.heappop(open_heap)
+            if closed[current]:
+                continue
+            if current in goal_tiles:
+                self.tiles = rebuild_tile_path(parents, self.start, current)
+                self.goal = current
+                if weight != 1.0:
+                    self.suboptimality_bound = achieved_bound(cost_so_far[current], open_heap, cost_so_far, closed, self.admissible_estimate)
+                break
+            closed[current] = 1
+            expanded += 1
+
+            current_cost: float = cost_so_far[current]
+            current_x, current_y = current % width, current // width
+            for neighbor, x, y in ((current + width, current_x, current_y + 1), (current + 1, current_x + 1, current_y),
+                                   (current - width, current_x, current_y - 1), (current - 1, current_x - 1, current_y)):
+                if not (0 <= x < width and 0 <= y < height and walkable[neighbor]):
+                    continue
+                relaxed += 1
+                neighbor_cost: float = current_cost + 1.0
+                if threat_costs is not None:
+                    neighbor_cost += threat_costs[neighbor]
+
+                if neighbor_cost < cost_so_far[neighbor]:
+                    cost_so_far[neighbor] = neighbor_cost
+                    parents[neighbor] = current
+                    # Only a weighted search can improve a closed tile, it is reopened like in GridAStarSearch
+                    closed[neighbor] = 0
+                    estimate: float = min(abs(x - goal_x) + abs(y - goal_y) for goal_x, goal_y in goal_coordinates)
+                    heapq.heappush(open_heap, (neighbor_cost + weight * estimate, -neighbor_cost, neighbor))
+            if len(open_heap) > peak_open:
+                peak_open = len(open_heap)
+
+        self.expanded += expanded
+        self.relaxed += relaxed
+        self.peak_open = peak_open
+        self.done = True
+        return True
+
+    def record(self, stats: SearchStats, wall_time: float):
+        # Same counters as GridAStarSearch.record
+        stats.nodes_expanded += self.expanded
+        stats.edges_relaxed += self.relaxed
+        stats.peak_open = max(stats.peak_open, self.peak_open)
+        stats.suboptimality_bound = self.suboptimality_bound
+        stats.wall_time += wall_time
+        stats.reached = self.tiles is not None
+        stats.path_length = len(self.tiles) - 1 if self.tiles is not None else 0
+
+    def admissible_estimate(self, index: int) -> float:
+        x, y = index % self.grid.width, index // self.grid.width
+        return min(abs(x - goal_x) + abs(y - goal_y) for goal_x, goal_y in self.goal_coordinates)
+
+def pathfind_grid_nearest_goal(grid: WalkabilityGrid, start: int, goals: Sequence[int], threat: ThreatField|None = None, weight: float = 1.0, stats: SearchStats|None = None) -> Tuple[List[int]|None, int|None]:
+    """
+    ### Description
+    Find the path to the closest of several goal tiles with a single search.
+    The search expands from the start once, guided by the Manhattan distance to the
+    nearest goal, and stops at the first goal tile it settles. That goal is the
+    cheapest one to reach, so this replaces one A* per candidate goal.
+
+    ### Parameters
+    - grid: WalkabilityGrid. The grid to search.
+    - start: int. The index of the start tile.
+    - goals: Sequence[int]. The indices of the candidate goal tiles.
+    - threat: ThreatField|None. If given, the threat added to the cost of entering every tile,
+    like in pathfind_tactical_astar.
+    - weight: float. The factor of the estimate in the priority of the tiles. Above 1 the
+    search expands fewer tiles, and the reached goal may not be the nearest one, but the
+    path costs at most `weight` times the path to the nearest goal.
+    - stats: SearchStats|None. If given, filled in with the counters of the search.
+
+    ### Returns
+    Tuple[List[int]|None, int|None]: The tile indices from start to the reached goal, both
+    included, and the index of that goal. (None, None) if no goal is reachable.
+    """
+    started: float = time.perf_counter()
+    search = NearestGoalSearch(grid, start, goals, threat, weight)
+    search.run()
+    if stats is not None:
+        search.record(stats, time.perf_counter() - started)
+    return search.tiles, search.goal
@@ -0,0 +1,96 @@
+from collections import OrderedDict
+from typing import Dict, Hashable, List, Tuple
+from utils.connection import Connection
+from utils.graph import Graph
+
+class PathCache:
+    """
+    ### Description
+    A bounded least recently used cache of pathfinding results.
+    Entries are keyed by `(start tile, goal tile, heuristic, search kind)` and are only
+    valid for the graph version they were computed on: as soon as the graph is edited
+    the whole cache is dropped.
+
+    ### Attributes
+    - `capacity`: The maximum number of paths stored.
+    - `hits`: The number of lookups answered from the cache.
+    - `misses`: The number of lookups that had to run a search.
+    - `evictions`: The number of paths dropped to make room for new ones.
+    - `invalidations`: The number of times the cache was dropped because the graph changed.
+
+    ### Methods
+    - `get(graph: Graph, key: Hashable) -> Tuple[bool, List[Connection]|None]`: Looks up a path.
+    - `put(graph: Graph, key: Hashable, path: List[Connection]|None)`: Stores a path.
+    - `clear()`: Drops every stored path.
+    - `stats() -> Dict[str, int]`: Returns the counters of the cache.
+    """
+    def __init__(self, capacity: int = 256):
+        self.capacity: int = capacity
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        self.invalidations: int = 0
+        self._paths: OrderedDict[Hashable, List[Connection]|None] = OrderedDict()
+        self._version: int|None = None
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+    def _check_version(self, graph: Graph):
+        if graph.version != self._version:
+            if self._paths:
+                self.invalidations += 1
+            self._paths.clear()
+            self._version = graph.version
+
+    def get(self, graph: Graph, key: Hashable) -> Tuple[bool, List[Connection]|None]:
+        """
+        ### Description
+        Looks up the path stored for a key.
+
+        ### Parameters
+        - graph: The graph the path is searched on.
+        - key: The key of the query.
+
+        ### Returns
+        - Whether the key was found, and a copy of the stored path (None for unreachable goals).
+        """
+        self._check_version(graph)
+        if key not in self._paths:
+            self.misses += 1
+            return False, None
+        self.hits += 1
+        self._paths.move_to_end(key)
+        path = self._paths[key]
+        # Callers consume their paths with pop, so they get their own list
+        return True, list(path) if path is not None else None
+
+    def put(self, graph: Graph, key: Hashable, path: List[Connection]|None):
+        """
+        ### Description
+        Stores the result of a search, evicting the least recently used path if the cache is full.
+
+        ### Parameters
+        - graph: The graph the path was searched on.
+        - key: The key of the query.
+        - path: The path found, or None if the goal is unreachable.
+        """
+        self._check_version(graph)
+        self._paths[key] = list(path) if path is not None else None
+        self._paths.move_to_end(key)
+        while len(self._paths) > self.capacity:
+            self._paths.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._paths.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._paths),
+            "capacity": self.capacity,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
@@ -0,0 +1,172 @@
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Protocol
+from utils.graph import Graph
+
+class ResumableSearch(Protocol):
+    """
+    ### Description
+    A search that can be paused and resumed, like GridAStarSearch and NearestGoalSearch.
+    """
+    done: bool
+    tiles: List[int]|None
+    expanded: int
+
+    def run(self, max_expansions: int|None = None) -> bool: ...
+
+class PathRequest:
+    """
+    ### Description
+    A path request of an agent, owned by a PathRequestQueue.
+
+    ### Attributes
+    - `owner`: The key of the agent that made the request.
+    - `factory`: Creates the search of the request. It is called again if the graph is edited
+    while the search is running.
+    - `search`: The current search of the request.
+    - `version`: The version of the graph the search was started on.
+    - `frames`: The number of frames the search has been given time in.
+    - `wall_time`: The time spent running the search, in seconds, over every frame.
+    - `context`: Anything the agent needs to interpret the result, like the targets of the goal tiles.
+    """
+    def __init__(self, owner: Hashable, factory: Callable[[], ResumableSearch], version: int, context: Any = None):
+        self.owner: Hashable = owner
+        self.context: Any = context
+        self.factory: Callable[[], ResumableSearch] = factory
+        self.search: ResumableSearch = factory()
+        self.version: int = version
+        self.frames: int = 0
+        self.wall_time: float = 0.0
+
+    @property
+    def done(self) -> bool:
+        return self.search.done
+
+    @property
+    def tiles(self) -> List[int]|None:
+        return self.search.tiles
+
+class PathRequestQueue:
+    """
+    ### Description
+    Spreads path searches over several frames. Agents submit requests, `update` is called
+    once per frame and resumes the pending searches in order until the frame budget is
+    spent, and agents poll for their finished paths on later frames while they keep
+    following their previous one. This bounds the time pathfinding takes in a frame, no
+    matter how many agents ask for paths or how expensive a single query is.
+
+    Each agent has at most one pending request: a new request replaces the old one.
+
+    ### Attributes
+    - `graph`: The graph the searches run on. Searches are restarted when it is edited.
+    - `expansions_per_frame`: The number of tiles the searches may expand in a frame.
+    - `time_budget_us`: If given, the number of microseconds the searches may take in a frame.
+    - `slice_size`: The number of tiles expanded between two checks of the time budget.
+    - `expansions`: The number of tiles expanded by the last call to `update`.
+
+    ### Methods
+    - `submit(owner: Hashable, factory: Callable[[], ResumableSearch], context: Any) -> PathRequest`: Queues a request.
+    - `update() -> int`: Resumes the pending searches within the frame budget.
+    - `poll(owner: Hashable) -> PathRequest|None`: Takes the finished request of an agent.
+    - `cancel(owner: Hashable)`: Drops the requests of an agent.
+    """
+    def __init__(self, graph: Graph, expansions_per_frame: int = 2000, time_budget_us: int|None = None, slice_size: int = 64):
+        self.graph: Graph = graph
+        self.expansions_per_frame: int = expansions_per_frame
+        self.time_budget_us: int|None = time_budget_us
+        self.slice_size: int = slice_size
+        self.expansions: int = 0
+        self._pending: OrderedDict[Hashable, PathRequest] = OrderedDict()
+        self._finished: Dict[Hashable, PathRequest] = {}
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def is_pending(self, owner: Hashable) -> bool:
+        return owner in self._pending
+
+    def submit(self, owner: Hashable, factory: Callable[[], ResumableSearch], context: Any = None) -> PathRequest:
+        """
+        ### Description
+        Queues a path request, replacing the pending request of the same agent if any.
+        Creating the search does no expansion yet.
+
+        ### Parameters
+        - owner: Hashable. The key of the agent making the request.
+        - factory: Callable[[], ResumableSearch]. Creates the search to run.
+        - context: Any. Stored in the request for the agent.
+
+        ### Returns
+        PathRequest: The queued request.
+        """
+        self._pending.pop(owner, None)
+        request = PathRequest(owner, factory, self.graph.version, context)
+        self._pending[owner] = request
+        return request
+
+    def update(self) -> int:
+        """
+        ### Description
+        Resumes the pending searches, oldest first, until every one has finished or the
+        expansion or time budget of the frame is spent. Finished requests can then be polled.
+
+        ### Returns
+        int: The number of tiles expanded.
+        """
+        budget: int = self.expansions_per_frame
+        deadline: float|None = None
+        if self.time_budget_us is not None:
+            deadline = time.perf_counter() + self.time_budget_us / 1_000_000
+
+        expanded: int = 0
+        while self._pending and budget > 0:
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            owner, request = next(iter(self._pending.items()))
+            # A search started before the graph was edited may return a blocked path
+            if request.version != self.graph.version:
+                request.search = request.factory()
+                request.version = self.graph.version
+            request.frames += 1
+
+            started: float = time.perf_counter()
+            while budget > 0:
+                before: int = request.search.expanded
+                finished: bool = request.search.run(min(budget, self.slice_size))
+                expanded += request.search.expanded - before
+                budget -= max(request.search.expanded - before, 1)
+                if finished:
+                    break
+                if deadline is not None and time.perf_counter() >= deadline:
+                    break
+            request.wall_time += time.perf_counter() - started
+
+            if request.done:
+                del self._pending[owner]
+                self._finished[owner] = request
+            else:
+                # Unfinished searches go to the back, so one slow query cannot starve the others
+                self._pending.move_to_end(owner)
+        self.expansions = expanded
+        return self.expansions
+
+    def poll(self, owner: Hashable) -> PathRequest|None:
+        """
+        ### Description
+        Takes the finished request of an agent.
+
+        ### Parameters
+        - owner: Hashable. The key of the agent.
+
+        ### Returns
+        PathRequest|None: The finished request, or None if there is none yet or the graph was
+        edited since it finished.
+        """
+        request = self._finished.pop(owner, None)
+        if request is not None and request.version != self.graph.version:
+            return None
+        return request
+
+    def cancel(self, owner: Hashable):
+        self._pending.pop(owner, None)
+        self._finished.pop(owner, None)
@@ -0,0 +1,65 @@
+import math
+from typing import List, Tuple
+from utils.collision_bitmap import CollisionBitmap
+from utils.connection import Connection
+from utils.node import TileNode
+
+def smooth_path(path: List[Connection], bitmap: CollisionBitmap, block_size: int, start: Tuple[float, float]|None = None, clearance: int = 0) -> List[Connection]:
+    """
+    ### Description
+    Removes the waypoints of a tile path that can be skipped: from every kept waypoint the
+    path jumps to a farther node in sight on the collision bitmap. The farthest node in
+    sight is looked for with a galloping search, which takes a logarithmic number of rays
+    per kept waypoint instead of one ray per node. Agents steer to
+    `node.x * block_size, node.y * block_size`, so that is the point tested for every node.
+    The result is a shorter list of connections between the kept nodes, whose costs are
+    the straight distances between them in tiles.
+
+    ### Parameters
+    - path: List[Connection]. The path to smooth.
+    - bitmap: CollisionBitmap. The collision bitmap of the zoomed world.
+    - block_size: int. The size of a block.
+    - start: Tuple[float, float]|None. The position of the agent, used instead of the first
+    node for the first segment, as the agent does not stand on the corner of its tile.
+    - clearance: int. The distance in pixels the skipped segments keep from obstacles.
+
+    ### Returns
+    List[Connection]: The smoothed path.
+    """
+    if not path or len(path) < 2:
+        return path
+    sight: CollisionBitmap = bitmap.inflated(clearance)
+    nodes: List[TileNode] = [path[0].from_node] + [connection.to_node for connection in path]
+    points: List[Tuple[float, float]] = [(node.x * block_size, node.y * block_size) for node in nodes]
+
+    smoothed: List[Connection] = []
+    anchor: int = 0
+    last: int = len(nodes) - 1
+    while anchor < last:
+        anchor_point: Tuple[float, float] = start if anchor == 0 and start is not None else points[anchor]
+
+        # Gallop while the nodes stay in sight, then bisect between the last seen and the first hidden one
+        seen: int = anchor + 1
+        step: int = 2
+        hidden: int = last + 1
+        while anchor + step <= last:
+            if not sight.line_of_sight(*anchor_point, *points[anchor + step]):
+                hidden = anchor + step
+                break
+            seen = anchor + step
+            step *= 2
+        if hidden > last and seen < last:
+            if sight.line_of_sight(*anchor_point, *points[last]):
+                seen = last
+            else:
+                hidden = last
+        while hidden - seen > 1:
+            middle: int = (seen + hidden) // 2
+            if sight.line_of_sight(*anchor_point, *points[middle]):
+                seen = middle
+            else:
+                hidden = middle
+
+        smoothed.append(Connection(nodes[anchor], nodes[seen], math.dist(points[anchor], points[seen]) / block_size))
+        anchor = seen
+    return smoothed
@@ -0,0 +1,168 @@
+import multiprocessing
+import threading
+from array import array
+from concurrent.futures import BrokenExecutor, Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, List, Sequence, Tuple
+from utils.game_graph import GameGraph
+from utils.grid_a_star import pathfind_grid_astar
+from utils.jump_point_search import pathfind_jps
+from utils.multi_goal_search import pathfind_grid_nearest_goal
+from utils.search_stats import SearchStats
+from utils.threat_field import ThreatField
+from utils.walkability_grid import WalkabilityGrid
+
+# State of a worker, set once by the pool initializer instead of being sent with every request
+_worker_grid: WalkabilityGrid|None = None
+_worker_state: threading.local = threading.local()
+
+def _init_worker(grid: WalkabilityGrid):
+    global _worker_grid
+    _worker_grid = grid
+
+def _run_request(start: int, goal: int|Sequence[int], mode: str, threat_sources: Tuple[int, ...], weight: float) -> Tuple[List[int]|None, int|None, SearchStats]:
+    grid: WalkabilityGrid = _worker_grid
+    stats = SearchStats()
+    threat: ThreatField|None = None
+    if threat_sources:
+        # Workers keep their last field, consecutive requests usually evade the same tiles
+        if not hasattr(_worker_state, "threat"):
+            _worker_state.threat = ThreatField()
+        threat = _worker_state.threat
+        threat.update(grid, threat_sources)
+    if mode == "nearest":
+        tiles, goal = pathfind_grid_nearest_goal(grid, start, goal, threat, weight, stats)
+    elif mode == "jps":
+        tiles = pathfind_jps(grid, start, goal, stats)
+    else:
+        tiles = pathfind_grid_astar(grid, start, goal, threat, stats, weight=weight)
+    return tiles, goal, stats
+
+class PathFuture:
+    """
+    ### Description
+    The pending result of a request made to a PathWorkerPool.
+
+    ### Attributes
+    - `future`: The future of the worker running the search.
+    - `version`: The version of the graph the request was made on.
+    - `context`: Anything the agent needs to interpret the result, like the targets of the goal tiles.
+
+    ### Methods
+    - `done() -> bool`: Returns whether the search has finished.
+    - `result() -> Tuple[List[int]|None, int|None]`: Returns the tiles of the path and the goal reached.
+    - `stats() -> SearchStats`: Returns the counters of the search, measured by the worker, or empty ones if it failed or was cancelled.
+    """
+    def __init__(self, future: Future, version: int, context: Any = None):
+        self.future: Future = future
+        self.version: int = version
+        self.context: Any = context
+
+    def done(self) -> bool:
+        return self.future.done()
+
+    def result(self) -> Tuple[List[int]|None, int|None]:
+        tiles, goal, _ = self.future.result()
+        return tiles, goal
+
+    def stats(self) -> SearchStats:
+        # Requests still queued when the graph was edited are cancelled with the old pool
+        if self.future.cancelled() or self.future.exception() is not None:
+            return SearchStats()
+        return self.future.result()[2]
+
+class PathWorkerPool:
+    """
+    ### Description
+    Runs grid searches on a pool of workers, so path planning uses other cores instead of
+    the game loop. Workers receive the walkability grid once, when they start, and requests
+    only carry tile indices. When the graph is edited the pool is restarted with the new
+    grid, and results of requests made before the edit should be discarded by the caller.
+
+    Process workers are forked where the platform allows it, since spawned workers would
+    import and run the game script again; elsewhere threads are used.
+
+    With a radius the workers search the layer of agents of that radius instead of the
+    grid of the graph, so every agent class of that size can share the pool.
+
+    ### Attributes
+    - `game_graph`: The game graph the searches run on.
+    - `radius`: The radius in pixels of the agents the pool plans for, or None for the grid of the graph.
+    - `workers`: The number of workers.
+    - `use_processes`: Whether the workers are processes or threads.
+    - `restarts`: The number of times the pool was started.
+
+    ### Methods
+    - `submit(start: int, goal: int|Sequence[int], mode: str, threat_sources: Sequence[int], context: Any, weight: float) -> PathFuture`: Queues a search.
+    - `shutdown()`: Stops the workers.
+    """
+    MODES: Tuple[str, ...] = ("astar", "jps", "nearest")
+
+    def __init__(self, game_graph: GameGraph, workers: int = 2, use_processes: bool = True, radius: int|None = None):
+        self.game_graph: GameGraph = game_graph
+        self.radius: int|None = radius
+        self.workers: int = workers
+        self.use_processes: bool = use_processes and "fork" in multiprocessing.get_all_start_methods()
+        self.restarts: int = 0
+        self._executor: Executor|None = None
+        self._version: int|None = None
+
+    def __enter__(self) -> 'PathWorkerPool':
+        return self
+
+    def __exit__(self, *_):
+        self.shutdown()
+
+    def _ensure_executor(self) -> Executor:
+        if self._executor is not None and self._version == self.game_graph.version:
+            return self._executor
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        grid: WalkabilityGrid = self.game_graph.layer(self.radius)
+        if self.use_processes:
+            self._executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("fork"), initializer=_init_worker, initargs=(grid,))
+        else:
+            # Threads share the module state, so the grid is copied for the searches to stay consistent
+            components = array('i', grid.components) if grid.components is not None else None
+            snapshot = WalkabilityGrid(grid.width, grid.height, bytearray(grid.walkable), components)
+            self._executor = ThreadPoolExecutor(self.workers, initializer=_init_worker, initargs=(snapshot,))
+        self._version = self.game_graph.version
+        self.restarts += 1
+        return self._executor
+
+    def submit(self, start: int, goal: int|Sequence[int], mode: str = "astar", threat_sources: Sequence[int] = (), context: Any = None, weight: float = 1.0) -> PathFuture:
+        """
+        ### Description
+        Queues a search on the workers.
+
+        ### Parameters
+        - start: int. The grid index of the start tile.
+        - goal: int|Sequence[int]. The grid index of the goal tile, or the candidate goal tiles for the "nearest" mode.
+        - mode: str. "astar", "jps" or "nearest".
+        - threat_sources: Sequence[int]. The grid indices of the tiles to keep away from. Not used by "jps".
+        - context: Any. Stored in the returned future for the agent.
+        - weight: float. The factor of the estimate of the "astar" and "nearest" searches. Above 1
+        the path is found faster and costs at most `weight` times the optimal one. "jps" raises a
+        ValueError if given a weight other than 1.
+
+        ### Returns
+        PathFuture: The pending result, the tiles of the path and the goal reached.
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown search mode: {mode}")
+        if mode == "jps" and weight != 1.0:
+            raise ValueError("The jps search does not take a weight")
+        if mode == "nearest":
+            goal = tuple(goal)
+        request = (start, goal, mode, tuple(sorted(set(threat_sources))), weight)
+        try:
+            future: Future = self._ensure_executor().submit(_run_request, *request)
+        except BrokenExecutor:
+            # A worker died and took the pool with it, start a new one
+            self._executor = None
+            future = self._ensure_executor().submit(_run_request, *request)
+        return PathFuture(future, self._version, context)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
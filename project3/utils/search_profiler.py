@@ -0,0 +1,75 @@
+import json
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator
+from utils.search_stats import SearchStats
+
+class SearchProfiler:
+    """
+    ### Description
+    Adds up the SearchStats of the pathfinding queries of every call site of the game, like
+    the Q path of the player or the pursuit of an enemy, to see which behaviour takes the
+    largest part of the frame budget. The totals can be read while the game runs or written
+    as JSON when it ends.
+
+    ### Attributes
+    - `sites`: The totals of every call site, by name.
+
+    ### Methods
+    - `measure(site: str) -> Iterator[SearchStats]`: Times a block and records the stats filled in inside it.
+    - `record(site: str, stats: SearchStats)`: Adds the stats of one query to a call site.
+    - `summary() -> Dict[str, Dict[str, float]]`: Returns the totals and averages of every call site.
+    - `dump(path: str)`: Writes the summary as JSON.
+    """
+    def __init__(self):
+        self.sites: Dict[str, Dict[str, float]] = {}
+
+    @contextmanager
+    def measure(self, site: str) -> Iterator[SearchStats]:
+        stats = SearchStats()
+        started: float = time.perf_counter()
+        try:
+            yield stats
+        finally:
+            # The whole block is timed, so cache lookups and path building count too
+            stats.wall_time = time.perf_counter() - started
+            self.record(site, stats)
+
+    def record(self, site: str, stats: SearchStats):
+        totals = self.sites.setdefault(site, {
+            "queries": 0, "reached": 0, "nodes_expanded": 0, "edges_relaxed": 0, "peak_open": 0,
+            "wall_time": 0.0, "max_wall_time": 0.0, "path_length": 0, "max_suboptimality_bound": 1.0,
+        })
+        totals["queries"] += 1
+        totals["reached"] += int(stats.reached)
+        totals["nodes_expanded"] += stats.nodes_expanded
+        totals["edges_relaxed"] += stats.edges_relaxed
+        totals["peak_open"] = max(totals["peak_open"], stats.peak_open)
+        totals["wall_time"] += stats.wall_time
+        totals["max_wall_time"] = max(totals["max_wall_time"], stats.wall_time)
+        totals["path_length"] += stats.path_length
+        totals["max_suboptimality_bound"] = max(totals["max_suboptimality_bound"], stats.suboptimality_bound)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        ### Description
+        Returns the totals of every call site with the averages per query, and the share of
+        the time of all the call sites each one took.
+
+        ### Returns
+        Dict[str, Dict[str, float]]: The figures of every call site, by name.
+        """
+        total_time: float = sum(totals["wall_time"] for totals in self.sites.values())
+        summary: Dict[str, Dict[str, float]] = {}
+        for site, totals in self.sites.items():
+            queries: int = totals["queries"]
+            summary[site] = dict(totals)
+            summary[site]["mean_wall_time_ms"] = 1000 * totals["wall_time"] / queries
+            summary[site]["mean_nodes_expanded"] = totals["nodes_expanded"] / queries
+            summary[site]["mean_path_length"] = totals["path_length"] / max(1, totals["reached"])
+            summary[site]["time_share"] = totals["wall_time"] / total_time if total_time > 0 else 0.0
+        return summary
+
+    def dump(self, path: str):
+        with open(path, "w") as file:
+            json.dump(self.summary(), file, indent=4, sort_keys=True)
@@ -0,0 +1,39 @@
+import time
+from typing import Dict
+
+class SearchStats:
+    """
+    ### Description
+    Counters filled in by a search function when one is passed to it.
+
+    ### Attributes
+    - `nodes_expanded`: The number of nodes taken out of the open list and expanded.
+    - `edges_relaxed`: The number of connections looked at from the expanded nodes.
+    - `peak_open`: The largest size the open list reached.
+    - `wall_time`: The time spent in the search, in seconds.
+    - `path_length`: The number of connections of the path found, 0 if none was.
+    - `reached`: Whether the goal was reached.
+    - `suboptimality_bound`: How many times the optimal cost the path found may cost at most.
+    Weighted searches work it out when they finish, optimal ones leave it at 1.
+
+    ### Methods
+    - `finish(started: float, path_length: int|None)`: Records the time since `started` and the path found.
+    - `as_dict() -> Dict[str, float]`: Returns the counters by name.
+    """
+    def __init__(self):
+        self.nodes_expanded: int = 0
+        self.edges_relaxed: int = 0
+        self.peak_open: int = 0
+        self.wall_time: float = 0.0
+        self.path_length: int = 0
+        self.reached: bool = False
+        self.suboptimality_bound: float = 1.0
+
+    def finish(self, started: float, path_length: int|None):
+        # Searches pass the number of connections of their path, or None if they found none
+        self.wall_time += time.perf_counter() - started
+        self.reached = path_length is not None
+        self.path_length = path_length or 0
+
+    def as_dict(self) -> Dict[str, float]:
+        return dict(vars(self))
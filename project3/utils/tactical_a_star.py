@@ -1,8 +1,12 @@
-from typing import List 
+import heapq
+import time
+from typing import Dict, List, Tuple
 from dataclasses import dataclass
 from utils.graph import Graph
 from utils.node import Node
 from utils.connection import Connection
+from utils.search_stats import SearchStats
+from utils.threat_field import DISTANCE_FROM_PLAYER, ThreatField
 from abc import ABC, abstractmethod
 
 class Heuristic(ABC):
@@ -72,8 +76,8 @@ class TacticalPathfindingList:
     Class to store a list of node records for pathfinding.
 
     ### Attributes
-    #### records: List[NodeRecord]
-    The list of node records.
+    #### records: Dict[Node, NodeRecord]
+    The node records, indexed by their node.
 
     ### Methods
     #### __init__()
@@ -98,32 +102,88 @@ class TacticalPathfindingList:
     Find the record with the smallest estimated total cost.
     """
     def __init__(self):
-        self.records: List[NodeRecord] = []
+        self.records: Dict[Node, NodeRecord] = {}
+        self._heap: List[Tuple[float, int, NodeRecord]] = []
+        self._counter: int = 0
     
     def __len__(self):
         return len(self.records)
     
     def add(self, record: NodeRecord):
-        self.records.append(record)
+        # Adding a record that is already in the list just refreshes its priority
+        self.records[record.node] = record
+        self._counter += 1
+        heapq.heappush(self._heap, (record.estimated_total_cost, self._counter, record))
     
     def remove(self, record: NodeRecord):
-        self.records.remove(record)
+        # The heap entry is left behind and discarded lazily by smallest_element
+        if self.records.get(record.node) is record:
+            del self.records[record.node]
     
     def contains(self, node: Node) -> bool:
-        return any(record.node == node for record in self.records)
+        return node in self.records
     
     def find(self, node: Node) -> NodeRecord|None:
-        for record in self.records:
-            if record.node == node:
-                return record
-        return None
+        return self.records.get(node)
     
     def smallest_element(self) -> NodeRecord:
-        return min(self.records, key=lambda x: x.estimated_total_cost)
+        # Drop entries of removed records or of records whose cost has changed since they were pushed
+        while self._heap:
+            cost, _, record = self._heap[0]
+            if self.records.get(record.node) is record and cost == record.estimated_total_cost:
+                return record
+            heapq.heappop(self._heap)
+        raise ValueError("smallest_element() called on an empty list")
+
+class TacticalClosedList:
+    """
+    ### Description
+    Class to store the node records that have already been processed. Unlike TacticalPathfindingList
+    it is never asked for its smallest element, so it keeps no heap, only the records by node.
+
+    ### Attributes
+    #### records: Dict[Node, NodeRecord]
+    The node records, indexed by their node.
+
+    ### Methods
+    #### __init__()
+    Initialize the list with an empty list.
+
+    #### __len__() -> int
+    Return the number of records in the list.
+
+    #### add(record: NodeRecord)
+    Add a node record to the list.
+
+    #### remove(record: NodeRecord)
+    Remove a node record from the list.
+
+    #### contains(node: Node) -> bool
+    Check if the list contains a record for the given node.
 
-DISTANCE_FROM_PLAYER = 200
+    #### find(node: Node) -> NodeRecord|None
+    Find the record for the given node in the list.
+    """
+    def __init__(self):
+        self.records: Dict[Node, NodeRecord] = {}
+    
+    def __len__(self):
+        return len(self.records)
+    
+    def add(self, record: NodeRecord):
+        self.records[record.node] = record
+    
+    def remove(self, record: NodeRecord):
+        if self.records.get(record.node) is record:
+            del self.records[record.node]
+    
+    def contains(self, node: Node) -> bool:
+        return node in self.records
+    
+    def find(self, node: Node) -> NodeRecord|None:
+        return self.records.get(node)
 
-def pathfind_tactical_astar(graph: Graph, start: Node, goal: Node, heuristic: Heuristic, player: Node) -> List[Connection]|None:
+def pathfind_tactical_astar(graph: Graph, start: Node, goal: Node, heuristic: Heuristic, player: Node, threat: ThreatField|None = None, stats: SearchStats|None = None) -> List[Connection]|None:
     """
     ### Description
     Perform the A* pathfinding algorithm to find the path between two nodes.
@@ -134,10 +194,17 @@ def pathfind_tactical_astar(graph: Graph, start: Node, goal: Node, heuristic: He
     - goal: Node. The goal node to reach.
     - heuristic: Heuristic. The heuristic function to estimate the cost between nodes.
     - player: Node. The node representing the player that the path should avoid mantaing a distance of DISTANCE_FROM_PLAYER.
+    - threat: ThreatField|None. If given, the precomputed threat of every tile, used instead of
+    estimating the distance to the player on every edge.
+    - stats: SearchStats|None. If given, filled in with the counters of the search.
 
     ### Returns
     List[Connection]|None: The list of connections forming the path from start to goal.
     """
+    # Goals in another connected component are rejected without searching
+    if not graph.is_reachable(start, goal):
+        return None
+
     # Initialize the record for the start node
     start_record = NodeRecord(
         node=start,
@@ -148,7 +215,11 @@ def pathfind_tactical_astar(graph: Graph, start: Node, goal: Node, heuristic: He
     # Initialize the open and closed lists
     open_list = TacticalPathfindingList()
     open_list.add(start_record)
-    closed_list = TacticalPathfindingList()
+    closed_list = TacticalClosedList()
+    started = time.perf_counter()
+    expanded = 0
+    relaxed = 0
+    peak_open = 1
     
     # Iterate through processing each node
     while len(open_list) > 0:
@@ -157,14 +228,20 @@ def pathfind_tactical_astar(graph: Graph, start: Node, goal: Node, heuristic: He
         # If it is the goal node, then terminate
         if current.node == goal:
             break
+        expanded += 1
             
         # Get its outgoing connections
         connections = graph.get_connections(current.node)
+        relaxed += len(connections)
         
         # Loop through each connection
         for connection in connections:
             end_node = connection.to_node
-            end_node_cost = current.cost_so_far + connection.get_cost() + DISTANCE_FROM_PLAYER / (heuristic.estimate_between(end_node, player) + 1)
+            if threat is not None:
+                end_node_threat = threat.threat_at(end_node)
+            else:
+                end_node_threat = DISTANCE_FROM_PLAYER / (heuristic.estimate_between(end_node, player) + 1)
+            end_node_cost = current.cost_so_far + connection.get_cost() + end_node_threat
             
             # Handle closed list
             if closed_list.contains(end_node):
@@ -184,23 +261,32 @@ def pathfind_tactical_astar(graph: Graph, start: Node, goal: Node, heuristic: He
             # Handle unvisited nodes
             else:
                 end_node_record = NodeRecord(node=end_node)
-                end_node_heuristic = heuristic.estimate(end_node) + DISTANCE_FROM_PLAYER / (heuristic.estimate_between(end_node, player) + 1)
+                end_node_heuristic = heuristic.estimate(end_node) + end_node_threat
             
             # Update the node record
             end_node_record.cost_so_far = end_node_cost
             end_node_record.connection = connection
             end_node_record.estimated_total_cost = end_node_cost + end_node_heuristic
             
-            # Add it to open list if not already there
-            if not open_list.contains(end_node):
-                open_list.add(end_node_record)
+            # Add it to open list, or refresh its priority if it is already there
+            open_list.add(end_node_record)
                 
+        if len(open_list) > peak_open:
+            peak_open = len(open_list)
+
         # Move current node from open to closed
         open_list.remove(current)
         closed_list.add(current)
     
+    if stats is not None:
+        stats.nodes_expanded += expanded
+        stats.edges_relaxed += relaxed
+        stats.peak_open = max(stats.peak_open, peak_open)
+
     # Return null if no path found
     if current.node != goal:
+        if stats is not None:
+            stats.finish(started, None)
         return None
         
     # Compile the path
@@ -213,4 +299,6 @@ def pathfind_tactical_astar(graph: Graph, start: Node, goal: Node, heuristic: He
         
     # Reverse the path and return it
     path.reverse()
+    if stats is not None:
+        stats.finish(started, len(path))
     return path
\ No newline at end of file
@@ -0,0 +1,129 @@
+import heapq
+import math
+import time
+from array import array
+from typing import List, Tuple
+from utils.collision_bitmap import CollisionBitmap
+from utils.connection import Connection
+from utils.game_graph import GameGraph
+from utils.node import TileNode
+from utils.search_stats import SearchStats
+
+def pathfind_theta_star(graph: GameGraph, start: TileNode, goal: TileNode, bitmap: CollisionBitmap, clearance: int = 0, stats: SearchStats|None = None) -> List[Connection]|None:
+    """
+    ### Description
+    Perform a Theta* search, an any-angle variant of A* on the tiles of the game graph.
+    A reached tile is linked straight to the parent of the tile being expanded, so paths
+    cut through open space instead of following the grid: they have far fewer waypoints
+    and are shorter to travel than the ones of pathfind_astar. The link is checked on the
+    collision bitmap only when the tile is expanded (Lazy Theta*), which casts one ray per
+    expansion instead of one per neighbour; if the segment is blocked the tile falls back
+    to its best expanded neighbour.
+    Agents steer to `node.x * block_size, node.y * block_size`, so that is the point of
+    every tile used for the segments.
+
+    ### Parameters
+    - graph: GameGraph. The game graph to search.
+    - start: TileNode. The starting node for the path.
+    - goal: TileNode. The goal node to reach.
+    - bitmap: CollisionBitmap. The collision bitmap of the zoomed world.
+    - clearance: int. The distance in pixels the straight segments keep from obstacles.
+    - stats: SearchStats|None. If given, filled in with the counters of the search.
+
+    ### Returns
+    List[Connection]|None: The connections between the waypoints of the path, whose costs
+    are the straight distances between them in tiles.
+    """
+    if not graph.is_reachable(start, goal):
+        return None
+    if start == goal:
+        return []
+
+    started: float = time.perf_counter()
+    grid = graph.grid
+    walkable: bytearray = grid.walkable
+    width: int = grid.width
+    height: int = grid.height
+    block_size: int = graph.block_size
+    sight: CollisionBitmap = bitmap.inflated(clearance)
+    start_index: int = graph.tile_index(start)
+    goal_index: int = graph.tile_index(goal)
+    goal_x, goal_y = goal.x, goal.y
+
+    size: int = len(walkable)
+    cost_so_far: array = array('d', [float('inf')]) * size
+    parents: array = array('i', [-1]) * size
+    closed: bytearray = bytearray(size)
+    cost_so_far[start_index] = 0
+    parents[start_index] = start_index
+    open_heap: List[Tuple[float, float, int]] = [(math.hypot(start.x - goal_x, start.y - goal_y), 0, start_index)]
+
+    expanded: int = 0
+    relaxed: int = 0
+    peak_open: int = 1
+    reached: bool = False
+    while open_heap:
+        _, _, current = heapq.heappop(open_heap)
+        if closed[current]:
+            continue
+        current_x, current_y = current % width, current // width
+        parent: int = parents[current]
+        parent_x, parent_y = parent % width, parent // width
+        # The link to the parent was assumed when the tile was reached, check it now. Adjacent
+        # tiles are joined by a connection of the graph and need no ray
+        if abs(current_x - parent_x) + abs(current_y - parent_y) > 1 and not sight.line_of_sight(parent_x * block_size, parent_y * block_size, current_x * block_size, current_y * block_size):
+            # Fall back to the cheapest path through an expanded neighbour
+            best_cost: float = float('inf')
+            for neighbor, x, y in ((current + width, current_x, current_y + 1), (current + 1, current_x + 1, current_y),
+                                   (current - width, current_x, current_y - 1), (current - 1, current_x - 1, current_y)):
+                if 0 <= x < width and 0 <= y < height and closed[neighbor] and cost_so_far[neighbor] + 1 < best_cost:
+                    best_cost = cost_so_far[neighbor] + 1
+                    parent = neighbor
+            cost_so_far[current] = best_cost
+            parents[current] = parent
+            parent_x, parent_y = parent % width, parent // width
+
+        if current == goal_index:
+            reached = True
+            break
+        closed[current] = 1
+        expanded += 1
+
+        parent_cost: float = cost_so_far[parent]
+        # Same order as GameGraph.add_connections_for_tile: (0, 1), (1, 0), (0, -1), (-1, 0)
+        for neighbor, x, y in ((current + width, current_x, current_y + 1), (current + 1, current_x + 1, current_y),
+                               (current - width, current_x, current_y - 1), (current - 1, current_x - 1, current_y)):
+            if not (0 <= x < width and 0 <= y < height and walkable[neighbor]) or closed[neighbor]:
+                continue
+            relaxed += 1
+            # Link the neighbour straight to the parent, the segment is only checked if it gets expanded
+            neighbor_cost: float = parent_cost + math.hypot(x - parent_x, y - parent_y)
+            if neighbor_cost < cost_so_far[neighbor]:
+                cost_so_far[neighbor] = neighbor_cost
+                parents[neighbor] = parent
+                heapq.heappush(open_heap, (neighbor_cost + math.hypot(x - goal_x, y - goal_y), -neighbor_cost, neighbor))
+        if len(open_heap) > peak_open:
+            peak_open = len(open_heap)
+
+    if stats is not None:
+        stats.nodes_expanded += expanded
+        stats.edges_relaxed += relaxed
+        stats.peak_open = max(stats.peak_open, peak_open)
+    if not reached:
+        if stats is not None:
+            stats.finish(started, None)
+        return None
+
+    # Work back from the goal through the waypoints
+    path: List[Connection] = []
+    current = goal_index
+    while current != start_index:
+        parent = parents[current]
+        from_node: TileNode = graph.node_at(parent)
+        to_node: TileNode = graph.node_at(current)
+        path.append(Connection(from_node, to_node, math.hypot(to_node.x - from_node.x, to_node.y - from_node.y)))
+        current = parent
+    path.reverse()
+    if stats is not None:
+        stats.finish(started, len(path))
+    return path
@@ -0,0 +1,74 @@
+from array import array
+from typing import Iterable, List, Tuple
+from utils.node import TileNode
+from utils.walkability_grid import WalkabilityGrid
+
+# Weight of the threat of a source, divided by the distance to it plus one
+DISTANCE_FROM_PLAYER = 200
+
+class ThreatField:
+    """
+    ### Description
+    Dense per-tile threat used by the tactical searches. The threat of a tile is the sum,
+    over all threat sources, of `weight / (d + 1)`, where `d` is the Manhattan distance
+    between the tile and the source. With a single source this is the extra cost per step
+    of pathfind_tactical_astar, computed once for every tile instead of twice per edge.
+
+    The field is only rebuilt when the source tiles or the size of the grid change, so all
+    the tactical searches run while the player stands on the same tile share it.
+
+    ### Attributes
+    - `weight`: The threat of a source on its own tile.
+    - `width`: The number of tile columns of the field.
+    - `height`: The number of tile rows of the field.
+    - `sources`: The sorted grid indices of the threat sources.
+    - `threat`: The threat of every tile, indexed like the walkability grid.
+    - `rebuilds`: The number of times the field was computed.
+
+    ### Methods
+    - `update(grid: WalkabilityGrid, sources: Iterable[int]) -> bool`: Recomputes the field if needed.
+    - `threat_at(node: TileNode) -> float`: Returns the threat of the tile of a node.
+    """
+    def __init__(self, weight: float = DISTANCE_FROM_PLAYER):
+        self.weight: float = weight
+        self.width: int = 0
+        self.height: int = 0
+        self.sources: Tuple[int, ...]|None = None
+        self.threat: array = array('d')
+        self.rebuilds: int = 0
+
+    def update(self, grid: WalkabilityGrid, sources: Iterable[int]) -> bool:
+        """
+        ### Description
+        Makes the field match the given sources, recomputing it only if they changed.
+
+        ### Parameters
+        - grid: WalkabilityGrid. The grid the field is used on.
+        - sources: Iterable[int]. The grid indices of the threat sources.
+
+        ### Returns
+        bool: True if the field was recomputed.
+        """
+        sources = tuple(sorted(set(sources)))
+        if sources == self.sources and grid.width == self.width and grid.height == self.height:
+            return False
+        self.width, self.height, self.sources = grid.width, grid.height, sources
+        self.rebuilds += 1
+
+        threat: List[float] = [0.0] * (self.width * self.height)
+        for source in sources:
+            source_x, source_y = source % self.width, source // self.width
+            # Horizontal distances are shared by every row, only the vertical one changes
+            column_distances: List[int] = [abs(x - source_x) + 1 for x in range(self.width)]
+            for y in range(self.height):
+                row_distance: int = abs(y - source_y)
+                offset: int = y * self.width
+                threat[offset:offset + self.width] = [
+                    total + self.weight / (distance + row_distance)
+                    for total, distance in zip(threat[offset:offset + self.width], column_distances)
+                ]
+        self.threat = array('d', threat)
+        return True
+
+    def threat_at(self, node: TileNode) -> float:
+        return self.threat[node.y * self.width + node.x]
@@ -0,0 +1,116 @@
+from array import array
+from collections import deque
+from typing import Deque, List, Tuple
+
+class WalkabilityGrid:
+    """
+    ### Description
+    A flat, integer indexed representation of the walkable tiles of a game world.
+    Tile `(x, y)` is stored at index `y * width + x`.
+
+    ### Attributes
+    - `width`: The number of tile columns.
+    - `height`: The number of tile rows.
+    - `walkable`: A bytearray with a 1 for every walkable tile.
+    - `components`: The connected component of every tile, -1 for blocked tiles, or None
+    until `label_components` is called.
+
+    ### Methods
+    - `index(x: int, y: int) -> int`: Returns the index of a tile.
+    - `coordinates(index: int) -> Tuple[int, int]`: Returns the tile coordinates of an index.
+    - `is_walkable(x: int, y: int) -> bool`: Returns whether a tile is inside the grid and walkable.
+    - `neighbors(index: int) -> List[int]`: Returns the walkable tiles adjacent to a tile.
+    - `connected(a: int, b: int) -> bool`: Returns whether a path can join two tiles.
+    - `label_components()`: Labels the connected components of the whole grid.
+    - `update_components(index: int)`: Relabels the components touched by an edit of a tile.
+    """
+    def __init__(self, width: int, height: int, walkable: bytearray|None = None, components: array|None = None):
+        self.width: int = width
+        self.height: int = height
+        self.walkable: bytearray = walkable if walkable is not None else bytearray(width * height)
+        self.components: array|None = components
+        self._next_label: int = max(components, default=-1) + 1 if components is not None else 0
+
+    def __len__(self) -> int:
+        return len(self.walkable)
+
+    def index(self, x: int, y: int) -> int:
+        return y * self.width + x
+
+    def coordinates(self, index: int) -> Tuple[int, int]:
+        return index % self.width, index // self.width
+
+    def is_walkable(self, x: int, y: int) -> bool:
+        return 0 <= x < self.width and 0 <= y < self.height and self.walkable[y * self.width + x] == 1
+
+    def neighbors(self, index: int) -> List[int]:
+        # Same order as GameGraph.add_connections_for_tile: (0, 1), (1, 0), (0, -1), (-1, 0)
+        width: int = self.width
+        walkable: bytearray = self.walkable
+        x: int = index % width
+        result: List[int] = []
+        below: int = index + width
+        if below < len(walkable) and walkable[below]:
+            result.append(below)
+        if x + 1 < width and walkable[index + 1]:
+            result.append(index + 1)
+        above: int = index - width
+        if above >= 0 and walkable[above]:
+            result.append(above)
+        if x > 0 and walkable[index - 1]:
+            result.append(index - 1)
+        return result
+
+    def connected(self, a: int, b: int) -> bool:
+        # Without labels every pair of walkable tiles may be connected
+        if self.components is None:
+            return self.walkable[a] == 1 and self.walkable[b] == 1
+        return self.components[a] >= 0 and self.components[a] == self.components[b]
+
+    def _flood(self, source: int, label: int):
+        components: array = self.components
+        components[source] = label
+        frontier: Deque[int] = deque([source])
+        while frontier:
+            for neighbor in self.neighbors(frontier.popleft()):
+                if components[neighbor] != label:
+                    components[neighbor] = label
+                    frontier.append(neighbor)
+
+    def label_components(self):
+        """
+        ### Description
+        Labels the connected components of the grid with a breadth first search from every
+        unlabeled walkable tile, so `connected` answers in constant time.
+        """
+        self.components = array('i', [-1]) * len(self.walkable)
+        self._next_label = 0
+        for index in range(len(self.walkable)):
+            if self.walkable[index] and self.components[index] < 0:
+                self._flood(index, self._next_label)
+                self._next_label += 1
+
+    def update_components(self, index: int):
+        """
+        ### Description
+        Keeps the labels in sync after a tile was made walkable or blocked. Only the
+        components around the tile are flooded again: a new tile merges the components of
+        its neighbours, and a removed one may split its component in several.
+
+        ### Parameters
+        - `index: int`: The index of the edited tile.
+        """
+        if self.components is None:
+            return
+        if self.walkable[index]:
+            self._flood(index, self._next_label)
+            self._next_label += 1
+            return
+
+        label: int = self.components[index]
+        self.components[index] = -1
+        for neighbor in self.neighbors(index):
+            # Neighbours still sharing the old label were not reached by a previous flood
+            if self.components[neighbor] == label:
+                self._flood(neighbor, self._next_label)
+                self._next_label += 1